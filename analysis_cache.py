@@ -0,0 +1,187 @@
+"""
+Analysis cache module
+Persists audio analysis arrays on disk, keyed by audio content and analysis parameters
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+from config import ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES
+
+
+# Bump when the layout or meaning of cached arrays changes
+CACHE_VERSION = 3
+
+_HASH_INDEX_FILE = 'content_hashes.json'
+_META_FILE = 'meta.json'
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Size-bounded on-disk cache with least-recently-used eviction
+    
+    Each entry is a directory of raw .npy files (loadable as memory maps) plus a
+    meta.json. Entries are keyed by a content hash of the audio file and the
+    analysis parameters, so renaming or moving a track still hits the cache.
+    """
+    
+    def __init__(self, cache_dir=ANALYSIS_CACHE_DIR, max_bytes=ANALYSIS_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def content_hash(self, audio_path):
+        """
+        Content hash of an audio file
+        Remembered per (path, size, mtime) so unchanged files are only hashed once
+        """
+        stat = os.stat(audio_path)
+        index_key = f"{os.path.abspath(audio_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        index_path = os.path.join(self.cache_dir, _HASH_INDEX_FILE)
+        
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        
+        if index_key not in index:
+            index[index_key] = hash_file(audio_path)
+            _write_json(index_path, index)
+        
+        return index[index_key]
+    
+    def entry(self, audio_path, params):
+        """Get the cache entry for an audio file analyzed with the given parameters"""
+        content_hash = self.content_hash(audio_path)
+        key_source = json.dumps({'version': CACHE_VERSION, 'audio': content_hash,
+                                 'params': params}, sort_keys=True, default=str)
+        key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:32]
+        return AnalysisCacheEntry(self, os.path.join(self.cache_dir, key))
+    
+    def entries(self):
+        """List (path, last_used, size_bytes) for every entry"""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path):
+                continue
+            size = 0
+            last_used = 0
+            for file_name in os.listdir(path):
+                try:
+                    stat = os.stat(os.path.join(path, file_name))
+                except OSError:
+                    continue
+                size += stat.st_size
+                last_used = max(last_used, stat.st_mtime)
+            result.append((path, last_used, size))
+        return result
+    
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+class AnalysisCacheEntry:
+    """One cached analysis: named arrays plus a small metadata dictionary"""
+    
+    def __init__(self, cache, path):
+        self.cache = cache
+        self.path = path
+        self.meta = {}
+        
+        meta_path = os.path.join(path, _META_FILE)
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path) as f:
+                    self.meta = json.load(f)
+                self.touch()
+            except (OSError, ValueError):
+                self.meta = {}
+    
+    def _array_path(self, name):
+        return os.path.join(self.path, f"{name}.npy")
+    
+    def touch(self):
+        """Mark the entry as recently used"""
+        try:
+            os.utime(os.path.join(self.path, _META_FILE))
+        except OSError:
+            pass
+    
+    def has(self, name):
+        return os.path.exists(self._array_path(name))
+    
+    def load(self, name, mmap=True):
+        """Load a cached array, memory-mapped read-only by default"""
+        return np.load(self._array_path(name), mmap_mode='r' if mmap else None)
+    
+    def save(self, name, array):
+        """Atomically write an array and enforce the cache size limit"""
+        array = self.create_array(name, np.shape(array), np.asarray(array).dtype, _fill=array)
+        return self.commit(name, array)
+    
+    def create_array(self, name, shape, dtype, _fill=None):
+        """Create a writable memory-mapped array to be filled and then commit()ed"""
+        os.makedirs(self.path, exist_ok=True)
+        temp_path = self._array_path(name) + f".{os.getpid()}.tmp"
+        array = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=shape)
+        if _fill is not None:
+            array[...] = _fill
+        return array
+    
+    def commit(self, name, array):
+        """Publish an array from create_array() and return it re-opened read-only"""
+        array.flush()
+        temp_path = array.filename
+        del array
+        os.replace(temp_path, self._array_path(name))
+        self._write_meta()
+        self.cache.evict(keep=self.path)
+        return self.load(name)
+    
+    def get_or_compute(self, name, builder):
+        """Load a cached array, or build it with builder() and cache the result"""
+        if self.has(name):
+            return self.load(name)
+        return self.save(name, builder())
+    
+    def set_meta(self, **values):
+        self.meta.update(values)
+        self._write_meta()
+    
+    def _write_meta(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.meta.setdefault('created', time.time())
+        _write_json(os.path.join(self.path, _META_FILE), self.meta)
+
+
+def _write_json(path, data):
+    """Write JSON atomically so concurrent renders never see a partial file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
@@ -5,125 +5,561 @@ Handles audio loading, conversion, and frequency analysis
 
 import numpy as np
 import subprocess
-import os
+import shutil
+import threading
+import tempfile
+import hashlib
+import math
 from scipy.io import wavfile
 from scipy import signal
 
+from config import (
+    FREQUENCY_BANDS, NORMALIZATION_MODE, NORMALIZATION_PERCENTILE,
+    AUDIO_CHUNK_SAMPLES, AUDIO_DEFAULT_CAPACITY_SECONDS, STFT_ENGINE, BEAT_LOW_MID_MAX,
+    ANALYSIS_DECIMATION, ANALYSIS_DECIMATION_MODES, DECIMATED_MIN_SAMPLE_RATE,
+    DECIMATION_NYQUIST_HEADROOM, DECIMATION_FILTER_ATTENUATION,
+    DECIMATED_ENERGY_STRIDE, ANALYSIS_FRAME_RATE, FULL_NPERSEG,
+    WAVEFORM_POINTS_FULL, WAVEFORM_TENSOR_MEMMAP_BYTES, WAVEFORM_TENSOR_CHUNK_FRAMES
+)
+from normalization import NormalizationStats
+from stft_engine import MagnitudeSTFT
+
 
 class AudioProcessor:
-    def __init__(self, audio_path, sample_rate=44100, fps=30, is_preview=False):
+    def __init__(self, audio_path, sample_rate=44100, fps=30, is_preview=False, bands=None,
+                 normalization=NORMALIZATION_MODE, normalization_percentile=NORMALIZATION_PERCENTILE,
+                 waveform_memmap=None, stft_engine=STFT_ENGINE, cache=None,
+                 decimation=ANALYSIS_DECIMATION):
         self.audio_path = audio_path
         self.target_sr = sample_rate
         self.fps = fps
         self.is_preview = is_preview
+        self.normalization = normalization
+        self.normalization_percentile = normalization_percentile
+        # None = memory-map waveform tensors only when they exceed WAVEFORM_TENSOR_MEMMAP_BYTES
+        self.waveform_memmap = waveform_memmap
+        self.stft_engine = stft_engine
+        if decimation not in ANALYSIS_DECIMATION_MODES:
+            raise ValueError(f"Unknown analysis decimation '{decimation}', "
+                             f"expected one of {ANALYSIS_DECIMATION_MODES}")
+        self.decimation = decimation
+        
+        # Frequency range analysis needs (band layout and beat ranges)
+        bands = bands if bands is not None else FREQUENCY_BANDS
+        self.max_frequency = max(max(band['max'] for band in bands), BEAT_LOW_MID_MAX)
+        
+        # Analysis sample rate and window size (refined once the real sample rate is known)
+        self._plan_analysis(self.target_sr)
         
-        # Load and process audio
-        self.sr, self.y, self.duration = self._load_audio()
+        # Persistent analysis cache entry (None when caching is disabled)
+        self.cache_entry = cache.entry(audio_path, self._analysis_params()) if cache else None
         
-        # Calculate STFT
-        self.frequencies, self.times, self.stft, self.magnitude = self._calculate_stft()
+        if self.cache_entry is not None and self.cache_entry.meta.get('complete'):
+            self._load_cached_analysis()
+        else:
+            # Load and process audio
+            self.sr, self.y, self.duration = self._load_audio()
+            if self.sr != self.target_sr:
+                self._plan_analysis(self.sr)
+            
+            # Calculate STFT magnitudes plus full-spectrum per-frame energy and peak
+            (self.frequencies, self.analysis_times, self.magnitude,
+             self.frame_energy, self.frame_peak) = self._calculate_stft()
+            
+            if self.cache_entry is not None:
+                self._store_cached_analysis()
+        
+        # Map video frames onto the fixed-rate analysis timeline
+        self._band_slices = {}
+        self.set_fps(fps)
+        
+        # Precompute (bands x frames) energy matrix and normalization stats for the band layout
+        self.get_band_energy(bands)
+        self.get_normalization_stats(bands)
+    
+    def _analysis_params(self):
+        """Parameters that determine the core analysis arrays (used as the cache key)"""
+        return {
+            'sample_rate': self.target_sr,
+            'analysis_frame_rate': ANALYSIS_FRAME_RATE,
+            'nperseg': self.nperseg,
+            'decimation_factor': self.decimation_factor,
+            'stft_engine': self.stft_engine,
+            'max_frequency': self.max_frequency,
+        }
+    
+    _CORE_ARRAYS = ('frequencies', 'analysis_times', 'magnitude', 'frame_energy', 'frame_peak')
+    
+    def _load_cached_analysis(self):
+        """Memory-map the core analysis arrays from the cache, skipping decode and STFT"""
+        entry = self.cache_entry
+        for name in self._CORE_ARRAYS:
+            setattr(self, name, entry.load(name))
+        self.sr = entry.meta['sr']
+        self.duration = entry.meta['duration']
+        self.y = None
+        print(f"Loaded cached analysis: {self.duration:.2f}s at {self.sr}Hz")
+    
+    def _store_cached_analysis(self):
+        """Write the core analysis arrays to the cache and mark the entry complete"""
+        entry = self.cache_entry
+        for name in self._CORE_ARRAYS:
+            setattr(self, name, entry.save(name, getattr(self, name)))
+        entry.set_meta(sr=self.sr, duration=self.duration, complete=True)
+    
+    def cached_array(self, name, builder):
+        """Load a derived array from the analysis cache, or build (and cache) it"""
+        if self.cache_entry is None:
+            return builder()
+        return self.cache_entry.get_or_compute(name, builder)
+    
+    def attach_cache(self, cache):
+        """
+        Write this analysis (core arrays, normalization stats, waveform tensors) to a
+        cache and keep using it from there, so other processes load it instead of
+        decoding and analyzing the audio again
+        """
+        self.cache_entry = cache.entry(self.audio_path, self._analysis_params())
+        self._store_cached_analysis()
+        for key, stats in self._normalization_stats.items():
+            self.cache_entry.set_meta(**{self._stats_cache_name(key): stats.to_dict()})
+        for (key, points), tensor in self._waveform_tensors.items():
+            self._waveform_tensors[(key, points)] = self.cache_entry.save(
+                self._waveform_cache_name(key, points), tensor)
+    
+    @staticmethod
+    def _layout_id(key):
+        """Short stable identifier for a band layout key, used in cache names"""
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:12]
+    
+    def _stats_cache_name(self, key):
+        return f"stats_{self._layout_id(key)}_{self.fps:g}fps"
+    
+    def _waveform_cache_name(self, key, points):
+        stats = self._normalization_stats[key]
+        return (f"waveforms_{self._layout_id(key)}_{points}_"
+                f"{stats.mode}_{stats.percentile:g}_{self.fps:g}fps")
     
     def _load_audio(self):
-        """Load audio file and convert to normalized mono"""
+        """Load audio file as normalized float32 mono without temporary files"""
         print("Loading audio...")
-        wav_path = self._convert_to_wav(self.audio_path)
+        y = None
+        sr = self.target_sr
         
-        # Load audio
-        sr, audio_data = wavfile.read(wav_path)
+        if self.audio_path.lower().endswith('.wav'):
+            y, sr = self._read_wav(self.audio_path)
         
-        # Convert to mono if stereo
-        if len(audio_data.shape) > 1:
-            audio_data = audio_data.mean(axis=1)
+        if y is None:
+            y = self._decode_with_ffmpeg(self.audio_path, sr)
         
-        # Normalize
-        y = audio_data.astype(np.float32) / np.max(np.abs(audio_data))
+        # Normalize in place (max/min avoid a full-size np.abs temporary)
+        peak = max(float(np.max(y)), -float(np.min(y))) if len(y) else 0
+        if peak > 0:
+            y *= 1.0 / peak
         duration = len(y) / sr
         
-        # Clean up temporary WAV
-        if wav_path != self.audio_path:
-            os.remove(wav_path)
-        
         print(f"Audio loaded: {duration:.2f}s at {sr}Hz")
         return sr, y, duration
     
-    def _convert_to_wav(self, audio_path):
-        """Convert audio file to WAV using ffmpeg if needed"""
-        if audio_path.lower().endswith('.wav'):
-            return audio_path
+    def _read_wav(self, wav_path):
+        """
+        Read a WAV file through a memory map, downmixing in chunks into one float32 array
+        Returns (None, target_sr) when the file needs resampling and FFmpeg can do it
+        """
+        try:
+            sr, audio_data = wavfile.read(wav_path, mmap=True)
+        except ValueError:
+            # Some encodings (e.g. 24-bit PCM) cannot be memory-mapped
+            sr, audio_data = wavfile.read(wav_path)
+        
+        if sr != self.target_sr and self._ffmpeg_available():
+            return None, self.target_sr
+        
+        num_samples = audio_data.shape[0]
+        y = np.empty(num_samples, dtype=np.float32)
+        for start in range(0, num_samples, AUDIO_CHUNK_SAMPLES):
+            stop = min(start + AUDIO_CHUNK_SAMPLES, num_samples)
+            block = audio_data[start:stop]
+            if block.ndim > 1:
+                np.mean(block, axis=1, dtype=np.float32, out=y[start:stop])
+            else:
+                y[start:stop] = block
+        del audio_data
+        
+        if sr != self.target_sr:
+            # No FFmpeg available - fall back to polyphase resampling
+            divisor = math.gcd(self.target_sr, sr)
+            y = signal.resample_poly(y, self.target_sr // divisor, sr // divisor).astype(np.float32)
+            sr = self.target_sr
         
-        wav_path = audio_path.rsplit('.', 1)[0] + '_temp.wav'
+        return y, sr
+    
+    @staticmethod
+    def _ffmpeg_available():
+        """Check whether the ffmpeg executable is on PATH"""
+        return shutil.which('ffmpeg') is not None
+    
+    def _probe_duration(self, audio_path):
+        """Ask ffprobe for the duration in seconds, or None if unavailable"""
+        try:
+            result = subprocess.run([
+                'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1', audio_path
+            ], capture_output=True, text=True, timeout=30)
+            return float(result.stdout.strip())
+        except (OSError, ValueError, subprocess.SubprocessError):
+            return None
+    
+    def _decode_with_ffmpeg(self, audio_path, sr):
+        """Stream mono float32 PCM from ffmpeg's stdout into a preallocated array"""
+        duration = self._probe_duration(audio_path)
+        if duration:
+            capacity = int(duration * sr * 1.01) + sr
+        else:
+            capacity = AUDIO_DEFAULT_CAPACITY_SECONDS * sr
         
         try:
-            subprocess.run([
-                'ffmpeg', '-i', audio_path, '-ar', str(self.target_sr), '-ac', '1', 
-                '-y', wav_path
-            ], check=True, capture_output=True)
-            return wav_path
-        except subprocess.CalledProcessError:
-            raise Exception("FFmpeg is required to process audio files. Install with: brew install ffmpeg")
+            process = subprocess.Popen([
+                'ffmpeg', '-v', 'error', '-i', audio_path,
+                '-f', 'f32le', '-acodec', 'pcm_f32le', '-ac', '1', '-ar', str(sr), '-'
+            ], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         except FileNotFoundError:
             raise Exception("FFmpeg not found. Install with: brew install ffmpeg")
+        
+        # Drain stderr in the background so a chatty decoder can never block
+        stderr_output = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_output.append(process.stderr.read()), daemon=True
+        )
+        stderr_thread.start()
+        
+        y = np.empty(capacity, dtype=np.float32)
+        filled_bytes = 0
+        chunk_bytes = AUDIO_CHUNK_SAMPLES * 4
+        
+        while True:
+            if filled_bytes + chunk_bytes > y.nbytes:
+                # Estimate was short - grow once by 50%
+                grown = np.empty(int(len(y) * 1.5) + sr, dtype=np.float32)
+                grown.view(np.uint8)[:filled_bytes] = y.view(np.uint8)[:filled_bytes]
+                y = grown
+            
+            buffer = memoryview(y.view(np.uint8))[filled_bytes:filled_bytes + chunk_bytes]
+            read = process.stdout.readinto(buffer)
+            buffer.release()
+            if not read:
+                break
+            filled_bytes += read
+        
+        process.wait()
+        stderr_thread.join()
+        
+        if process.returncode != 0:
+            message = b''.join(stderr_output).decode('utf-8', 'replace').strip()
+            raise Exception(f"FFmpeg could not decode {audio_path}: {message[-500:]}")
+        
+        num_samples = filled_bytes // 4
+        if len(y) - num_samples > num_samples // 20:
+            # Release the unused tail if the capacity estimate was far off
+            return y[:num_samples].copy()
+        return y[:num_samples]
+    
+    def _choose_decimation_factor(self, sr, full_hop):
+        """
+        Pick the largest integer decimation factor the band layout allows
+        The decimated rate must keep every band below Nyquist (with headroom) and stay
+        above DECIMATED_MIN_SAMPLE_RATE. The factor must also divide the full-rate hop
+        and window, so the decimated STFT keeps the full-rate timeline, window duration
+        and bin spacing and its magnitudes match a full-rate analysis.
+        """
+        if self.decimation == 'off':
+            return 1
+        
+        min_rate = max(DECIMATED_MIN_SAMPLE_RATE,
+                       2 * self.max_frequency * DECIMATION_NYQUIST_HEADROOM)
+        for factor in range(int(sr // min_rate), 1, -1):
+            if sr % factor == 0 and full_hop % factor == 0 and FULL_NPERSEG % factor == 0:
+                return factor
+        return 1
+    
+    def _plan_analysis(self, sr):
+        """Choose decimation factor, analysis sample rate, hop and STFT window size"""
+        # Whole-sample hop closest to ANALYSIS_FRAME_RATE; the exact rate is kept for alignment
+        full_hop = max(1, int(round(sr / ANALYSIS_FRAME_RATE)))
+        self.analysis_rate = sr / full_hop
+        
+        # Same window for previews and final renders, so one analysis serves both
+        self.decimation_factor = self._choose_decimation_factor(sr, full_hop)
+        self.analysis_sr = sr // self.decimation_factor
+        self.hop_length = full_hop // self.decimation_factor
+        self.nperseg = FULL_NPERSEG // self.decimation_factor
     
     def _calculate_stft(self):
-        """Calculate Short-Time Fourier Transform for frequency analysis"""
+        """
+        Calculate Short-Time Fourier Transform magnitudes for frequency analysis
+        The complex spectrogram is never kept; the chunked engine also drops bins
+        above max_frequency and stores float32
+        """
         print("Analyzing audio frequencies...")
-        hop_length = self.sr // self.fps
+        y = self.y
+        sr = self.analysis_sr
         
-        # Use smaller FFT in preview mode for speed
-        nperseg = 1024 if self.is_preview else 2048
+        if self.decimation_factor > 1:
+            # Low-pass and decimate: every band sits far below the original Nyquist
+            y = signal.resample_poly(y, 1, self.decimation_factor,
+                                     window=self._decimation_filter()).astype(np.float32, copy=False)
+            print(f"  Decimated {self.decimation_factor}x to {sr}Hz, {self.nperseg}-point window")
         
-        frequencies, times, stft = signal.stft(
-            self.y, 
-            fs=self.sr, 
-            nperseg=nperseg, 
-            noverlap=nperseg - hop_length
-        )
-        magnitude = np.abs(stft)
+        hop_length = self.hop_length
+        nperseg = self.nperseg
         
-        return frequencies, times, stft, magnitude
+        if self.stft_engine == 'chunked':
+            engine = MagnitudeSTFT(sr, nperseg, hop_length, max_frequency=self.max_frequency)
+            frequencies, times, magnitude, frame_energy, frame_peak = engine.process(y)
+        else:
+            frequencies, times, stft = signal.stft(
+                y, 
+                fs=sr, 
+                nperseg=nperseg, 
+                noverlap=nperseg - hop_length
+            )
+            magnitude = np.abs(stft)
+            del stft
+            frame_energy, frame_peak = magnitude.sum(axis=0), magnitude.max(axis=0)
+        
+        if self.decimation_factor > 1:
+            frame_energy, frame_peak = self._full_rate_energy(len(times), frame_peak)
+        
+        return frequencies, times, magnitude, frame_energy, frame_peak
+    
+    def _decimation_filter(self):
+        """
+        Anti-aliasing low-pass for decimation (zero-phase FIR, Kaiser window)
+        Only aliases landing on the analyzed range matter, so the transition band runs
+        from the highest analyzed frequency to its first alias, which keeps the filter
+        far shorter than resample_poly's general-purpose default.
+        """
+        sr = self.analysis_sr * self.decimation_factor
+        pass_edge = self.max_frequency * DECIMATION_NYQUIST_HEADROOM
+        numtaps, beta = signal.kaiserord(DECIMATION_FILTER_ATTENUATION,
+                                         (self.analysis_sr - 2 * pass_edge) / (sr / 2))
+        return signal.firwin(numtaps | 1, self.analysis_sr / 2, window=('kaiser', beta), fs=sr)
+    
+    def _full_rate_energy(self, num_frames, decimated_peak):
+        """
+        Full-spectrum frame energy and peak for the decimated path
+        The decimated spectrum stops at its Nyquist, so the beat threshold and peak
+        normalization would see a fraction of the full-rate totals. A full-rate STFT
+        on every DECIMATED_ENERGY_STRIDE-th analysis frame (no bins kept) gives the
+        totals, interpolated onto the analysis timeline.
+        """
+        hop_length = self.hop_length * self.decimation_factor * DECIMATED_ENERGY_STRIDE
+        engine = MagnitudeSTFT(self.sr, FULL_NPERSEG, hop_length, max_frequency=0)
+        _, _, _, sparse_energy, sparse_peak = engine.process(self.y)
+        
+        positions = np.arange(len(sparse_energy)) * DECIMATED_ENERGY_STRIDE
+        frames = np.arange(num_frames)
+        frame_energy = np.interp(frames, positions, sparse_energy).astype(np.float32)
+        # Both peaks are lower bounds of the full-rate peak
+        frame_peak = np.maximum(decimated_peak, np.interp(frames, positions, sparse_peak)).astype(np.float32)
+        return frame_energy, frame_peak
+    
+    def set_fps(self, fps):
+        """
+        Retarget the video timeline to a new frame rate without re-analyzing
+        Video frame k sits at exactly k / fps seconds; its value is linearly
+        interpolated between the two nearest analysis frames
+        """
+        self.fps = fps
+        num_analysis = self.magnitude.shape[1]
+        num_frames = int(self.duration * fps) + 1
+        
+        self.times = np.arange(num_frames) / fps
+        positions = np.clip(self.times * self.analysis_rate, 0, max(num_analysis - 1, 0))
+        self._frame_lo = np.floor(positions).astype(np.intp)
+        self._frame_hi = np.minimum(self._frame_lo + 1, max(num_analysis - 1, 0))
+        self._frame_weight = (positions - self._frame_lo).astype(np.float32)
+        
+        # Per-fps products are rebuilt on demand
+        self._band_energy = {}
+        self._normalization_stats = {}
+        self._waveform_tensors = {}
+    
+    def resample_frames(self, series, start=0, stop=None):
+        """
+        Resample analysis-rate data (frames on the last axis) onto video frames
+        start/stop select a range of video frames
+        """
+        lo = self._frame_lo[start:stop]
+        hi = self._frame_hi[start:stop]
+        weight = self._frame_weight[start:stop]
+        low = series[..., lo]
+        result = low + (series[..., hi] - low) * weight
+        return result.astype(np.float32, copy=False)
+    
+    @staticmethod
+    def _band_key(bands):
+        """Hashable key describing the frequency ranges of a band layout"""
+        return tuple((band['min'], band['max']) for band in bands)
+    
+    def get_band_slices(self, bands):
+        """
+        Get contiguous frequency-bin slices for each band
+        Frequencies are sorted, so each band maps to a single [start, stop) range
+        """
+        key = self._band_key(bands)
+        if key not in self._band_slices:
+            self._band_slices[key] = [
+                slice(int(np.searchsorted(self.frequencies, band['min'], side='left')),
+                      int(np.searchsorted(self.frequencies, band['max'], side='right')))
+                for band in bands
+            ]
+        return self._band_slices[key]
+    
+    def get_band_energy(self, bands):
+        """Get the (bands x video frames) mean-magnitude matrix, computed once per band layout"""
+        key = self._band_key(bands)
+        if key not in self._band_energy:
+            energy = self.cached_array(
+                f"band_energy_{self._layout_id(key)}",
+                lambda: self._build_band_energy(bands)
+            )
+            self._band_energy[key] = self.resample_frames(energy)
+        return self._band_energy[key]
+    
+    def _build_band_energy(self, bands):
+        """Average each band's contiguous bin slice for every analysis frame"""
+        energy = np.zeros((len(bands), self.magnitude.shape[1]), dtype=np.float32)
+        for band_idx, band_slice in enumerate(self.get_band_slices(bands)):
+            if band_slice.stop > band_slice.start:
+                energy[band_idx] = self.magnitude[band_slice].mean(axis=0)
+        return energy
+    
+    def get_normalization_stats(self, bands):
+        """
+        Get normalization statistics for a band layout, computed once per layout and fps
+        Statistics are taken over the video frames (the values that are normalized), so
+        the denser analysis timeline does not raise the peak the frames are scaled by
+        """
+        key = self._band_key(bands)
+        if key in self._normalization_stats:
+            return self._normalization_stats[key]
+        
+        cache_name = self._stats_cache_name(key)
+        cached = self.cache_entry.meta.get(cache_name) if self.cache_entry is not None else None
+        
+        if cached is not None:
+            stats = NormalizationStats.from_dict(
+                cached, mode=self.normalization, percentile=self.normalization_percentile
+            )
+        else:
+            stats = None
+        
+        if stats is None:
+            magnitude = self.resample_frames(self.magnitude)
+            global_max = float(magnitude.max()) if magnitude.size else 0.0
+            if len(self.frame_peak) and self.frame_peak.max() > self.magnitude.max():
+                # The loudest bin lies above the stored ones: use the full-spectrum peaks
+                global_max = float(self.resample_frames(self.frame_peak).max())
+            stats = NormalizationStats(
+                magnitude, self.get_band_slices(bands),
+                mode=self.normalization, percentile=self.normalization_percentile,
+                global_max=global_max
+            )
+            if self.cache_entry is not None:
+                self.cache_entry.set_meta(**{cache_name: stats.to_dict()})
+        
+        self._normalization_stats[key] = stats
+        return stats
+    
+    def get_volume_curve(self, bands):
+        """Normalized volume intensity for every video frame (same as per-frame rendering)"""
+        stats = self.get_normalization_stats(bands)
+        return stats.normalize_volume(self.get_band_energy(bands).mean(axis=0, dtype=np.float64))
     
     def get_band_values(self, frame_idx, bands):
         """Extract frequency band values for a specific frame"""
-        if frame_idx >= self.magnitude.shape[1]:
-            frame_idx = self.magnitude.shape[1] - 1
+        energy = self.get_band_energy(bands)
+        if frame_idx >= energy.shape[1]:
+            frame_idx = energy.shape[1] - 1
         
-        frame_data = self.magnitude[:, frame_idx]
-        band_values = []
+        return energy[:, frame_idx].tolist()
+    
+    def get_waveform_tensor(self, bands, points=WAVEFORM_POINTS_FULL):
+        """Get the (frames x bands x points) normalized waveform tensor, built once per layout"""
+        key = (self._band_key(bands), points)
+        if key in self._waveform_tensors:
+            return self._waveform_tensors[key]
         
-        for band in bands:
-            # Find frequency indices for this band
-            mask = (self.frequencies >= band['min']) & (self.frequencies <= band['max'])
-            band_data = frame_data[mask]
-            
-            if len(band_data) > 0:
-                avg_value = np.mean(band_data)
-                band_values.append(avg_value)
-            else:
-                band_values.append(0)
+        self.get_normalization_stats(bands)
+        cache_name = self._waveform_cache_name(key[0], points)
+        
+        if self.cache_entry is not None and self.cache_entry.has(cache_name):
+            tensor = self.cache_entry.load(cache_name)
+        elif self.cache_entry is not None:
+            # Build straight into the cache file, then reopen it read-only
+            tensor = self._build_waveform_tensor(bands, points, cache_name=cache_name)
+            tensor = self.cache_entry.commit(cache_name, tensor)
+        else:
+            tensor = self._build_waveform_tensor(bands, points)
         
-        return band_values
+        self._waveform_tensors[key] = tensor
+        return tensor
     
-    def get_band_waveform(self, frame_idx, band_idx, bands, points=150):
-        """Get waveform data for a specific frequency band"""
-        if frame_idx >= self.magnitude.shape[1]:
-            frame_idx = self.magnitude.shape[1] - 1
+    def _build_waveform_tensor(self, bands, points, cache_name=None):
+        """Resample and normalize every band of every video frame in one vectorized pass"""
+        num_frames = len(self.times)
+        num_bands = len(bands)
+        shape = (num_frames, num_bands, points)
         
-        band = bands[band_idx]
-        frame_data = self.magnitude[:, frame_idx]
+        use_memmap = self.waveform_memmap
+        if use_memmap is None:
+            use_memmap = num_frames * num_bands * points * 4 > WAVEFORM_TENSOR_MEMMAP_BYTES
         
-        # Find frequency indices for this band
-        mask = (self.frequencies >= band['min']) & (self.frequencies <= band['max'])
-        band_data = frame_data[mask]
+        if cache_name is not None:
+            tensor = self.cache_entry.create_array(cache_name, shape, np.float32)
+        elif use_memmap:
+            # Anonymous temporary file - the OS reclaims it when the mapping is released
+            tensor = np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode='w+', shape=shape)
+        else:
+            tensor = np.zeros(shape, dtype=np.float32)
         
-        if len(band_data) == 0:
-            return np.zeros(points)
+        # Bin indices for every (band, point) pair, same resampling as a per-band linspace
+        indices = np.zeros((num_bands, points), dtype=np.intp)
+        valid = np.zeros(num_bands, dtype=bool)
+        for band_idx, band_slice in enumerate(self.get_band_slices(bands)):
+            length = band_slice.stop - band_slice.start
+            if length > 0:
+                indices[band_idx] = band_slice.start + np.linspace(0, length - 1, points).astype(int)
+                valid[band_idx] = True
         
-        # Resample to desired number of points
-        indices = np.linspace(0, len(band_data) - 1, points).astype(int)
-        waveform = band_data[indices]
+        stats = self.get_normalization_stats(bands)
+        inv_scales = np.where(valid, 1.0 / stats.band_scales(), 0.0).astype(np.float32)
+        flat_indices = indices.ravel()
         
-        # Normalize to 0-1 range
-        max_val = np.max(self.magnitude) if np.max(self.magnitude) > 0 else 1
-        waveform = waveform / max_val
+        for start in range(0, num_frames, WAVEFORM_TENSOR_CHUNK_FRAMES):
+            stop = min(start + WAVEFORM_TENSOR_CHUNK_FRAMES, num_frames)
+            # Only the analysis frames this chunk interpolates between
+            first = self._frame_lo[start]
+            block = self.magnitude[flat_indices, first:self._frame_hi[stop - 1] + 1]
+            lo = block[:, self._frame_lo[start:stop] - first]
+            hi = block[:, self._frame_hi[start:stop] - first]
+            chunk = lo + (hi - lo) * self._frame_weight[start:stop]
+            chunk = chunk.reshape(num_bands, points, -1)
+            chunk = chunk.transpose(2, 0, 1) * inv_scales[None, :, None]
+            if stats.mode != 'peak':
+                np.minimum(chunk, 1.0, out=chunk)
+            tensor[start:stop] = chunk
         
-        return waveform
\ No newline at end of file
+        return tensor
+    
+    def get_band_waveforms(self, frame_idx, bands, points=WAVEFORM_POINTS_FULL):
+        """Get the (bands x points) waveform block for a frame"""
+        tensor = self.get_waveform_tensor(bands, points)
+        if frame_idx >= tensor.shape[0]:
+            frame_idx = tensor.shape[0] - 1
+        return tensor[frame_idx]
+    
+    def get_band_waveform(self, frame_idx, band_idx, bands, points=WAVEFORM_POINTS_FULL):
+        """Get waveform data for a specific frequency band"""
+        return self.get_band_waveforms(frame_idx, bands, points)[band_idx]
\ No newline at end of file
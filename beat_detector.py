@@ -5,22 +5,89 @@ Analyzes audio for transient changes (beats)
 
 import numpy as np
 
+from config import (
+    BEAT_BASS_MIN, BEAT_BASS_MAX, BEAT_LOW_MID_MIN, BEAT_LOW_MID_MAX,
+    BEAT_THRESHOLD_MULTIPLIER, BEAT_DECAY_FACTOR
+)
+
 
 class BeatDetector:
     def __init__(self):
         self.prev_energy = 0
         self.beat_intensity = 0
+        
+        # Offline analysis results (see analyze())
+        self.energy = None
+        self.onset_envelope = None
+        self.threshold = None
+        self.beat_curve = None
+    
+    @staticmethod
+    def band_energy(frequencies, magnitude):
+        """Per-frame bass plus low-mid magnitude sum (the energy beats are detected in)"""
+        bass = slice(int(np.searchsorted(frequencies, BEAT_BASS_MIN, side='left')),
+                     int(np.searchsorted(frequencies, BEAT_BASS_MAX, side='right')))
+        low_mid = slice(int(np.searchsorted(frequencies, BEAT_LOW_MID_MIN, side='left')),
+                        int(np.searchsorted(frequencies, BEAT_LOW_MID_MAX, side='right')))
+        return magnitude[bass].sum(axis=0) + magnitude[low_mid].sum(axis=0)
+    
+    def analyze(self, energy, frame_energy):
+        """
+        Compute the whole beat-intensity curve in one vectorized pass
+        
+        Same weighting and decay as detect_beat(), but every frame is available
+        by index afterwards, so frames can be rendered in any order.
+        energy is band_energy() per frame and frame_energy the per-frame magnitude
+        sum over the full spectrum; both are 1-D, so callers can resample them to
+        the video timeline without touching the spectrogram.
+        """
+        num_frames = len(energy)
+        self.energy = np.asarray(energy)
+        
+        # Onset envelope: increase in energy over the previous frame
+        self.onset_envelope = np.diff(self.energy, prepend=0)
+        
+        # Threshold from the average frame energy over the whole spectrum
+        total = np.sum(frame_energy, dtype=np.float64)
+        self.threshold = total / num_frames * BEAT_THRESHOLD_MULTIPLIER
+        
+        frame_indices = np.arange(num_frames)
+        triggered = self.onset_envelope > self.threshold
+        if self.threshold > 0:
+            trigger_values = np.minimum(1.0, self.onset_envelope / (self.threshold * 2))
+        else:
+            trigger_values = np.zeros(num_frames)
+        
+        # Between beats the intensity decays geometrically from the last trigger
+        last_trigger = np.maximum.accumulate(np.where(triggered, frame_indices, -1))
+        has_trigger = last_trigger >= 0
+        last_trigger = np.maximum(last_trigger, 0)
+        decay = BEAT_DECAY_FACTOR ** (frame_indices - last_trigger).astype(np.float64)
+        self.beat_curve = np.where(has_trigger, trigger_values[last_trigger] * decay, 0.0)
+        
+        return self.beat_curve
+    
+    def beat_at(self, frame_idx):
+        """Beat intensity for any frame in constant time (requires analyze())"""
+        if frame_idx >= len(self.beat_curve):
+            frame_idx = len(self.beat_curve) - 1
+        
+        self.beat_intensity = float(self.beat_curve[frame_idx])
+        return self.beat_intensity
     
     def detect_beat(self, frame_idx, frequencies, magnitude):
         """Detect transient changes (beats) in the audio"""
+        if self.beat_curve is not None:
+            return self.beat_at(frame_idx)
+        
         if frame_idx >= magnitude.shape[1]:
             frame_idx = magnitude.shape[1] - 1
         
         frame_data = magnitude[:, frame_idx]
         
         # Calculate energy in bass/low-mid range
-        bass_mask = (frequencies >= 20) & (frequencies <= 250)
-        low_mid_mask = (frequencies >= 250) & (frequencies <= 1000)
+        bass_mask = (frequencies >= BEAT_BASS_MIN) & (frequencies <= BEAT_BASS_MAX)
+        low_mid_mask = (frequencies >= BEAT_LOW_MID_MIN) & (frequencies <= BEAT_LOW_MID_MAX)
         
         bass_energy = np.sum(frame_data[bass_mask])
         low_mid_energy = np.sum(frame_data[low_mid_mask])
@@ -31,13 +98,13 @@ class BeatDetector:
         
         # Threshold for beat detection
         max_energy = np.sum(magnitude[:, :]) / magnitude.shape[1]
-        threshold = max_energy * 0.3
+        threshold = max_energy * BEAT_THRESHOLD_MULTIPLIER
         
         if energy_change > threshold:
             self.beat_intensity = min(1.0, energy_change / (threshold * 2))
         else:
-            self.beat_intensity *= 0.7  # Decay
+            self.beat_intensity *= BEAT_DECAY_FACTOR  # Decay
         
         self.prev_energy = total_energy
         
-        return self.beat_intensity
\ No newline at end of file
+        return self.beat_intensity
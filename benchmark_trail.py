@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Trail Decay Benchmark
+Compares the float trail fade / end fade round trip against the in-place lookup-table path
+"""
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from config import TRAIL_FADE_FACTOR
+from compositor import FrameCompositor
+
+RESOLUTIONS = (
+    (1280, 720),
+    (1920, 1080),
+    (3840, 2160),
+)
+
+FRAMES = 30
+END_FADE_FACTOR = 0.5
+
+
+def time_per_frame(step, frames=FRAMES):
+    """Average milliseconds per call of step() (after one warm-up call)"""
+    step()
+    start = time.perf_counter()
+    for _ in range(frames):
+        step()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def benchmark_float(width, height, fading):
+    """Previous path: PIL -> float64 multiply -> uint8 -> PIL, plus trail copies"""
+    rng = np.random.default_rng(0)
+    state = {'trail': Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))}
+    
+    def step():
+        trail_array = np.array(state['trail'])
+        trail_array = (trail_array * TRAIL_FADE_FACTOR).astype(np.uint8)
+        img = Image.fromarray(trail_array).copy()
+        state['trail'] = img.copy()
+        if fading:
+            img_array = np.array(img)
+            img_array = (img_array * END_FADE_FACTOR).astype(np.uint8)
+            img = Image.fromarray(img_array)
+        return img
+    
+    return time_per_frame(step)
+
+
+def benchmark_lut(width, height, fading):
+    """Compositor path: in-place uint8 lookup tables on persistent buffers"""
+    rng = np.random.default_rng(0)
+    compositor = FrameCompositor(width, height)
+    compositor.frame[...] = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    compositor.has_trail = True
+    fade_factor = END_FADE_FACTOR if fading else 1.0
+    
+    def step():
+        compositor.begin_frame()
+        return compositor.end_frame(fade_factor)
+    
+    return time_per_frame(step)
+
+
+def main():
+    print("=" * 60)
+    print("TRAIL DECAY BENCHMARK (ms per frame)")
+    print("=" * 60)
+    print(f"{'Resolution':<12} {'Stage':<18} {'Float':>8} {'LUT':>8} {'Speedup':>8}")
+    
+    for width, height in RESOLUTIONS:
+        for fading, stage in ((False, 'trail decay'), (True, 'decay + end fade')):
+            float_ms = benchmark_float(width, height, fading)
+            lut_ms = benchmark_lut(width, height, fading)
+            print(f"{f'{width}x{height}':<12} {stage:<18} {float_ms:>8.2f} {lut_ms:>8.2f} "
+                  f"{float_ms / lut_ms:>7.1f}x")
+    
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,9 @@ Checks if all acceleration features are available on your M4 Mac Mini
 import subprocess
 import sys
 
+from config import ENCODER_PRESETS
+from encoders import ENCODER_BACKENDS, available_encoders, encoder_works, select_encoder
+
 def check_pillow_simd():
     """Check if Pillow-SIMD is installed"""
     try:
@@ -43,10 +46,10 @@ def check_pillow_simd():
         print()
         return False
 
-def check_ffmpeg_videotoolbox():
-    """Check if FFmpeg has VideoToolbox support"""
+def check_ffmpeg_encoders():
+    """Check which registered video encoders FFmpeg provides and which one auto selects"""
     print("=" * 60)
-    print("FFMPEG VIDEOTOOLBOX CHECK")
+    print("FFMPEG ENCODER CHECK")
     print("=" * 60)
     
     try:
@@ -58,28 +61,31 @@ def check_ffmpeg_videotoolbox():
             timeout=5
         )
         
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"FFmpeg found: {version_line}")
-            
-            # Check for VideoToolbox encoder
-            encoders_result = subprocess.run(
-                ['ffmpeg', '-encoders'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if 'h264_videotoolbox' in encoders_result.stdout:
-                print("✅ VideoToolbox H.264 encoder available (Hardware acceleration enabled)")
-                return True
-            else:
-                print("⚠️  VideoToolbox encoder not found")
-                print("   Your FFmpeg may not be compiled with VideoToolbox support")
-                return False
-        else:
+        if result.returncode != 0:
             print("❌ FFmpeg error")
             return False
+        
+        version_line = result.stdout.split('\n')[0]
+        print(f"FFmpeg found: {version_line}")
+        
+        for name, backend in ENCODER_BACKENDS.items():
+            if encoder_works(name):
+                kind = "hardware" if backend.hardware else "software"
+                print(f"✅ {backend.label} [{name}] ({kind})")
+            elif name in available_encoders():
+                print(f"⚠️  {backend.label} [{name}] compiled in, but the test encode failed")
+            else:
+                print(f"   {backend.label} [{name}] not available")
+        
+        print()
+        for preset in ENCODER_PRESETS:
+            print(f"Auto encoder ({preset}): {select_encoder('auto', preset).name}")
+        
+        hardware = [name for name, backend in ENCODER_BACKENDS.items()
+                    if backend.hardware and encoder_works(name)]
+        if not hardware:
+            print("⚠️  No hardware encoder available (software encoding will be used)")
+        return bool(hardware)
             
     except FileNotFoundError:
         print("❌ FFmpeg not found")
@@ -156,7 +162,9 @@ def run_benchmark_test():
             temp_path = temp_output.name
             temp_output.close()
             
-            # FFmpeg command for hardware encoding
+            # FFmpeg command for the automatically selected encoder
+            backend = select_encoder()
+            print(f"Encoder: {backend.label} [{backend.name}]")
             ffmpeg_cmd = [
                 'ffmpeg', '-y',
                 '-f', 'rawvideo',
@@ -165,8 +173,7 @@ def run_benchmark_test():
                 '-pix_fmt', 'rgb24',
                 '-r', '30',
                 '-i', '-',
-                '-c:v', 'h264_videotoolbox',
-                '-b:v', '2M',
+                *backend.output_args(),
                 '-t', '2',  # 2 second test
                 temp_path
             ]
@@ -225,7 +232,7 @@ def main():
     check_system_info()
     
     pillow_ok = check_pillow_simd()
-    ffmpeg_ok = check_ffmpeg_videotoolbox()
+    ffmpeg_ok = check_ffmpeg_encoders()
     
     print("=" * 60)
     print("SUMMARY")
@@ -236,19 +243,19 @@ def main():
         print()
         print("Expected performance improvements:")
         print("  • Image operations: 1.5-4x faster (Pillow-SIMD)")
-        print("  • Video encoding: 5-10x faster (VideoToolbox)")
+        print("  • Video encoding: 5-10x faster (hardware encoder)")
         print("  • Overall render: 3-8x faster")
         print()
         run_benchmark_test()
     elif ffmpeg_ok:
-        print("⚠️  VideoToolbox available, but Pillow needs upgrade")
+        print("⚠️  Hardware encoder available, but Pillow needs upgrade")
         print()
         print("To get full acceleration:")
         print("  1. pip uninstall pillow")
         print("  2. pip install pillow-simd")
         print()
     elif pillow_ok:
-        print("⚠️  Pillow optimized, but FFmpeg needs VideoToolbox")
+        print("⚠️  Pillow optimized, but no hardware encoder (software encoding still works)")
         print()
         print("To get hardware encoding:")
         print("  brew reinstall ffmpeg")
@@ -0,0 +1,143 @@
+"""
+Frame compositor module
+Owns the preallocated frame buffers and does trail fade, layer composite and end fade in place
+"""
+
+import numpy as np
+import cv2
+from PIL import Image
+
+from config import TRAIL_FADE_FACTOR, TRAIL_DECAY_CURVE, TRAIL_DECAY_CUTOFF, TRAIL_GAMMA
+
+
+def build_decay_lut(factor, curve=TRAIL_DECAY_CURVE, cutoff=TRAIL_DECAY_CUTOFF):
+    """
+    256-entry uint8 lookup table for one frame of trail decay
+    'linear' scales channel values by factor (same truncation as the float path),
+    'gamma' scales light intensity instead, so bright trails fade more gradually.
+    Values that decay below cutoff snap to black.
+    """
+    values = np.arange(256, dtype=np.float64)
+    if curve == 'gamma':
+        decayed = 255 * ((values / 255) ** TRAIL_GAMMA * factor) ** (1 / TRAIL_GAMMA)
+    elif curve == 'linear':
+        decayed = values * factor
+    else:
+        raise ValueError(f"Unknown trail decay curve: {curve}")
+    
+    lut = decayed.astype(np.uint8)
+    lut[lut < cutoff] = 0
+    return lut
+
+
+def build_fade_lut(factor):
+    """256-entry uint8 lookup table scaling values by factor (end-of-song fade)"""
+    return (np.arange(256, dtype=np.float64) * factor).astype(np.uint8)
+
+
+class FrameCompositor:
+    """
+    Persistent uint8 RGBX framebuffers shared between NumPy and PIL
+    
+    Every buffer is a (height x width x 4) array; the matching PIL image is a
+    zero-copy Image.frombuffer view, so drawing into the image writes straight
+    into the array. The fourth byte is padding (ffmpeg reads it as 'rgb0').
+    
+    The finished frame stays in the frame buffer and is decayed in place (one
+    uint8 lookup-table pass) when the next frame begins; nothing is copied.
+    """
+    
+    MODE = 'RGBX'
+    
+    def __init__(self, width, height, trail_factor=TRAIL_FADE_FACTOR, decay_curve=TRAIL_DECAY_CURVE):
+        self.width = width
+        self.height = height
+        self.decay_lut = build_decay_lut(trail_factor, decay_curve)
+        
+        self.frame = self._new_buffer()     # Frame being drawn (then the trail of the next one)
+        self.layer = self._new_buffer()     # Scratch layer (waveforms)
+        self.output = self._new_buffer()    # End-of-song faded copy of the frame
+        
+        self.frame_image = self.image(self.frame)
+        self.layer_image = self.image(self.layer)
+        
+        self.has_trail = False
+    
+    def _new_buffer(self):
+        return np.zeros((self.height, self.width, 4), dtype=np.uint8)
+    
+    def image(self, buffer):
+        """Writable PIL view of a buffer (no copy)"""
+        img = Image.frombuffer(self.MODE, (self.width, self.height), buffer, 'raw', self.MODE, 0, 1)
+        # frombuffer views are read-only (copy-on-write) by default; draw into the buffer instead
+        img.readonly = 0
+        return img
+    
+    def reset(self):
+        """Forget the trail (the next frame starts from black)"""
+        self.has_trail = False
+    
+    def warmup_frames(self):
+        """
+        Frames after which anything drawn has decayed to black
+        Rendering this many frames before a frame reproduces its trail, whatever
+        came earlier, except where content is alpha-blended over the trail every
+        frame: the rounded-down decay gives such pixels several stable values, so
+        they keep part of their starting offset (see RENDER_WORKERS in config.py).
+        """
+        value, frames = 255, 0
+        while value and self.decay_lut[value] < value:
+            value = int(self.decay_lut[value])
+            frames += 1
+        return frames
+    
+    def begin_frame(self):
+        """Start a frame from the decayed previous frame (black on the first frame)"""
+        if self.has_trail:
+            cv2.LUT(self.frame, self.decay_lut, dst=self.frame)
+        else:
+            self.frame.fill(0)
+        return self.frame_image
+    
+    def clear_layer(self):
+        """Zero the scratch layer and return its PIL view"""
+        self.layer.fill(0)
+        return self.layer_image
+    
+    def composite(self, layer):
+        """
+        Copy every non-black pixel of a layer over the frame
+        layer may be the scratch layer view or any other RGB/RGBX image
+        """
+        if layer is self.layer_image:
+            pixels = self.layer
+        else:
+            pixels = np.asarray(layer.convert(self.MODE) if layer.mode != self.MODE else layer)
+        
+        mask = pixels[..., :3].any(axis=2)
+        np.copyto(self.frame, pixels, where=mask[..., None])
+    
+    def end_frame(self, fade_factor=1.0):
+        """
+        Finish the frame: it becomes the trail for the next frame
+        Returns the frame (or its end-faded copy), valid until the next frame begins
+        """
+        self.has_trail = True
+        
+        if fade_factor < 1.0:
+            cv2.LUT(self.frame, build_fade_lut(fade_factor), dst=self.output)
+            return self.output
+        return self.frame
+    
+    def snapshot(self):
+        """Trail state as arrays (render checkpoints)"""
+        return {'frame': self.frame, 'has_trail': np.array(self.has_trail)}
+    
+    def restore(self, snapshot):
+        """Continue from a snapshot(): the next frame starts from its decayed trail"""
+        np.copyto(self.frame, snapshot['frame'])
+        self.has_trail = bool(snapshot['has_trail'])
+    
+    def to_image(self, buffer):
+        """Independent RGB copy of a buffer (safe to keep across frames)"""
+        return self.image(buffer).convert('RGB')
@@ -127,6 +127,32 @@ DEFAULT_RESOLUTION = (1280, 720)
 PHONE_VERTICAL_RESOLUTION = (1080, 1920)
 PHONE_HORIZONTAL_RESOLUTION = (1920, 1080)
 
+# Audio decoding parameters
+AUDIO_CHUNK_SAMPLES = 1 << 20
+AUDIO_DEFAULT_CAPACITY_SECONDS = 600
+
+# STFT engine: 'chunked' (float32 magnitudes of the needed bins) or 'scipy'
+STFT_ENGINE = 'chunked'
+STFT_CHUNK_FRAMES = 2048
+
+# Fixed analysis timeline (frames per second), resampled to any render fps on demand
+ANALYSIS_FRAME_RATE = 120
+
+# Decimated low-frequency analysis: 'auto' decimates when every band sits far below
+# Nyquist (by a factor dividing the full-rate hop and window, so the analysis matches
+# a full-rate one), 'off' always analyzes at the full sample rate
+ANALYSIS_DECIMATION = 'auto'
+ANALYSIS_DECIMATION_MODES = ('auto', 'off')
+DECIMATED_MIN_SAMPLE_RATE = 4000
+DECIMATION_NYQUIST_HEADROOM = 1.25
+DECIMATION_FILTER_ATTENUATION = 80  # Anti-aliasing stopband (dB)
+DECIMATED_ENERGY_STRIDE = 8         # Full-rate energy pass on every Nth analysis frame
+
+# Analysis cache (band matrices, waveform tensors, beat curves, normalization stats)
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_DIR = '~/.cache/music_visualizer/analysis'
+ANALYSIS_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
 # Preview mode optimizations
 PREVIEW_FPS_REDUCTION = 15
 PREVIEW_RESOLUTION_DIVISOR = 2
@@ -138,6 +164,10 @@ BASE_ROTATION_SPEED = 0.001
 VOLUME_ROTATION_MULTIPLIER = 0.015
 HUE_SHIFT_BASE = 0.5
 TRAIL_FADE_FACTOR = 0.85
+TRAIL_DECAY_CURVES = ('linear', 'gamma')
+TRAIL_DECAY_CURVE = 'linear'  # 'gamma' fades in light intensity rather than channel value
+TRAIL_DECAY_CUTOFF = 0  # Trail values that decay below this snap to black
+TRAIL_GAMMA = 2.2
 FADE_DURATION_SECONDS = 2.0
 
 # Starfield parameters
@@ -145,6 +175,16 @@ STARFIELD_STARS_FULL = 200
 STARFIELD_STARS_PREVIEW = 100
 STARFIELD_BASE_SPEED = 0.5
 STARFIELD_VOLUME_MULTIPLIER = 5.5
+STARFIELD_SIZES = (1, 3)  # Core radius range (inclusive)
+STARFIELD_GLOW_LAYERS = 3
+STARFIELD_RESPAWN_RADIUS = 50
+
+# Starfield mode: 'simulated' integrates frame by frame, 'seeded' derives every
+# frame directly from the seed and the cumulative speed curve (reproducible)
+STARFIELD_MODES = ('simulated', 'seeded')
+STARFIELD_MODE = 'simulated'
+STARFIELD_SEED = 0
+STARFIELD_MIN_DEPTH = 0.05
 
 # Beat detection parameters
 BEAT_BASS_MIN = 20
@@ -152,4 +192,78 @@ BEAT_BASS_MAX = 250
 BEAT_LOW_MID_MIN = 250
 BEAT_LOW_MID_MAX = 1000
 BEAT_THRESHOLD_MULTIPLIER = 0.3
-BEAT_DECAY_FACTOR = 0.7
\ No newline at end of file
+BEAT_DECAY_FACTOR = 0.7
+
+# Normalization parameters
+NORMALIZATION_MODES = ('peak', 'percentile', 'band_percentile')
+NORMALIZATION_MODE = 'peak'
+NORMALIZATION_PERCENTILE = 99
+NORMALIZATION_PERCENTILES = (95, 99)
+
+# Waveform tensor parameters
+WAVEFORM_POINTS_FULL = 150
+WAVEFORM_POINTS_PREVIEW = 100
+WAVEFORM_TENSOR_MEMMAP_BYTES = 256 * 1024 * 1024
+WAVEFORM_TENSOR_CHUNK_FRAMES = 4096
+
+# Ring layer sizing: every ring shape (outline plus glow) stays within
+# RING_EXTENT_FACTOR * ring size + line width + RING_GLOW_MARGIN of its center
+RING_EXTENT_FACTOR = 1.5
+RING_GLOW_MARGIN = 24
+
+# Ring sprite cache: rendered rings (glow + outline) reused across frames
+# Cache keys round ring sizes to RING_SPRITE_SIZE_STEP pixels and the beat intensity
+# (which sets glow alpha) to 1 / RING_SPRITE_BEAT_LEVELS; a miss still draws the
+# exact ring, a hit reuses the sprite drawn at the rounded values (1 = exact sizes)
+RING_SPRITE_CACHE_ENABLED = True
+RING_SPRITE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RING_SPRITE_SIZE_STEP = 1
+RING_SPRITE_BEAT_LEVELS = 64
+
+# Parallel rendering: worker processes render chunks of consecutive frames
+# (1 renders in-process, 0 uses every core). Each chunk starts with enough
+# extra warm-up frames for anything drawn before them to decay to black, so
+# opaque content matches a sequential render. Pixels that are alpha-blended over
+# the trail every frame (text overlay edges and shadow, ring glow) can settle on
+# any of several values because the decay rounds down, so they may differ after
+# a seam by up to the largest d with ceil(TRAIL_FADE_FACTOR * d) >= d: 6 levels
+# at 0.85 with the linear curve (13 with 'gamma'), however long the warm-up.
+RENDER_WORKERS = 1
+RENDER_CHUNK_SIZE = 240
+RENDER_QUEUE_FRAMES = 4             # Shared memory frame slots per worker
+
+# Encoder sink: frames queued between the renderer and FFmpeg's stdin
+# (each queued frame holds one width x height x 4 byte buffer)
+ENCODER_QUEUE_FRAMES = 8
+ENCODER_STDERR_LINES = 40
+
+# Video encoder: 'auto' picks the first working encoder in ENCODER_PREFERENCE
+# for the preset (FFmpeg's encoder list is probed once per process)
+VIDEO_ENCODER = 'auto'
+ENCODER_PRESET = 'balanced'
+ENCODER_PRESETS = ('fast', 'balanced', 'quality')
+ENCODER_THREADS = 0                 # 0 = encoder default (all cores)
+VIDEO_BITRATE = '8M'                # Bitrate-controlled (hardware) encoders
+AUDIO_BITRATE = '192k'
+ENCODER_PREFERENCE = {
+    'fast': ('h264_videotoolbox', 'h264_nvenc', 'h264_qsv', 'libx264', 'libopenh264', 'mpeg4'),
+    'balanced': ('h264_videotoolbox', 'h264_nvenc', 'h264_qsv', 'libx264', 'libopenh264', 'mpeg4'),
+    'quality': ('libx264', 'h264_videotoolbox', 'h264_nvenc', 'h264_qsv', 'libopenh264', 'mpeg4'),
+}
+
+# Raw frame format piped to FFmpeg: 'yuv420p' / 'nv12' are converted in the
+# renderer (1.5 bytes per pixel), 'rgb0' pipes the framebuffer (4 bytes per pixel)
+PIPE_PIX_FMT = 'yuv420p'
+PIPE_PIX_FMTS = ('rgb0', 'yuv420p', 'nv12')
+
+# Segment-parallel encoding: the timeline is split into this many segments,
+# each rendered and encoded by its own process, then joined without re-encoding
+# (1 = off). Each segment starts with trail warm-up frames like parallel chunks.
+RENDER_SEGMENTS = 1
+SEGMENT_STOP_TIMEOUT = 10           # Seconds a cancelled segment gets to stop its FFmpeg
+
+# Checkpointed (resumable) renders: encoded segments of this length plus an
+# animation state snapshot are kept in OUTPUT + CHECKPOINT_DIR_SUFFIX (or
+# --checkpoint-dir) until the final video is joined
+CHECKPOINT_SEGMENT_SECONDS = 60
+CHECKPOINT_DIR_SUFFIX = '.checkpoint'
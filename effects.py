@@ -3,7 +3,8 @@ Visual effects module - Main coordinator
 Imports and delegates to specialized effect modules
 """
 
-from effects_starfield import StarfieldEffect
+from config import STARFIELD_MODE, STARFIELD_SEED
+from effects_starfield import StarfieldEffect, SeededStarfieldEffect
 from effects_waveforms import WaveformRenderer
 from effects_rings import RingRenderer
 
@@ -11,13 +12,18 @@ from effects_rings import RingRenderer
 class EffectsRenderer:
     """Main effects renderer that coordinates all visual effects"""
     
-    def __init__(self, width, height, is_preview=False):
+    def __init__(self, width, height, is_preview=False, star_count=None,
+                 starfield_mode=STARFIELD_MODE, starfield_seed=STARFIELD_SEED):
         self.width = width
         self.height = height
         self.is_preview = is_preview
         
         # Initialize sub-renderers
-        self.starfield = StarfieldEffect(width, height, is_preview)
+        if starfield_mode == 'seeded':
+            self.starfield = SeededStarfieldEffect(width, height, is_preview, num_stars=star_count,
+                                                   seed=starfield_seed)
+        else:
+            self.starfield = StarfieldEffect(width, height, is_preview, num_stars=star_count)
         self.waveforms = WaveformRenderer(width, height, is_preview)
         self.rings = RingRenderer(width, height)
     
@@ -26,19 +32,20 @@ class EffectsRenderer:
         """Convenience method for color conversion"""
         return WaveformRenderer.hsv_to_rgb(h, s, v)
     
-    def update_starfield(self, volume_intensity, rotation_mode='none', direction='outward'):
+    def update_starfield(self, volume_intensity, rotation_mode='none', direction='outward',
+                         frame_idx=None):
         """Update starfield particle positions"""
-        self.starfield.update(volume_intensity, rotation_mode, direction)
+        self.starfield.update(volume_intensity, rotation_mode, direction, frame_idx)
     
     def draw_starfield(self, img, volume_intensity):
         """Draw the starfield effect"""
         self.starfield.draw(img, volume_intensity)
     
     def draw_waveforms_with_glow(self, img, frame_idx, bands, hue_offset, 
-                                 audio_processor, orientation='horizontal'):
-        """Draw frequency band waveforms"""
+                                 audio_processor, orientation='horizontal', rotation=0.0):
+        """Draw frequency band waveforms (rotation in radians, counter-clockwise)"""
         self.waveforms.draw(img, frame_idx, bands, hue_offset, 
-                          audio_processor, orientation)
+                          audio_processor, orientation, rotation)
     
     def draw_cover_and_rings(self, img, cover_image, base_size, volume_intensity, 
                             beat_intensity, rotation, hue_offset, bands, 
@@ -5,15 +5,83 @@ Uses modular ring shape system
 """
 
 import math
+from collections import OrderedDict
 import numpy as np
 from PIL import Image, ImageDraw
 import rings
+from rings.base_ring import transform_vertices
+
+from config import (
+    RING_EXTENT_FACTOR, RING_GLOW_MARGIN, RING_SPRITE_CACHE_ENABLED,
+    RING_SPRITE_CACHE_MAX_BYTES, RING_SPRITE_SIZE_STEP, RING_SPRITE_BEAT_LEVELS
+)
+
+
+class RingSpriteCache:
+    """
+    Memory-bounded LRU cache of rendered rings (all glow passes plus the outline)
+    
+    Keys are (shape, ring size, line width, beat) with size and beat quantized, so
+    frames with similar parameters share one sprite (drawn at the quantized values;
+    a frame that misses is still drawn at its exact size and beat). Ring shapes paint every pixel
+    in the ring color, so a sprite is stored as its alpha and coverage masks and
+    tinted per frame; the color does not need to be part of the key.
+    """
+    
+    def __init__(self, max_bytes=RING_SPRITE_CACHE_MAX_BYTES, size_step=RING_SPRITE_SIZE_STEP,
+                 beat_levels=RING_SPRITE_BEAT_LEVELS):
+        self.max_bytes = max_bytes
+        self.size_step = size_step
+        self.beat_levels = beat_levels
+        self.sprites = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def quantize(self, ring_size, beat):
+        """Snap ring size and beat intensity to the cache grid"""
+        ring_size = max(1, int(round(ring_size / self.size_step)) * self.size_step)
+        beat = round(beat * self.beat_levels) / self.beat_levels
+        return ring_size, beat
+    
+    def get(self, key):
+        """Cached entry for a key (marked most recently used), or None"""
+        entry = self.sprites.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.sprites.move_to_end(key)
+        return entry[0]
+    
+    def put(self, key, entry, nbytes):
+        """Store an entry, evicting least recently used ones beyond max_bytes"""
+        if nbytes > self.max_bytes:
+            return
+        self.sprites[key] = (entry, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self.sprites.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+    
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.sprites),
+            'bytes': self.total_bytes,
+        }
 
 
 class RingRenderer:
     def __init__(self, width, height):
         self.width = width
         self.height = height
+        self.sprite_cache = RingSpriteCache() if RING_SPRITE_CACHE_ENABLED else None
     
     @staticmethod
     def hsv_to_rgb(h, s, v):
@@ -80,7 +148,7 @@ class RingRenderer:
                         img.paste(cover_resized, (cover_center_x - cover_width // 2, cover_center_y - cover_height // 2), cover_resized)
                     else:
                         img.paste(cover_resized, (cover_center_x - cover_width // 2, cover_center_y - cover_height // 2))
-                    
+            
             else:  # round
                 if static_cover:
                     center_size = int(cover_base_size * 0.6)
@@ -124,25 +192,10 @@ class RingRenderer:
             
             needs_rotation = base_ring_angle != 0
             
-            if needs_rotation:
-                canvas_size = max(self.width, self.height) * 2
-                canvas_center_x = canvas_size // 2
-                canvas_center_y = canvas_size // 2
-            else:
-                canvas_size = None
-                canvas_center_x = center_x
-                canvas_center_y = center_y
-            
-            if canvas_size:
-                all_rings_layer = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-            else:
-                all_rings_layer = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-            
-            all_rings_draw = ImageDraw.Draw(all_rings_layer)
-            
             # Check if there's any stagger at all
             has_any_stagger = any(s != 0 for s in ring_stagger_offsets)
             
+            ring_specs = []
             for idx, band_idx in enumerate(rings_to_draw):
                 ring_spacing = 0.15 if ring_count <= 3 else 0.12
                 base_ring_size = base_size * (0.4 + idx * ring_spacing) * ring_scale
@@ -166,34 +219,41 @@ class RingRenderer:
                 stagger_idx = idx % len(ring_stagger_offsets) if len(ring_stagger_offsets) > 0 else 0
                 ring_stagger_angle = math.degrees(ring_stagger_offsets[stagger_idx]) if len(ring_stagger_offsets) > 0 else 0
                 
+                ring_specs.append((ring_size, ring_color, line_width, ring_stagger_angle))
+            
+            # Square layer centered on the rings, just large enough for the biggest one
+            # (or for its cached sprite, which may be drawn one size step larger)
+            layer_radius = max(self._ring_radius(self._sprite_extent(size), width)
+                               for size, _, width, _ in ring_specs)
+            layer_size = layer_radius * 2
+            all_rings_layer = Image.new('RGBA', (layer_size, layer_size), (0, 0, 0, 0))
+            
+            for ring_size, ring_color, line_width, ring_stagger_angle in ring_specs:
                 # If there's any stagger at all, each ring needs individual handling
                 # This ensures ALL rings rotate (including those with 0 stagger offset)
                 if has_any_stagger and needs_rotation:
-                    # Draw each ring on its own layer with its specific rotation
-                    if canvas_size:
-                        ring_layer = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-                    else:
-                        ring_layer = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-                    ring_draw = ImageDraw.Draw(ring_layer)
+                    # Each ring is its own sprite (sized to that ring), rotated by its specific angle
+                    ring_layer, coverage = self._ring_sprite(ring_shape_instance, ring_size, ring_color,
+                                                             line_width, beat_intensity)
+                    ring_radius = ring_layer.width // 2
                     
                     # Total angle = base rotation + this ring's stagger offset
                     total_ring_angle = base_ring_angle + ring_stagger_angle
                     
-                    self._draw_modular_ring(ring_draw, canvas_center_x, canvas_center_y, 
-                                          ring_size, ring_size, ring_shape_instance, 
-                                          ring_color, line_width, beat_intensity)
-                    
-                    # Rotate this ring by its total angle (base + stagger)
+                    # Rotate this ring about its own center by its total angle (base + stagger)
                     ring_layer = ring_layer.rotate(total_ring_angle, expand=False, 
                                                    fillcolor=(0, 0, 0, 0), 
                                                    resample=Image.BILINEAR)
                     
-                    all_rings_layer = Image.alpha_composite(all_rings_layer, ring_layer)
+                    offset = layer_radius - ring_radius
+                    all_rings_layer.alpha_composite(ring_layer, (offset, offset))
                 else:
-                    # No stagger - draw all rings on main layer, will rotate together
-                    self._draw_modular_ring(all_rings_draw, canvas_center_x, canvas_center_y, 
-                                          ring_size, ring_size, ring_shape_instance, 
-                                          ring_color, line_width, beat_intensity)
+                    # No stagger - put all rings on main layer, will rotate together
+                    # (later rings replace earlier ones where they overlap, as when drawn directly)
+                    ring_sprite, coverage = self._ring_sprite(ring_shape_instance, ring_size, ring_color,
+                                                              line_width, beat_intensity)
+                    offset = layer_radius - ring_sprite.width // 2
+                    all_rings_layer.paste(ring_sprite, (offset, offset), coverage)
             
             # Rotate all rings together if no stagger (they're all on all_rings_layer as drawn)
             if needs_rotation and not has_any_stagger:
@@ -201,22 +261,88 @@ class RingRenderer:
                                                         fillcolor=(0, 0, 0, 0), 
                                                         resample=Image.BILINEAR)
             
-            # Crop back to frame size if we used a larger canvas
-            if canvas_size:
-                offset_x = (canvas_size - self.width) // 2
-                offset_y = (canvas_size - self.height) // 2
-                all_rings_layer = all_rings_layer.crop((offset_x, offset_y, 
-                                                       offset_x + self.width, 
-                                                       offset_y + self.height))
-            
-            img.paste(all_rings_layer, (0, 0), all_rings_layer)
+            # Composite only over the rings' region (paste clips to the frame)
+            img.paste(all_rings_layer, (center_x - layer_radius, center_y - layer_radius), all_rings_layer)
+    
+    def _ring_radius(self, ring_size, line_width):
+        """
+        Half-size of a square layer holding one ring with its glow
+        Capped at the frame corners: nothing further out can rotate into view.
+        """
+        radius = math.ceil(ring_size * RING_EXTENT_FACTOR) + line_width + RING_GLOW_MARGIN
+        corner = math.ceil(math.hypot(self.width // 2 + 1, self.height // 2 + 1))
+        return max(1, min(radius, corner))
+    
+    def _sprite_extent(self, ring_size):
+        """Largest ring size a sprite for ring_size can have (cached sprites are quantized)"""
+        if self.sprite_cache is None:
+            return ring_size
+        return max(ring_size, self.sprite_cache.quantize(ring_size, 0)[0])
+    
+    def _draw_ring_masks(self, ring_shape_instance, ring_size, line_width, beat):
+        """Alpha and coverage masks of one ring drawn in white on a square layer"""
+        radius = self._ring_radius(ring_size, line_width)
+        sprite = Image.new('RGBA', (radius * 2, radius * 2), (0, 0, 0, 0))
+        self._draw_modular_ring(ImageDraw.Draw(sprite), radius, radius, ring_size, ring_size,
+                                ring_shape_instance, (255, 255, 255), line_width, beat)
+        # White wherever the ring was drawn, so the red channel is the coverage
+        return sprite.getchannel('A'), sprite.getchannel('R')
+    
+    def _ring_sprite(self, ring_shape_instance, ring_size, color, line_width, beat):
+        """
+        One ring (glow + outline) centered on a square RGBA layer, plus its coverage mask
+        Drawn in white, then tinted to color. A cache hit reuses the sprite drawn at the
+        quantized size and beat; a miss draws this frame's ring at its exact size and beat
+        and stores the quantized one for later frames.
+        """
+        if self.sprite_cache is None:
+            entry = self._draw_ring_masks(ring_shape_instance, ring_size, line_width, beat)
+        else:
+            key_size, key_beat = self.sprite_cache.quantize(ring_size, beat)
+            key = (ring_shape_instance.get_internal_name(), key_size, line_width, key_beat)
+            entry = self.sprite_cache.get(key)
+            if entry is None:
+                entry = self._draw_ring_masks(ring_shape_instance, ring_size, line_width, beat)
+                if (key_size, key_beat) == (ring_size, beat):
+                    cached = entry
+                else:
+                    cached = self._draw_ring_masks(ring_shape_instance, key_size, line_width, key_beat)
+                self.sprite_cache.put(key, cached, cached[0].width * cached[0].height * 2)
+        
+        alpha, coverage = entry
+        # Tint: color wherever the ring was drawn, black elsewhere (one lookup table per channel)
+        tinted = Image.merge('RGBA', [coverage.point([0] * 255 + [c]) for c in color] + [alpha])
+        return tinted, coverage
     
     def _draw_modular_ring(self, draw, cx, cy, w, h, ring_shape_instance, color, width, beat):
         """Draw a ring using the modular ring shape system"""
+        if ring_shape_instance.uses_geometry():
+            self._draw_geometry_ring(draw, cx, cy, w, h, ring_shape_instance, color, width, beat)
+            return
+        
         for glow in range(8, 0, -1):
             ring_shape_instance.draw_glow(draw, cx, cy, w, h, color, width, glow, beat)
         ring_shape_instance.draw_outline(draw, cx, cy, w, h, color, width)
     
+    def _draw_geometry_ring(self, draw, cx, cy, w, h, ring_shape_instance, color, width, beat):
+        """
+        Draw a ring from the shape's cached unit vertices
+        All glow passes plus the outline are placed with one vectorized transform per path.
+        """
+        glow_levels = list(range(8, 0, -1))
+        spread = np.array([glow * ring_shape_instance.GLOW_SPREAD for glow in glow_levels] + [0])
+        fills = [(*color, ring_shape_instance.glow_alpha(glow, beat)) for glow in glow_levels] + [(*color, 255)]
+        widths = [width + glow for glow in glow_levels] + [width]
+        
+        # (passes x vertices x 2) per path
+        paths = ring_shape_instance.geometry()
+        placed = [transform_vertices(path.vertices, cx, cy, w + spread, h + spread) for path in paths]
+        
+        # Outermost glow first, the outline last (same order as draw_glow / draw_outline)
+        for p, (fill, line_width) in enumerate(zip(fills, widths)):
+            for path, points in zip(paths, placed):
+                ring_shape_instance.stroke_path(draw, path, points[p], fill, line_width)
+    
     def draw_text_overlay(self, img, text, text2, beat_intensity, volume_intensity, 
                          text_fade_history, cover_image, base_size, text_size=1.0,
                          text_h_align='center', text_v_align='bottom'):
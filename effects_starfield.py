@@ -4,110 +4,291 @@ Handles starfield particle system and rendering
 """
 
 import numpy as np
-import math
 from PIL import Image, ImageDraw
 
+from config import (
+    STARFIELD_STARS_FULL, STARFIELD_STARS_PREVIEW, STARFIELD_BASE_SPEED,
+    STARFIELD_VOLUME_MULTIPLIER, STARFIELD_SIZES, STARFIELD_GLOW_LAYERS,
+    STARFIELD_RESPAWN_RADIUS, STARFIELD_SEED, STARFIELD_MIN_DEPTH
+)
+
 
 class StarfieldEffect:
-    def __init__(self, width, height, is_preview=False):
+    """
+    Starfield particle system stored as contiguous arrays (one entry per star)
+    
+    Positions, depths and sizes live in NumPy arrays so updates, rotation and
+    respawns run as whole-array operations. Drawing splats pre-rendered star
+    sprites into a single alpha mask, which is then composited in one paste.
+    """
+    
+    def __init__(self, width, height, is_preview=False, num_stars=None):
         self.width = width
         self.height = height
         self.is_preview = is_preview
-        self.stars = []
+        if num_stars is None:
+            num_stars = STARFIELD_STARS_PREVIEW if is_preview else STARFIELD_STARS_FULL
+        self.num_stars = num_stars
         self._init_starfield()
+        self._init_sprites()
     
     def _init_starfield(self):
         """Initialize starfield particles"""
-        num_stars = 100 if self.is_preview else 200
-        for _ in range(num_stars):
-            self.stars.append({
-                'x': np.random.rand() * self.width,
-                'y': np.random.rand() * self.height,
-                'z': np.random.rand() * 2,  # Depth
-                'size': np.random.randint(1, 4)
-            })
-    
-    def update(self, volume_intensity, rotation_mode='none', direction='outward'):
+        n = self.num_stars
+        self.x = np.random.rand(n) * self.width
+        self.y = np.random.rand(n) * self.height
+        self.z = np.random.rand(n) * 2  # Depth
+        self.size = np.random.randint(STARFIELD_SIZES[0], STARFIELD_SIZES[1] + 1, n)
+    
+    def _init_sprites(self):
+        """
+        Pre-render one footprint per star size
+        Each footprint stores (dy, dx) pixel offsets and a level per pixel: 0 is the
+        core, 1..STARFIELD_GLOW_LAYERS-1 the glow rings (innermost first). The
+        outermost glow ring is fully transparent, so it is left out.
+        """
+        self.sprites = {}
+        for size in range(STARFIELD_SIZES[0], STARFIELD_SIZES[1] + 1):
+            radius = size + STARFIELD_GLOW_LAYERS
+            extent = 2 * radius + 1
+            sprite = Image.new('L', (extent, extent), 0)
+            draw = ImageDraw.Draw(sprite)
+            
+            # Same nested ellipses as a single star drawn directly, outermost first
+            for glow in range(STARFIELD_GLOW_LAYERS, 0, -1):
+                r = size + glow
+                draw.ellipse([radius - r, radius - r, radius + r, radius + r],
+                             fill=STARFIELD_GLOW_LAYERS + 1 - glow)
+            draw.ellipse([radius - size, radius - size, radius + size, radius + size],
+                         fill=STARFIELD_GLOW_LAYERS + 1)
+            
+            labels = np.asarray(sprite)
+            dy, dx = np.nonzero(labels > 1)
+            self.sprites[size] = (dy - radius, dx - radius,
+                                  STARFIELD_GLOW_LAYERS + 1 - labels[dy, dx])
+        
+        # Full-frame white source for the masked paste in draw()
+        self.star_color_layer = Image.new('RGB', (self.width, self.height), (255, 255, 255))
+    
+    def update(self, volume_intensity, rotation_mode='none', direction='outward', frame_idx=None):
         """Update starfield positions based on volume, rotation, and direction"""
-        speed = 0.5 + volume_intensity * 5.5
+        speed = STARFIELD_BASE_SPEED + volume_intensity * STARFIELD_VOLUME_MULTIPLIER
         center_x, center_y = self.width / 2, self.height / 2
         
         # Direction multiplier: 1 for outward, -1 for inward
         direction_multiplier = 1 if direction == 'outward' else -1
         
-        for star in self.stars:
-            # Apply rotation if enabled
+        dx = self.x - center_x
+        dy = self.y - center_y
+        
+        # Apply rotation if enabled (rotating the offset keeps each star's distance)
+        if rotation_mode in ('cw', 'ccw'):
+            angle = speed * 0.01 * self.z
             if rotation_mode == 'cw':
-                angle = math.atan2(star['y'] - center_y, star['x'] - center_x)
-                angle -= speed * 0.01 * star['z']
-                distance = math.sqrt((star['x'] - center_x)**2 + (star['y'] - center_y)**2)
-                star['x'] = center_x + distance * math.cos(angle)
-                star['y'] = center_y + distance * math.sin(angle)
-            elif rotation_mode == 'ccw':
-                angle = math.atan2(star['y'] - center_y, star['x'] - center_x)
-                angle += speed * 0.01 * star['z']
-                distance = math.sqrt((star['x'] - center_x)**2 + (star['y'] - center_y)**2)
-                star['x'] = center_x + distance * math.cos(angle)
-                star['y'] = center_y + distance * math.sin(angle)
-            
-            # Move stars based on direction
-            dx = star['x'] - center_x
-            dy = star['y'] - center_y
+                angle = -angle
+            cos_a, sin_a = np.cos(angle), np.sin(angle)
+            dx, dy = dx * cos_a - dy * sin_a, dx * sin_a + dy * cos_a
+        
+        # Move stars radially based on direction
+        distance = np.hypot(dx, dy)
+        step = np.divide(speed * self.z * direction_multiplier, distance,
+                         out=np.zeros_like(distance), where=distance > 0)
+        self.x = center_x + dx * (1 + step)
+        self.y = center_y + dy * (1 + step)
+        
+        # Wrap around edges (different logic for inward vs outward)
+        if direction == 'outward':
+            # For outward: respawn at center when leaving edges
+            respawn = ((self.x < 0) | (self.x > self.width) |
+                       (self.y < 0) | (self.y > self.height))
+            count = int(np.count_nonzero(respawn))
+            if count:
+                self.x[respawn] = center_x + np.random.randn(count) * STARFIELD_RESPAWN_RADIUS
+                self.y[respawn] = center_y + np.random.randn(count) * STARFIELD_RESPAWN_RADIUS
+                self.z[respawn] = np.random.rand(count) * 2
+        else:
+            # For inward: respawn at a random edge when reaching the center
+            respawn = distance < STARFIELD_RESPAWN_RADIUS
+            count = int(np.count_nonzero(respawn))
+            if count:
+                self.x[respawn], self.y[respawn] = self._edge_positions(count)
+                self.z[respawn] = np.random.rand(count) * 2
+    
+    def _edge_positions(self, count):
+        """Random positions on the frame edges (top, right, bottom, left)"""
+        edge = np.random.randint(0, 4, count)
+        along_x = np.random.rand(count) * self.width
+        along_y = np.random.rand(count) * self.height
+        x = np.select([edge == 1, edge == 3], [self.width, 0], along_x)
+        y = np.select([edge == 0, edge == 2], [0, self.height], along_y)
+        return x, y
+    
+    def render_alpha(self):
+        """
+        Splat every star sprite into a (height x width) uint8 alpha map
+        Overlapping stars keep the brightest value
+        """
+        alpha = np.zeros(self.height * self.width, dtype=np.uint8)
+        
+        brightness = (150 + self.z * 50).astype(np.int32)
+        # Alpha per sprite level: core, then glow rings from the inside out
+        glow = np.arange(1, STARFIELD_GLOW_LAYERS)
+        glow_levels = brightness[:, None] * 0.3 * (1 - glow[None, :] / STARFIELD_GLOW_LAYERS)
+        levels = np.concatenate([brightness[:, None], glow_levels.astype(np.int32)], axis=1)
+        levels = levels.astype(np.uint8)
+        
+        xi = self.x.astype(np.intp)
+        yi = self.y.astype(np.intp)
+        
+        for size, (off_y, off_x, level) in self.sprites.items():
+            stars = np.flatnonzero(self.size == size)
+            if len(stars) == 0:
+                continue
             
-            distance = math.sqrt(dx*dx + dy*dy)
-            if distance > 0:
-                # Apply direction multiplier
-                star['x'] += (dx / distance) * speed * star['z'] * direction_multiplier
-                star['y'] += (dy / distance) * speed * star['z'] * direction_multiplier
+            px = xi[stars, None] + off_x[None, :]
+            py = yi[stars, None] + off_y[None, :]
+            inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+            values = levels[stars][:, level]
             
-            # Wrap around edges (different logic for inward vs outward)
-            if direction == 'outward':
-                # For outward: respawn at center when leaving edges
-                if (star['x'] < 0 or star['x'] > self.width or 
-                    star['y'] < 0 or star['y'] > self.height):
-                    star['x'] = center_x + np.random.randn() * 50
-                    star['y'] = center_y + np.random.randn() * 50
-                    star['z'] = np.random.rand() * 2
-            else:
-                # For inward: respawn at edges when reaching center
-                if distance < 50:  # Close to center
-                    # Spawn at random edge
-                    edge = np.random.randint(0, 4)
-                    if edge == 0:  # Top
-                        star['x'] = np.random.rand() * self.width
-                        star['y'] = 0
-                    elif edge == 1:  # Right
-                        star['x'] = self.width
-                        star['y'] = np.random.rand() * self.height
-                    elif edge == 2:  # Bottom
-                        star['x'] = np.random.rand() * self.width
-                        star['y'] = self.height
-                    else:  # Left
-                        star['x'] = 0
-                        star['y'] = np.random.rand() * self.height
-                    star['z'] = np.random.rand() * 2
+            # Flat indices make the unbuffered max much faster than a 2-D index tuple
+            np.maximum.at(alpha, py[inside] * self.width + px[inside], values[inside])
+        
+        return alpha.reshape(self.height, self.width)
     
     def draw(self, img, volume_intensity):
         """Draw the starfield with white stars"""
-        star_layer = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(star_layer)
+        mask = Image.fromarray(self.render_alpha(), 'L')
+        img.paste(self.star_color_layer, (0, 0), mask)
+    
+    def snapshot(self):
+        """
+        Simulation state as arrays (render checkpoints)
+        Includes NumPy's global random state, which respawns draw from
+        """
+        _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        return {
+            'x': self.x, 'y': self.y, 'z': self.z, 'size': self.size,
+            'random_keys': keys,
+            'random_pos': np.array(pos),
+            'random_gauss': np.array([has_gauss, cached_gaussian]),
+        }
+    
+    def restore(self, snapshot):
+        """Continue the simulation from a snapshot()"""
+        self.x = snapshot['x'].copy()
+        self.y = snapshot['y'].copy()
+        self.z = snapshot['z'].copy()
+        self.size = snapshot['size'].copy()
+        has_gauss, cached_gaussian = snapshot['random_gauss']
+        np.random.set_state(('MT19937', snapshot['random_keys'], int(snapshot['random_pos']),
+                             int(has_gauss), float(cached_gaussian)))
+
+
+def _splitmix64(values):
+    """SplitMix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class SeededStarfieldEffect(StarfieldEffect):
+    """
+    Starfield whose state at any frame is computed directly, without simulation
+    
+    Each star keeps a fixed depth and travels along straight (or spiralling) paths
+    between respawns. Distance travelled is proportional to the cumulative speed
+    (the running sum of 0.5 + volume * 5.5 over frames), so a star's lifetime is a
+    fixed span of cumulative speed. The generation a star is in, and the random
+    spawn point of that generation, follow from the seed, the star index and the
+    generation number alone - so any frame can be rendered first, in any order,
+    with byte-identical results.
+    """
+    
+    def __init__(self, width, height, is_preview=False, num_stars=None, seed=STARFIELD_SEED):
+        self.seed = seed
+        self.cumulative_speed = None
+        self.travelled = 0.0
+        super().__init__(width, height, is_preview, num_stars)
+    
+    def _init_starfield(self):
+        """Draw the fixed per-star properties from the seed"""
+        rng = np.random.default_rng(self.seed)
+        n = self.num_stars
+        self.z = np.maximum(rng.random(n) * 2, STARFIELD_MIN_DEPTH)  # Depth
+        self.size = rng.integers(STARFIELD_SIZES[0], STARFIELD_SIZES[1] + 1, n)
+        self.phase = rng.random(n)
+        self.star_keys = _splitmix64(np.arange(n, dtype=np.uint64) ^
+                                     _splitmix64(np.full(n, self.seed, dtype=np.uint64)))
         
-        for star in self.stars:
-            brightness = int(150 + star['z'] * 50)
-            star_color = (255, 255, 255)
-            
-            x, y = int(star['x']), int(star['y'])
-            size = star['size']
-            
-            # Draw star with glow
-            for glow in range(3, 0, -1):
-                glow_alpha = int(brightness * 0.3 * (1 - glow / 3))
-                draw.ellipse([x - size - glow, y - size - glow, 
-                             x + size + glow, y + size + glow],
-                            fill=(*star_color, glow_alpha))
-            
-            # Draw core
-            draw.ellipse([x - size, y - size, x + size, y + size],
-                        fill=(*star_color, brightness))
+        # Stars respawn once they are past the frame corners
+        self.max_radius = float(np.hypot(self.width, self.height)) / 2
+        self.x, self.y = self.state_at(0.0)
+    
+    def snapshot(self):
+        """Travelled distance and positions (everything else follows from the seed)"""
+        return {'x': self.x, 'y': self.y, 'travelled': np.array(self.travelled)}
+    
+    def restore(self, snapshot):
+        self.x = snapshot['x'].copy()
+        self.y = snapshot['y'].copy()
+        self.travelled = float(snapshot['travelled'])
+    
+    def set_speed_curve(self, volume_curve):
+        """Precompute the cumulative speed for every frame from the per-frame volume"""
+        speed = STARFIELD_BASE_SPEED + np.asarray(volume_curve, dtype=np.float64) * STARFIELD_VOLUME_MULTIPLIER
+        self.cumulative_speed = np.cumsum(speed)
+    
+    def _generation_uniforms(self, generation, count):
+        """count independent uniform [0, 1) draws per star for the given generations"""
+        keys = _splitmix64(self.star_keys ^ generation.astype(np.uint64))
+        draws = []
+        for stream in range(count):
+            bits = _splitmix64(keys + np.uint64(stream))
+            draws.append((bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53)))
+        return draws
+    
+    def state_at(self, travelled, rotation_mode='none', direction='outward'):
+        """Star positions after a given cumulative speed"""
+        center_x, center_y = self.width / 2, self.height / 2
+        
+        # Cumulative speed each star spends per generation
+        if direction == 'outward':
+            span = self.max_radius / self.z
+        else:
+            span = (self.max_radius - STARFIELD_RESPAWN_RADIUS) / self.z
+        
+        cycles = travelled / span + self.phase
+        generation = np.floor(cycles)
+        elapsed = (cycles - generation) * span
+        u1, u2 = self._generation_uniforms(generation.astype(np.int64), 2)
+        
+        if direction == 'outward':
+            # Spawn near the center (gaussian offset), then move straight out
+            spawn_radius = np.sqrt(-2 * np.log1p(-u1)) * STARFIELD_RESPAWN_RADIUS
+            angle = 2 * np.pi * u2
+            distance = spawn_radius + self.z * elapsed
+        else:
+            # Spawn beyond a random edge point, then move in towards the center
+            edge = (u1 * 4).astype(np.int64)
+            edge_x = np.select([edge == 1, edge == 3], [self.width, 0], u2 * self.width)
+            edge_y = np.select([edge == 0, edge == 2], [0, self.height], u2 * self.height)
+            angle = np.arctan2(edge_y - center_y, edge_x - center_x)
+            distance = self.max_radius - self.z * elapsed
+        
+        if rotation_mode == 'cw':
+            angle = angle - 0.01 * self.z * elapsed
+        elif rotation_mode == 'ccw':
+            angle = angle + 0.01 * self.z * elapsed
+        
+        return center_x + distance * np.cos(angle), center_y + distance * np.sin(angle)
+    
+    def update(self, volume_intensity, rotation_mode='none', direction='outward', frame_idx=None):
+        """Set star positions for a frame (from the speed curve when available)"""
+        if self.cumulative_speed is not None and frame_idx is not None:
+            frame_idx = min(frame_idx, len(self.cumulative_speed) - 1)
+            self.travelled = float(self.cumulative_speed[frame_idx])
+        else:
+            self.travelled += STARFIELD_BASE_SPEED + volume_intensity * STARFIELD_VOLUME_MULTIPLIER
         
-        img.paste(star_layer, (0, 0), star_layer)
\ No newline at end of file
+        self.x, self.y = self.state_at(self.travelled, rotation_mode, direction)
@@ -4,14 +4,18 @@ Handles drawing frequency band waveforms with glow effects
 """
 
 import math
+import numpy as np
 from PIL import Image, ImageDraw, ImageFilter
 
+from config import WAVEFORM_POINTS_FULL, WAVEFORM_POINTS_PREVIEW
+
 
 class WaveformRenderer:
     def __init__(self, width, height, is_preview=False):
         self.width = width
         self.height = height
         self.is_preview = is_preview
+        self.points = WAVEFORM_POINTS_PREVIEW if is_preview else WAVEFORM_POINTS_FULL
     
     @staticmethod
     def hsv_to_rgb(h, s, v):
@@ -41,31 +45,60 @@ class WaveformRenderer:
         
         return (r, g, b)
     
-    def draw(self, img, frame_idx, bands, hue_offset, audio_processor, orientation='horizontal'):
-        """Draw the frequency band waveforms with glow effects"""
+    def draw(self, img, frame_idx, bands, hue_offset, audio_processor, orientation='horizontal',
+             rotation=0.0):
+        """
+        Draw the frequency band waveforms with glow effects
+        rotation (radians, counter-clockwise like Image.rotate) is applied to the
+        vertices before rasterizing, about the frame center
+        """
         waveform_layer = Image.new('RGB', (self.width, self.height), (0, 0, 0))
         waveform_draw = ImageDraw.Draw(waveform_layer)
         
-        waveform_points = 100 if self.is_preview else 150
+        # (bands x points) block from the precomputed waveform tensor
+        waveforms = audio_processor.get_band_waveforms(frame_idx, bands, self.points)
         
         if orientation == 'vertical':
-            self._draw_vertical(waveform_draw, frame_idx, bands, hue_offset, 
-                              audio_processor, waveform_points)
+            self._draw_vertical(waveform_draw, waveforms, bands, hue_offset, rotation)
         else:
-            self._draw_horizontal(waveform_draw, frame_idx, bands, hue_offset, 
-                                audio_processor, waveform_points)
+            self._draw_horizontal(waveform_draw, waveforms, bands, hue_offset, rotation)
         
         blur_radius = 1 if self.is_preview else 2
         waveform_layer = waveform_layer.filter(ImageFilter.GaussianBlur(radius=blur_radius))
         
         img.paste(waveform_layer, (0, 0), None)
     
-    def _draw_vertical(self, draw, frame_idx, bands, hue_offset, audio_processor, points):
+    def _rotate(self, x, y, rotation):
+        """Rotate points (scalars or arrays) counter-clockwise about the frame center"""
+        if not rotation:
+            return x, y
+        center_x, center_y = self.width / 2, self.height / 2
+        cos_a, sin_a = math.cos(rotation), math.sin(rotation)
+        dx, dy = x - center_x, y - center_y
+        # Screen y points down, so counter-clockwise is (dx, dy) -> (dx cos + dy sin, dy cos - dx sin)
+        return center_x + dx * cos_a + dy * sin_a, center_y + dy * cos_a - dx * sin_a
+    
+    def _to_frame(self, xs, ys, rotation):
+        """Integer (x, y) vertex list for a polyline after rotation"""
+        xs, ys = self._rotate(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64), rotation)
+        return list(zip(xs.astype(np.int64).tolist(), ys.astype(np.int64).tolist()))
+    
+    def _extension(self, length, rotation):
+        """
+        Extra length past each end of a band so its rotated copy still reaches the frame corners
+        (the band ends are held flat out to half the frame diagonal)
+        """
+        if not rotation:
+            return 0.0
+        return max(0.0, (math.hypot(self.width, self.height) - length) / 2)
+    
+    def _draw_vertical(self, draw, waveforms, bands, hue_offset, rotation=0.0):
         """Draw vertical orientation waveforms (columns top to bottom)"""
         band_width = self.width // len(bands)
+        extension = self._extension(self.height, rotation)
         
         for band_idx, band in enumerate(bands):
-            waveform = audio_processor.get_band_waveform(frame_idx, band_idx, bands, points=points)
+            waveform = waveforms[band_idx].tolist()
             center_x = (band_idx + 0.5) * band_width
             
             base_hue = (hue_offset + band['hue_offset']) % 360
@@ -80,8 +113,9 @@ class WaveformRenderer:
                 
                 phase_offset = layer * 0.3
                 
-                points_left = []
-                points_right = []
+                ys = []
+                xs_left = []
+                xs_right = []
                 
                 for i, value in enumerate(waveform):
                     y = int((i / len(waveform)) * self.height)
@@ -92,11 +126,17 @@ class WaveformRenderer:
                     wave2 = math.sin((t * math.pi * 8) + (phase_offset * 2)) * (amplitude * 0.3)
                     wave3 = math.cos((t * math.pi * 2) + (hue_offset * 0.02)) * (amplitude * 0.2)
                     
-                    x_left = int(center_x - (wave1 + wave2 + wave3))
-                    x_right = int(center_x + wave1 + wave2 + wave3)
-                    
-                    points_left.append((x_left, y))
-                    points_right.append((x_right, y))
+                    ys.append(y)
+                    xs_left.append(center_x - (wave1 + wave2 + wave3))
+                    xs_right.append(center_x + wave1 + wave2 + wave3)
+                
+                if extension:
+                    ys = [-extension] + ys + [self.height + extension]
+                    xs_left = xs_left[:1] + xs_left + xs_left[-1:]
+                    xs_right = xs_right[:1] + xs_right + xs_right[-1:]
+                
+                points_left = self._to_frame(xs_left, ys, rotation)
+                points_right = self._to_frame(xs_right, ys, rotation)
                 
                 # Draw filled area
                 if layer == 0 and len(points_left) > 1:
@@ -123,7 +163,7 @@ class WaveformRenderer:
                 # Draw particles on peaks
                 for i in range(0, len(waveform), 15):
                     if waveform[i] > 0.7:
-                        y = int((i / len(waveform)) * self.height)
+                        px, py = self._rotate(center_x, int((i / len(waveform)) * self.height), rotation)
                         particle_hue = (base_hue + i * 2) % 360
                         particle_color = self.hsv_to_rgb(particle_hue, 1.0, 1.0)
                         
@@ -133,21 +173,22 @@ class WaveformRenderer:
                             glow_g = int(particle_color[1] * glow_intensity)
                             glow_b = int(particle_color[2] * glow_intensity)
                             draw.ellipse(
-                                [center_x-radius, y-radius, center_x+radius, y+radius],
+                                [px-radius, py-radius, px+radius, py+radius],
                                 fill=(glow_r, glow_g, glow_b)
                             )
                         
                         draw.ellipse(
-                            [center_x-3, y-3, center_x+3, y+3],
+                            [px-3, py-3, px+3, py+3],
                             fill=particle_color
                         )
     
-    def _draw_horizontal(self, draw, frame_idx, bands, hue_offset, audio_processor, points):
+    def _draw_horizontal(self, draw, waveforms, bands, hue_offset, rotation=0.0):
         """Draw horizontal orientation waveforms (rows left to right)"""
         band_height = self.height // len(bands)
+        extension = self._extension(self.width, rotation)
         
         for band_idx, band in enumerate(bands):
-            waveform = audio_processor.get_band_waveform(frame_idx, band_idx, bands, points=points)
+            waveform = waveforms[band_idx].tolist()
             center_y = (band_idx + 0.5) * band_height
             
             base_hue = (hue_offset + band['hue_offset']) % 360
@@ -162,8 +203,9 @@ class WaveformRenderer:
                 
                 phase_offset = layer * 0.3
                 
-                points_upper = []
-                points_lower = []
+                xs = []
+                ys_upper = []
+                ys_lower = []
                 
                 for i, value in enumerate(waveform):
                     x = int((i / len(waveform)) * self.width)
@@ -174,11 +216,17 @@ class WaveformRenderer:
                     wave2 = math.sin((t * math.pi * 8) + (phase_offset * 2)) * (amplitude * 0.3)
                     wave3 = math.cos((t * math.pi * 2) + (hue_offset * 0.02)) * (amplitude * 0.2)
                     
-                    y_upper = int(center_y + wave1 + wave2 + wave3)
-                    y_lower = int(center_y - (wave1 + wave2 + wave3))
-                    
-                    points_upper.append((x, y_upper))
-                    points_lower.append((x, y_lower))
+                    xs.append(x)
+                    ys_upper.append(center_y + wave1 + wave2 + wave3)
+                    ys_lower.append(center_y - (wave1 + wave2 + wave3))
+                
+                if extension:
+                    xs = [-extension] + xs + [self.width + extension]
+                    ys_upper = ys_upper[:1] + ys_upper + ys_upper[-1:]
+                    ys_lower = ys_lower[:1] + ys_lower + ys_lower[-1:]
+                
+                points_upper = self._to_frame(xs, ys_upper, rotation)
+                points_lower = self._to_frame(xs, ys_lower, rotation)
                 
                 # Draw filled area
                 if layer == 0 and len(points_upper) > 1:
@@ -205,7 +253,7 @@ class WaveformRenderer:
                 # Draw particles on peaks
                 for i in range(0, len(waveform), 15):
                     if waveform[i] > 0.7:
-                        x = int((i / len(waveform)) * self.width)
+                        px, py = self._rotate(int((i / len(waveform)) * self.width), center_y, rotation)
                         particle_hue = (base_hue + i * 2) % 360
                         particle_color = self.hsv_to_rgb(particle_hue, 1.0, 1.0)
                         
@@ -215,11 +263,11 @@ class WaveformRenderer:
                             glow_g = int(particle_color[1] * glow_intensity)
                             glow_b = int(particle_color[2] * glow_intensity)
                             draw.ellipse(
-                                [x-radius, center_y-radius, x+radius, center_y+radius],
+                                [px-radius, py-radius, px+radius, py+radius],
                                 fill=(glow_r, glow_g, glow_b)
                             )
                         
                         draw.ellipse(
-                            [x-3, center_y-3, x+3, center_y+3],
+                            [px-3, py-3, px+3, py+3],
                             fill=particle_color
                         )
\ No newline at end of file
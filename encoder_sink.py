@@ -0,0 +1,243 @@
+"""
+Encoder sink module
+Feeds raw frames to an FFmpeg process from a writer thread, with backpressure and stderr draining
+"""
+
+import time
+import queue
+import threading
+import subprocess
+from functools import partial
+from collections import deque
+
+import numpy as np
+
+from config import ENCODER_QUEUE_FRAMES, ENCODER_STDERR_LINES
+
+
+class EncoderError(RuntimeError):
+    """The encoder process failed; stderr holds the tail of its output"""
+    
+    def __init__(self, message, stderr=''):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+class EncoderSink:
+    """
+    Pipelined FFmpeg stdin writer
+    
+    write() copies a frame into one of a fixed set of slot buffers and queues it;
+    a writer thread sends each slot to FFmpeg as a memoryview (no bytes copies)
+    and hands it back. When every slot is queued, write() blocks until the
+    encoder catches up, so memory stays bounded at queue_frames frames.
+    write(frame, release) skips the copy for buffers the caller keeps alive
+    (shared memory frame slots): the frame is written in place and release()
+    is called once FFmpeg has it.
+    A second thread drains stderr continuously so FFmpeg never blocks on it.
+    
+    Usage:
+        sink = EncoderSink(ffmpeg_cmd)
+        sink.start()
+        for frame in frames:
+            sink.write(frame)
+        sink.close()      # raises EncoderError if FFmpeg failed
+    """
+    
+    def __init__(self, cmd, queue_frames=ENCODER_QUEUE_FRAMES):
+        self.cmd = cmd
+        self.queue_frames = max(1, queue_frames)
+        
+        self.process = None
+        self.error = None
+        self.stderr_lines = deque(maxlen=ENCODER_STDERR_LINES)
+        
+        self._slots = None
+        self._free = queue.Queue()
+        self._pending = queue.Queue(maxsize=self.queue_frames)
+        self._done = threading.Condition()
+        self._writer = None
+        self._stderr_reader = None
+        
+        # Statistics
+        self.frames_queued = 0
+        self.frames_done = 0            # Written or dropped after an error
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.write_seconds = 0.0        # Time the writer spent blocked in FFmpeg's stdin
+        self.wait_seconds = 0.0         # Time write() spent waiting for a free slot
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._start_time = None
+    
+    def start(self):
+        """Launch FFmpeg and the writer / stderr threads (FileNotFoundError if FFmpeg is missing)"""
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        self._start_time = time.perf_counter()
+        
+        self._stderr_reader = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_reader.start()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        return self
+    
+    def write(self, frame, release=None):
+        """
+        Queue one frame (any C-contiguous uint8 array)
+        Without release the frame is copied and the caller may reuse it right away;
+        with release it must stay untouched until release() is called.
+        """
+        if release is None:
+            if self._slots is None:
+                self._slots = [np.empty_like(frame) for _ in range(self.queue_frames)]
+                for slot in self._slots:
+                    self._free.put(slot)
+            
+            slot = self._take_slot()
+            np.copyto(slot, frame)
+            frame, release = slot, partial(self._free.put, slot)
+        
+        depth = self._pending.qsize() + 1
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self.frames_queued += 1
+        self._put_pending((frame, release))
+    
+    def _put_pending(self, item):
+        start = time.perf_counter()
+        while True:
+            self._raise_if_failed()
+            try:
+                self._pending.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self.wait_seconds += time.perf_counter() - start
+    
+    def _take_slot(self):
+        start = time.perf_counter()
+        while True:
+            self._raise_if_failed()
+            try:
+                slot = self._free.get(timeout=0.5)
+                break
+            except queue.Empty:
+                continue
+        self.wait_seconds += time.perf_counter() - start
+        return slot
+    
+    def _write_loop(self):
+        """Writer thread: send queued frames to FFmpeg in order"""
+        stdin = self.process.stdin
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            
+            frame, release = item
+            item = None
+            if self.error is None:
+                start = time.perf_counter()
+                try:
+                    stdin.write(memoryview(frame).cast('B'))
+                    self.write_seconds += time.perf_counter() - start
+                    self.frames_written += 1
+                    self.bytes_written += frame.nbytes
+                except (BrokenPipeError, OSError, ValueError) as e:
+                    # Keep consuming (and releasing) frames so no producer stays blocked
+                    self.error = e
+            frame = None
+            release()
+            self._frame_done()
+        
+        try:
+            stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+    
+    def _frame_done(self):
+        with self._done:
+            self.frames_done += 1
+            self._done.notify_all()
+    
+    def _drain_stderr(self):
+        """Read stderr until FFmpeg exits, keeping the last lines for error reports"""
+        for line in iter(self.process.stderr.readline, b''):
+            self.stderr_lines.append(line.decode('utf-8', errors='replace').rstrip())
+    
+    def stderr_tail(self):
+        """Last lines FFmpeg wrote to stderr"""
+        return '\n'.join(self.stderr_lines)
+    
+    def _raise_if_failed(self):
+        if self.error is not None or self.process.poll() is not None:
+            self.process.wait()
+            self._stderr_reader.join()
+            raise EncoderError(f"FFmpeg stopped accepting frames (return code {self.process.returncode})",
+                               self.stderr_tail())
+    
+    def flush(self):
+        """Wait until every queued frame is written (or dropped after an error), so released buffers are free"""
+        with self._done:
+            while self.frames_done < self.frames_queued:
+                if not self._writer.is_alive():
+                    break
+                self._done.wait(timeout=0.5)
+    
+    def close(self):
+        """Flush queued frames and wait for FFmpeg to finish (raises EncoderError on failure)"""
+        try:
+            self._put_pending(None)
+        except EncoderError:
+            self.abort()
+            raise
+        self._writer.join()
+        self.process.wait()
+        self._stderr_reader.join()
+        
+        if self.process.returncode != 0 or self.error is not None:
+            raise EncoderError(f"FFmpeg error (return code {self.process.returncode})", self.stderr_tail())
+        return self.stats()
+    
+    def abort(self):
+        """Stop FFmpeg without flushing (cancel / error paths); the output is discarded"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            # Not terminate(): FFmpeg would wait for the end of stdin to finish the file
+            self.process.kill()
+        self.process.wait()
+        if self._writer is not None and self._writer.is_alive():
+            # The writer drops (and releases) whatever is still queued, then stops
+            self._pending.put(None)
+            self._writer.join()
+        if self._stderr_reader is not None:
+            self._stderr_reader.join()
+    
+    def stats(self):
+        """Queue depth and encoder throughput so far"""
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        frames = self.frames_written
+        return {
+            'frames': frames,
+            'megabytes': self.bytes_written / (1024 * 1024),
+            'elapsed': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'encoder_busy': self.write_seconds / elapsed if elapsed > 0 else 0.0,
+            'producer_wait': self.wait_seconds,
+            'max_queue_depth': self.max_queue_depth,
+            'mean_queue_depth': self._depth_total / frames if frames else 0.0,
+        }
+    
+    def format_stats(self):
+        """One-line summary of stats()"""
+        stats = self.stats()
+        return (f"Encoding: {stats['frames']} frames ({stats['megabytes']:.0f} MB) at {stats['fps']:.1f} fps, "
+                f"stdin busy {stats['encoder_busy']:.0%}, queue depth {stats['mean_queue_depth']:.1f} avg / "
+                f"{stats['max_queue_depth']} max of {self.queue_frames}, "
+                f"render waited {stats['producer_wait']:.1f}s")
@@ -0,0 +1,238 @@
+"""
+Encoder registry module
+Video encoder backends, FFmpeg capability probing and automatic encoder selection
+"""
+
+import subprocess
+from functools import lru_cache
+
+from config import (
+    VIDEO_ENCODER, ENCODER_PRESET, ENCODER_PRESETS, ENCODER_THREADS,
+    ENCODER_PREFERENCE, VIDEO_BITRATE, AUDIO_BITRATE
+)
+
+
+class EncoderBackend:
+    """
+    One FFmpeg video encoder and its settings per preset
+    
+    preset_args maps each preset in ENCODER_PRESETS to extra output arguments.
+    pix_fmt forces the encoded pixel format (None lets the encoder choose);
+    thread_args are formatted with the thread count when one is requested.
+    """
+    
+    def __init__(self, name, label, preset_args, hardware=False, pix_fmt=None, thread_args=()):
+        self.name = name
+        self.label = label
+        self.preset_args = preset_args
+        self.hardware = hardware
+        self.pix_fmt = pix_fmt
+        self.thread_args = thread_args
+    
+    def tag_args(self, preset=ENCODER_PRESET):
+        """The codec tag arguments of a preset (kept when stream-copying its output)"""
+        args = self.preset_args[preset]
+        if '-tag:v' in args:
+            index = args.index('-tag:v')
+            return list(args[index:index + 2])
+        return []
+    
+    def output_args(self, preset=ENCODER_PRESET, threads=ENCODER_THREADS):
+        """FFmpeg output arguments selecting and configuring this encoder"""
+        args = ['-c:v', self.name, *self.preset_args[preset]]
+        if self.pix_fmt:
+            args += ['-pix_fmt', self.pix_fmt]
+        if threads:
+            args += [arg.format(threads=threads) for arg in self.thread_args]
+        return args
+
+
+ENCODER_BACKENDS = {
+    backend.name: backend for backend in (
+        EncoderBackend('h264_videotoolbox', 'H.264 (VideoToolbox)', {
+            'fast': ('-b:v', VIDEO_BITRATE, '-realtime', '1'),
+            'balanced': ('-b:v', VIDEO_BITRATE),
+            'quality': ('-b:v', VIDEO_BITRATE, '-profile:v', 'high'),
+        }, hardware=True),
+        EncoderBackend('hevc_videotoolbox', 'HEVC (VideoToolbox)', {
+            'fast': ('-b:v', VIDEO_BITRATE, '-realtime', '1', '-tag:v', 'hvc1'),
+            'balanced': ('-b:v', VIDEO_BITRATE, '-tag:v', 'hvc1'),
+            'quality': ('-b:v', VIDEO_BITRATE, '-tag:v', 'hvc1'),
+        }, hardware=True),
+        EncoderBackend('h264_nvenc', 'H.264 (NVENC)', {
+            'fast': ('-preset', 'p1', '-b:v', VIDEO_BITRATE),
+            'balanced': ('-preset', 'p4', '-b:v', VIDEO_BITRATE),
+            'quality': ('-preset', 'p7', '-b:v', VIDEO_BITRATE),
+        }, hardware=True, pix_fmt='yuv420p'),
+        EncoderBackend('h264_qsv', 'H.264 (Quick Sync)', {
+            'fast': ('-preset', 'veryfast', '-b:v', VIDEO_BITRATE),
+            'balanced': ('-preset', 'medium', '-b:v', VIDEO_BITRATE),
+            'quality': ('-preset', 'veryslow', '-b:v', VIDEO_BITRATE),
+        }, hardware=True, pix_fmt='nv12'),
+        EncoderBackend('libx264', 'H.264 (x264, CPU)', {
+            'fast': ('-preset', 'veryfast', '-crf', '23'),
+            'balanced': ('-preset', 'medium', '-crf', '20'),
+            'quality': ('-preset', 'slow', '-crf', '18'),
+        }, pix_fmt='yuv420p', thread_args=('-threads', '{threads}')),
+        EncoderBackend('libx265', 'HEVC (x265, CPU)', {
+            'fast': ('-preset', 'ultrafast', '-crf', '28', '-tag:v', 'hvc1'),
+            'balanced': ('-preset', 'medium', '-crf', '24', '-tag:v', 'hvc1'),
+            'quality': ('-preset', 'slow', '-crf', '22', '-tag:v', 'hvc1'),
+        }, pix_fmt='yuv420p', thread_args=('-x265-params', 'pools={threads}')),
+        EncoderBackend('libsvtav1', 'AV1 (SVT-AV1, CPU)', {
+            'fast': ('-preset', '10', '-crf', '35'),
+            'balanced': ('-preset', '8', '-crf', '32'),
+            'quality': ('-preset', '5', '-crf', '28'),
+        }, pix_fmt='yuv420p', thread_args=('-svtav1-params', 'lp={threads}')),
+        EncoderBackend('libopenh264', 'H.264 (OpenH264, CPU)', {
+            'fast': ('-b:v', VIDEO_BITRATE),
+            'balanced': ('-b:v', VIDEO_BITRATE),
+            'quality': ('-b:v', VIDEO_BITRATE),
+        }, pix_fmt='yuv420p', thread_args=('-threads', '{threads}')),
+        EncoderBackend('mpeg4', 'MPEG-4 Part 2 (CPU)', {
+            'fast': ('-q:v', '5'),
+            'balanced': ('-q:v', '3'),
+            'quality': ('-q:v', '2'),
+        }, pix_fmt='yuv420p', thread_args=('-threads', '{threads}')),
+    )
+}
+
+ENCODER_NAMES = ('auto',) + tuple(ENCODER_BACKENDS)
+
+
+@lru_cache(maxsize=None)
+def available_encoders():
+    """Names of the video encoders this FFmpeg build provides (probed once per process)"""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return frozenset()
+    
+    # Encoder lines follow a " ------" separator: " V....D libx264   libx264 H.264 / AVC ..."
+    listing = result.stdout.split('------', 1)[-1]
+    names = set()
+    for line in listing.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0].startswith('V'):
+            names.add(fields[1])
+    return frozenset(names)
+
+
+@lru_cache(maxsize=None)
+def encoder_works(name):
+    """
+    True if an encoder can actually encode here
+    Hardware encoders can be compiled in without a usable device, so they get a
+    one-frame test encode; software encoders only need to be listed.
+    """
+    if name not in available_encoders():
+        return False
+    backend = ENCODER_BACKENDS.get(name)
+    if backend is None or not backend.hardware:
+        return True
+    
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+             '-f', 'lavfi', '-i', 'color=black:size=256x256:duration=0.1',
+             '-frames:v', '1', *backend.output_args(ENCODER_PRESET, 0), '-f', 'null', '-'],
+            capture_output=True,
+            timeout=20
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def select_encoder(name=VIDEO_ENCODER, preset=ENCODER_PRESET):
+    """
+    Pick the encoder backend for a render
+    
+    name is an encoder from ENCODER_BACKENDS or 'auto' (the first working encoder
+    in ENCODER_PREFERENCE[preset]). A requested encoder that is missing here
+    falls back to the automatic choice with a warning.
+    """
+    if preset not in ENCODER_PRESETS:
+        raise ValueError(f"Unknown encoder preset: {preset} (choose from {', '.join(ENCODER_PRESETS)})")
+    
+    if name != 'auto':
+        if name not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder: {name} (choose from {', '.join(ENCODER_NAMES)})")
+        if encoder_works(name):
+            return ENCODER_BACKENDS[name]
+        print(f"Warning: encoder '{name}' is not available in this FFmpeg build, choosing automatically")
+    
+    for candidate in ENCODER_PREFERENCE[preset]:
+        if encoder_works(candidate):
+            return ENCODER_BACKENDS[candidate]
+    
+    # Nothing probed successfully (FFmpeg missing?): let FFmpeg report the problem
+    return ENCODER_BACKENDS[ENCODER_PREFERENCE[preset][0]]
+
+
+def _raw_input_args(width, height, fps, input_pix_fmt):
+    """FFmpeg input arguments for raw frames on stdin"""
+    # YUV frames come from pixel_formats.FrameConverter: BT.601, limited range
+    color_args = [] if input_pix_fmt == 'rgb0' else ['-color_range', 'tv', '-colorspace', 'bt470bg']
+    return [
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-s', f'{width}x{height}',
+        '-pix_fmt', input_pix_fmt,
+        *color_args,
+        '-r', str(fps),
+        '-i', '-',
+    ]
+
+
+def build_ffmpeg_command(width, height, fps, audio_path, duration, output_path,
+                         backend, preset=ENCODER_PRESET, threads=ENCODER_THREADS, input_pix_fmt='rgb0'):
+    """FFmpeg command that encodes raw frames from stdin and muxes in the audio"""
+    return [
+        'ffmpeg', '-y',
+        *_raw_input_args(width, height, fps, input_pix_fmt),
+        '-i', audio_path,
+        *backend.output_args(preset, threads),
+        '-c:a', 'aac',
+        '-b:a', AUDIO_BITRATE,
+        '-shortest',
+        '-t', str(duration),
+        output_path
+    ]
+
+
+def build_segment_command(width, height, fps, output_path,
+                          backend, preset=ENCODER_PRESET, threads=ENCODER_THREADS, input_pix_fmt='rgb0'):
+    """FFmpeg command that encodes raw frames from stdin into a video-only segment"""
+    return [
+        'ffmpeg', '-y',
+        *_raw_input_args(width, height, fps, input_pix_fmt),
+        *backend.output_args(preset, threads),
+        '-an',
+        output_path
+    ]
+
+
+def build_concat_command(list_path, audio_path, duration, output_path, backend, preset=ENCODER_PRESET):
+    """FFmpeg command that joins segments (concat demuxer list) without re-encoding and muxes in the audio"""
+    return [
+        'ffmpeg', '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_path,
+        '-i', audio_path,
+        '-map', '0:v',
+        '-map', '1:a',
+        '-c:v', 'copy',
+        *backend.tag_args(preset),
+        '-c:a', 'aac',
+        '-b:a', AUDIO_BITRATE,
+        '-shortest',
+        '-t', str(duration),
+        output_path
+    ]
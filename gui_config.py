@@ -63,6 +63,14 @@ STARFIELD_DIRECTION_OPTIONS = (
     'inward - Contracting'
 )
 
+# Starfield density options (number of stars)
+STAR_COUNT_OPTIONS = (
+    '200 - Classic',
+    '1000 - Dense',
+    '5000 - Very Dense',
+    '10000 - Galaxy'
+)
+
 # Cover timeline animation options
 COVER_TIMELINE_OPTIONS = (
     'none - Always Visible',
@@ -83,6 +91,40 @@ RESOLUTION_OPTIONS = (
 # FPS options
 FPS_OPTIONS = ('15', '30', '60')
 
+# Parallel render options (0 = every core)
+RENDER_WORKER_OPTIONS = (
+    '1 - Sequential',
+    '2 - Two Processes',
+    '4 - Four Processes',
+    '8 - Eight Processes',
+    '0 - All Cores'
+)
+
+CHUNK_SIZE_OPTIONS = (
+    '120 - Short',
+    '240 - Default',
+    '480 - Long'
+)
+
+# Video encoder options (auto = best encoder this FFmpeg build supports)
+ENCODER_OPTIONS = (
+    'auto - Best Available',
+    'h264_videotoolbox - H.264 (VideoToolbox)',
+    'hevc_videotoolbox - HEVC (VideoToolbox)',
+    'h264_nvenc - H.264 (NVENC)',
+    'h264_qsv - H.264 (Quick Sync)',
+    'libx264 - H.264 (CPU)',
+    'libx265 - HEVC (CPU)',
+    'libsvtav1 - AV1 (CPU)',
+    'mpeg4 - MPEG-4 (CPU)'
+)
+
+ENCODER_PRESET_OPTIONS = (
+    'fast - Fastest Encode',
+    'balanced - Balanced',
+    'quality - Best Quality'
+)
+
 # File dialog filters
 AUDIO_FILETYPES = [
     ("Audio files", "*.mp3 *.wav *.m4a *.flac *.ogg"),
@@ -102,6 +144,7 @@ VIDEO_FILETYPES = [
 # Preview settings
 PREVIEW_FPS = 15
 PREVIEW_RESOLUTION_DIVISOR = 2
+PREVIEW_REFRESH_DELAY_MS = 250     # Auto-refresh waits this long after the last settings change
 
 # Ring rotation stagger options
 RING_STAGGER_OPTIONS = (
@@ -126,8 +169,14 @@ DEFAULT_RING_ROTATION = "none"
 DEFAULT_RING_SHAPE = "Circle"
 DEFAULT_STARFIELD_ROTATION = "none"
 DEFAULT_STARFIELD_DIRECTION = "outward"
+DEFAULT_STAR_COUNT = STAR_COUNT_OPTIONS[0]
 DEFAULT_RESOLUTION = "1280x720"
 DEFAULT_FPS = 30
+DEFAULT_RENDER_WORKERS = '1 - Sequential'
+DEFAULT_CHUNK_SIZE = 240
+DEFAULT_ENCODER = 'auto - Best Available'
+DEFAULT_ENCODER_PRESET = 'balanced - Balanced'
+DEFAULT_CHECKPOINTS = False
 DEFAULT_STATIC_COVER = False
 DEFAULT_RING_INNER = True
 DEFAULT_RING_MIDDLE = True
@@ -4,7 +4,10 @@ GUI Controls - Output Section
 
 import tkinter as tk
 from tkinter import ttk
-from gui_config import RESOLUTION_OPTIONS, FPS_OPTIONS
+from gui_config import (
+    RESOLUTION_OPTIONS, FPS_OPTIONS, RENDER_WORKER_OPTIONS, CHUNK_SIZE_OPTIONS,
+    ENCODER_OPTIONS, ENCODER_PRESET_OPTIONS
+)
 
 
 def create_section(parent, row, controls_panel):
@@ -29,4 +32,41 @@ def create_section(parent, row, controls_panel):
     fps_combo.current(1)
     fps_combo.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=2)
     
+    # Render Workers
+    ttk.Label(section, text="Render Workers:").grid(row=4, column=0, sticky=tk.W, pady=(10, 2))
+    workers_combo = ttk.Combobox(section, textvariable=controls_panel.workers_var, 
+                                state="readonly", width=18)
+    workers_combo['values'] = RENDER_WORKER_OPTIONS
+    workers_combo.current(0)
+    workers_combo.grid(row=5, column=0, sticky=(tk.W, tk.E), pady=2)
+    
+    # Chunk Size
+    ttk.Label(section, text="Frames per Chunk:").grid(row=6, column=0, sticky=tk.W, pady=(10, 2))
+    chunk_combo = ttk.Combobox(section, textvariable=controls_panel.chunk_size_var, 
+                              state="readonly", width=18)
+    chunk_combo['values'] = CHUNK_SIZE_OPTIONS
+    chunk_combo.current(1)
+    chunk_combo.grid(row=7, column=0, sticky=(tk.W, tk.E), pady=2)
+    
+    # Encoder
+    ttk.Label(section, text="Encoder:").grid(row=8, column=0, sticky=tk.W, pady=(10, 2))
+    encoder_combo = ttk.Combobox(section, textvariable=controls_panel.encoder_var, 
+                                state="readonly", width=18)
+    encoder_combo['values'] = ENCODER_OPTIONS
+    encoder_combo.current(0)
+    encoder_combo.grid(row=9, column=0, sticky=(tk.W, tk.E), pady=2)
+    
+    # Encoder Preset
+    ttk.Label(section, text="Encoder Preset:").grid(row=10, column=0, sticky=tk.W, pady=(10, 2))
+    preset_combo = ttk.Combobox(section, textvariable=controls_panel.encoder_preset_var, 
+                               state="readonly", width=18)
+    preset_combo['values'] = ENCODER_PRESET_OPTIONS
+    preset_combo.current(1)
+    preset_combo.grid(row=11, column=0, sticky=(tk.W, tk.E), pady=2)
+    
+    # Checkpoints (full renders can be resumed after a crash or cancel)
+    ttk.Checkbutton(section, text="Resumable (save checkpoints)", 
+                   variable=controls_panel.checkpoints_var).grid(row=12, column=0, 
+                                                                 sticky=tk.W, pady=(10, 2))
+    
     return section
\ No newline at end of file
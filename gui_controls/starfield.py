@@ -48,4 +48,16 @@ def create_section(parent, row, panel):
         width=20
     )
     starfield_direction_combo.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=2)
-    starfield_direction_combo.bind('<<ComboboxSelected>>', lambda e: panel.callback.preview_dirty())
\ No newline at end of file
+    starfield_direction_combo.bind('<<ComboboxSelected>>', lambda e: panel.callback.preview_dirty())
+    
+    # Star count
+    ttk.Label(section_frame, text="Density:").grid(row=3, column=0, sticky=tk.W, pady=2)
+    star_count_combo = ttk.Combobox(
+        section_frame,
+        textvariable=panel.star_count_var,
+        values=STAR_COUNT_OPTIONS,
+        state='readonly',
+        width=20
+    )
+    star_count_combo.grid(row=3, column=1, sticky=(tk.W, tk.E), pady=2)
+    star_count_combo.bind('<<ComboboxSelected>>', lambda e: panel.callback.preview_dirty())
\ No newline at end of file
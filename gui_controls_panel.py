@@ -25,6 +25,9 @@ class ControlsPanel:
         # Build the controls panel
         self.frame = self._create_scrollable_frame()
         self._build_controls()
+        
+        # Every settings change marks the preview dirty (auto-refresh)
+        self._watch_settings()
     
     def _get_text_color(self):
         """Get appropriate text color based on system appearance"""
@@ -67,6 +70,7 @@ class ControlsPanel:
         self.ring_shape_var = tk.StringVar(value=DEFAULT_RING_SHAPE)
         self.starfield_rot_var = tk.StringVar(value=DEFAULT_STARFIELD_ROTATION)
         self.starfield_direction_var = tk.StringVar(value=DEFAULT_STARFIELD_DIRECTION)
+        self.star_count_var = tk.StringVar(value=DEFAULT_STAR_COUNT)
         
         # Waveform orientation
         self.waveform_orientation_var = tk.StringVar(value=DEFAULT_WAVEFORM_ORIENTATION)
@@ -96,6 +100,11 @@ class ControlsPanel:
         self.text_v_align_var = tk.StringVar(value=DEFAULT_TEXT_V_ALIGN)
         self.resolution_var = tk.StringVar(value=DEFAULT_RESOLUTION)
         self.fps_var = tk.IntVar(value=DEFAULT_FPS)
+        self.workers_var = tk.StringVar(value=DEFAULT_RENDER_WORKERS)
+        self.chunk_size_var = tk.StringVar(value=CHUNK_SIZE_OPTIONS[1])
+        self.encoder_var = tk.StringVar(value=DEFAULT_ENCODER)
+        self.encoder_preset_var = tk.StringVar(value=DEFAULT_ENCODER_PRESET)
+        self.checkpoints_var = tk.BooleanVar(value=DEFAULT_CHECKPOINTS)
     
     def _create_scrollable_frame(self):
         """Create scrollable container for controls"""
@@ -184,6 +193,12 @@ class ControlsPanel:
         # 9-11. Action Buttons
         actions.create_section(self.frame, row, self)
     
+    def _watch_settings(self):
+        """Call callback.preview_dirty() whenever a settings variable changes"""
+        for name, variable in vars(self).items():
+            if isinstance(variable, tk.Variable) and name != 'live_preview_var':
+                variable.trace_add('write', lambda *args: self.callback.preview_dirty())
+    
     def get_rotation_value(self, combo_value):
         """Extract rotation axis from combo box value"""
         return combo_value.split(' - ')[0]
@@ -200,6 +215,10 @@ class ControlsPanel:
         """Extract starfield direction from combo box value"""
         return combo_value.split(' - ')[0]
     
+    def get_star_count_value(self, combo_value):
+        """Extract star count from combo box value"""
+        return int(combo_value.split(' - ')[0])
+    
     def get_palette_value(self, display_name):
         """Convert display name to internal palette name"""
         return display_name.lower()
@@ -263,6 +282,7 @@ class ControlsPanel:
             'ring_rotation_speed': self.ring_rot_speed_var.get(),
             'starfield_rotation': self.get_rotation_value(self.starfield_rot_var.get()),
             'starfield_direction': self.get_starfield_direction_value(self.starfield_direction_var.get()),
+            'star_count': self.get_star_count_value(self.star_count_var.get()),
             'cover_shape': self.cover_shape_var.get(),
             'cover_size': self.cover_size_var.get(),
             'disable_rings': not self.rings_enabled_var.get(),
@@ -273,7 +293,12 @@ class ControlsPanel:
             'waveform_orientation': self.waveform_orientation_var.get(),
             'static_cover': self.static_cover_var.get(),
             'cover_timeline': self.get_timeline_value(self.cover_timeline_var.get()),
-            'ring_stagger': self.get_stagger_value(self.ring_stagger_var.get())
+            'ring_stagger': self.get_stagger_value(self.ring_stagger_var.get()),
+            'workers': int(self.workers_var.get().split(' - ')[0]),
+            'chunk_size': int(self.chunk_size_var.get().split(' - ')[0]),
+            'encoder': self.encoder_var.get().split(' - ')[0],
+            'encoder_preset': self.encoder_preset_var.get().split(' - ')[0],
+            'checkpoints': self.checkpoints_var.get()
         }
         
         print(f"DEBUG Settings: ring_count={settings['ring_count']}, ring_shape={settings['ring_shape']}")
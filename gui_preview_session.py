@@ -0,0 +1,61 @@
+"""
+GUI Preview Session
+Keeps one MusicVisualizer alive between preview updates and applies only the settings that changed
+"""
+
+from visualizer import MusicVisualizer, LIVE_SETTINGS
+
+# Settings that need a new visualizer (fresh audio analysis or framebuffers)
+REBUILD_SETTINGS = ('audio_path', 'resolution')
+
+
+class PreviewSession:
+    """
+    Long-lived visualizer for GUI preview frames
+    
+    The first update() builds the MusicVisualizer (audio analysis, cover image,
+    effect renderers). Later updates diff the controls' settings against the
+    previous ones and hand only the changed LIVE_SETTINGS to update_settings(),
+    so a palette or ring shape change costs one frame render instead of a
+    decode and STFT. Render-only settings (fps, workers, encoder) are ignored.
+    """
+    
+    def __init__(self):
+        self.visualizer = None
+        self.settings = None
+    
+    def _build(self, settings):
+        w, h = settings['resolution']
+        return MusicVisualizer(
+            audio_path=settings['audio_path'],
+            fps=10,
+            resolution=(w, h),
+            preview_seconds=None,
+            **{name: settings[name] for name in LIVE_SETTINGS if name in settings}
+        )
+    
+    def update(self, settings):
+        """
+        Bring the visualizer up to date with settings
+        Returns the names of the settings applied, or None if the visualizer was rebuilt
+        """
+        if self.visualizer is None or any(settings.get(name) != self.settings.get(name)
+                                          for name in REBUILD_SETTINGS):
+            self.visualizer = self._build(settings)
+            self.settings = dict(settings)
+            return None
+        
+        changes = {name: settings[name] for name in LIVE_SETTINGS
+                   if name in settings and settings[name] != self.settings.get(name)}
+        if changes:
+            self.visualizer.update_settings(**changes)
+        self.settings = dict(settings)
+        return list(changes)
+    
+    def render_frame(self):
+        """Preview frame one eighth into the song, rendered from a fresh animation state"""
+        vis = self.visualizer
+        total_frames = len(vis.audio_processor.times)
+        frame_idx = min(total_frames // 8, total_frames - 1)
+        vis.reset_state()
+        return vis.render_frame(frame_idx, total_frames)
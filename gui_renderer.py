@@ -18,6 +18,10 @@ try:
     import numpy as np
     from PIL import Image
     from visualizer import MusicVisualizer
+    from encoder_sink import EncoderSink, EncoderError
+    from encoders import select_encoder, build_ffmpeg_command
+    from render_checkpoint import CheckpointedRenderer
+    from gui_preview_session import PreviewSession
     from gui_config import *
 except ImportError as e:
     print(f"Import error: {e}")
@@ -33,6 +37,8 @@ class RenderManager:
         self.preview = preview_panel
 
         self.preview_thread = None
+        self.preview_session = PreviewSession()
+        self.preview_pending = False
         self.render_thread = None
         self.is_rendering = False
         self.cancel_render_flag = False
@@ -48,11 +54,15 @@ class RenderManager:
         if not self.controls.audio_path:
             return
         if self.preview_thread and self.preview_thread.is_alive():
-            print("Preview already generating, skipping...")
+            # Settings changed mid-preview: render again once this one is shown
+            self.preview_pending = True
             return
 
-        self.preview.clear()
-        self.preview.set_info("Generating Preview - Please Wait...", "blue")
+        if self.preview_session.visualizer is None:
+            self.preview.clear()
+            self.preview.set_info("Generating Preview - Please Wait...", "blue")
+        else:
+            self.preview.set_info("Updating preview...", "blue")
         self.controls.preview_btn.config(state='disabled')
 
         self.preview_thread = threading.Thread(
@@ -63,63 +73,41 @@ class RenderManager:
     def _generate_preview_background(self):
         try:
             settings = self.controls.get_settings()
-            w, h = settings['resolution']
-
-            self.root.after(0, lambda: self.preview.set_info("Loading audio..."))
+            start_time = time.perf_counter()
 
-            vis = MusicVisualizer(
-                audio_path=settings['audio_path'],
-                cover_image_path=settings['cover_image_path'],
-                fps=10,
-                resolution=(w, h),
-                text_overlay=settings['text_overlay'],
-                text_overlay2=settings['text_overlay2'],
-                text_size=settings.get('text_size', 1.0),
-                text_h_align=settings.get('text_h_align', 'center'),
-                text_v_align=settings.get('text_v_align', 'bottom'),
-                color_palette=settings['color_palette'],
-                waveform_rotation=settings['waveform_rotation'],
-                waveform_rotation_speed=settings.get('waveform_rotation_speed', 1.0),
-                ring_rotation=settings['ring_rotation'],
-                ring_rotation_speed=settings.get('ring_rotation_speed', 1.0),
-                starfield_rotation=settings['starfield_rotation'],
-                starfield_direction=settings.get('starfield_direction', 'outward'),
-                preview_seconds=None,
-                cover_shape=settings['cover_shape'],
-                cover_size=settings['cover_size'],
-                disable_rings=settings['disable_rings'],
-                disable_starfield=settings['disable_starfield'],
-                ring_shape=settings['ring_shape'],
-                ring_count=settings.get('ring_count', 3),
-                ring_scale=settings['ring_scale'],
-                waveform_orientation=settings['waveform_orientation'],
-                static_cover=settings['static_cover'],
-                cover_timeline=settings.get('cover_timeline', 'none'),
-                ring_stagger=settings.get('ring_stagger', 'none'),
-            )
+            if self.preview_session.visualizer is None:
+                self.root.after(0, lambda: self.preview.set_info("Loading audio..."))
+            changes = self.preview_session.update(settings)
 
             self.root.after(0, lambda: self.preview.set_info("Rendering frame..."))
+            preview_img = self.preview_session.render_frame()
 
-            frame_idx = min(
-                len(vis.audio_processor.times) // 8,
-                len(vis.audio_processor.times) - 1,
-            )
-            total_frames = len(vis.audio_processor.times)
-            preview_img = vis.render_frame(frame_idx, total_frames)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            if changes is None:
+                print(f"Preview: built visualizer and rendered in {elapsed_ms:.0f} ms")
+            else:
+                print(f"Preview: applied {', '.join(changes) or 'no changes'} "
+                      f"and rendered in {elapsed_ms:.0f} ms")
 
             self.root.after(0, lambda: self._display_preview(preview_img))
 
         except Exception as err:
             import traceback
             traceback.print_exc()
+            # Start from a fresh visualizer next time
+            self.preview_session = PreviewSession()
             self.root.after(0, lambda: self._preview_error(str(err)))
 
     def _display_preview(self, img):
         self.preview.display_image(img)
         self.preview.set_info("Preview Ready - Hardware Acceleration Enabled", "green")
         self.controls.preview_btn.config(state='normal')
+        if self.preview_pending:
+            self.preview_pending = False
+            self.generate_preview()
 
     def _preview_error(self, error_msg):
+        self.preview_pending = False
         self.preview.set_info(f"Error: {error_msg}", "red")
         self.controls.preview_btn.config(state='normal')
         from tkinter import messagebox
@@ -129,7 +117,7 @@ class RenderManager:
     # Render lifecycle
     # ------------------------------------------------------------------
 
-    def start_render(self, output_path, preview_seconds=None):
+    def start_render(self, output_path, preview_seconds=None, resume=False):
         if self.is_rendering:
             return False
 
@@ -154,7 +142,7 @@ class RenderManager:
 
         self.render_thread = threading.Thread(
             target=self._render_video_background,
-            args=(output_path, preview_seconds),
+            args=(output_path, preview_seconds, resume),
             daemon=True,
         )
         self.render_thread.start()
@@ -219,35 +207,18 @@ class RenderManager:
     # Main render thread
     # ------------------------------------------------------------------
 
-    def _render_video_background(self, output_path, preview_seconds=None):
-        process = None
-        stderr_thread = None
-        stderr_output = ['']  # list so the inner function can mutate it
-
-        def _drain_stderr():
-            """Read all of stderr so the pipe buffer never fills and blocks FFmpeg."""
-            try:
-                stderr_output[0] = process.stderr.read().decode('utf-8')
-            except Exception:
-                pass
+    def _render_video_background(self, output_path, preview_seconds=None, resume=False):
+        sink = None
 
-        def _cleanup(terminate=False):
-            """Best-effort cleanup of process and stderr thread."""
-            if process is None:
-                return
-            if process.stdin and not process.stdin.closed:
-                try:
-                    process.stdin.close()
-                except Exception:
-                    pass
-            if terminate and process.poll() is None:
-                process.terminate()
-            process.wait()
-            if stderr_thread is not None:
-                stderr_thread.join()
+        def _cleanup():
+            """Best-effort cleanup of the encoder."""
+            if sink is not None:
+                sink.abort()
 
         try:
             settings = self.controls.get_settings()
+            # Checkpointed renders are in-process; resuming needs the same encoder settings
+            checkpoint = resume or (settings.get('checkpoints') and not preview_seconds)
 
             vis = MusicVisualizer(
                 audio_path=settings['audio_path'],
@@ -267,6 +238,7 @@ class RenderManager:
                 ring_rotation_speed=settings.get('ring_rotation_speed', 1.0),
                 starfield_rotation=settings['starfield_rotation'],
                 starfield_direction=settings.get('starfield_direction', 'outward'),
+                star_count=settings.get('star_count'),
                 preview_seconds=preview_seconds,
                 cover_shape=settings['cover_shape'],
                 cover_size=settings['cover_size'],
@@ -279,6 +251,10 @@ class RenderManager:
                 static_cover=settings['static_cover'],
                 cover_timeline=settings.get('cover_timeline', 'none'),
                 ring_stagger=settings.get('ring_stagger', 'none'),
+                workers=1 if checkpoint else settings.get('workers', 1),
+                chunk_size=settings.get('chunk_size', DEFAULT_CHUNK_SIZE),
+                encoder=settings.get('encoder', 'auto'),
+                encoder_preset=settings.get('encoder_preset', 'balanced'),
             )
 
             render_duration = vis.duration
@@ -294,84 +270,63 @@ class RenderManager:
             prev_img = vis.render_frame(prev_idx, total_frames)
             self.root.after(0, lambda: self.preview.display_image(prev_img))
 
-            # Start FFmpeg
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',
-                '-f', 'rawvideo',
-                '-vcodec', 'rawvideo',
-                '-s', f'{vis.width}x{vis.height}',
-                '-pix_fmt', 'rgb24',
-                '-r', str(vis.fps),
-                '-i', '-',
-                '-i', settings['audio_path'],
-                '-c:v', 'h264_videotoolbox',
-                '-b:v', '8M',
-                '-c:a', 'aac',
-                '-b:a', '192k',
-                '-shortest',
-                '-t', str(render_duration),
-                output_path,
-            ]
-
-            try:
-                process = subprocess.Popen(
-                    ffmpeg_cmd,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+            if checkpoint:
+                # Segments and state snapshots go to OUTPUT.checkpoint until the video is joined
+                completed = CheckpointedRenderer(vis, resume=resume).encode(
+                    lambda frames_done: self.update_progress(frames_done, total_frames, vis),
                 )
-            except FileNotFoundError:
-                raise Exception("FFmpeg not found. Please install: brew install ffmpeg")
-
-            # Start draining stderr immediately so the pipe never blocks
-            stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
-            stderr_thread.start()
-
-            # --- Frame loop ---
-            for frame_idx in range(total_frames):
-                # Check for cancellation
-                if not self.update_progress(frame_idx + 1, total_frames, vis):
-                    _cleanup(terminate=True)
+                if not completed:
                     self.root.after(0, self._render_cancelled)
                     return
+                self.root.after(0, lambda: self._render_complete(output_path))
+                return
 
-                img = vis.render_frame(frame_idx, total_frames)
+            # Start FFmpeg with the best available encoder for the chosen preset
+            backend = select_encoder(settings.get('encoder', 'auto'),
+                                     settings.get('encoder_preset', 'balanced'))
+            print(f"Encoder: {backend.label} [{backend.name}]")
+            ffmpeg_cmd = build_ffmpeg_command(
+                vis.width, vis.height, vis.fps, settings['audio_path'], render_duration,
+                output_path, backend, settings.get('encoder_preset', 'balanced'),
+                input_pix_fmt=vis.pix_fmt,
+            )
 
-                try:
-                    process.stdin.write(img.tobytes())
-                except (BrokenPipeError, OSError):
-                    # FFmpeg died while we were writing
-                    _cleanup(terminate=False)
-                    if self.cancel_render_flag:
-                        self.root.after(0, self._render_cancelled)
-                    else:
-                        self.root.after(0, lambda: self._render_error(
-                            "FFmpeg process terminated unexpectedly during frame write"
-                        ))
-                    return
+            # The sink writes from its own thread and drains stderr continuously,
+            # so neither a slow encoder nor a full stderr pipe stalls rendering
+            sink = EncoderSink(ffmpeg_cmd)
+            try:
+                sink.start()
+            except FileNotFoundError:
+                raise Exception("FFmpeg not found. Please install: brew install ffmpeg")
 
-            # --- All frames written ---
-            process.stdin.close()
+            # --- Frame loop (update_progress returns False on cancel) ---
+            completed = vis.write_frames(
+                total_frames, sink,
+                lambda frames_done: self.update_progress(frames_done, total_frames, vis),
+            )
+            if not completed:
+                self.root.after(0, self._render_cancelled)
+                return
 
+            # --- All frames queued ---
             self.root.after(0, lambda: self.controls.progress_label.config(
                 text="Finalizing video...\n(encoding audio)"
             ))
 
-            # Wait for FFmpeg to finish muxing. stderr_thread keeps the pipe drained
-            # so this will not deadlock regardless of how much output FFmpeg produces.
-            process.wait()
-            stderr_thread.join()
+            sink.close()
+            print(sink.format_stats())
+            self.root.after(0, lambda: self._render_complete(output_path))
 
-            if process.returncode == 0:
-                self.root.after(0, lambda: self._render_complete(output_path))
+        except EncoderError as error:
+            _cleanup()
+            if self.cancel_render_flag:
+                self.root.after(0, self._render_cancelled)
             else:
-                err = f"FFmpeg error (code {process.returncode}):\n{stderr_output[0][-500:]}"
+                err = f"{error}:\n{error.stderr[-500:]}"
                 self.root.after(0, lambda: self._render_error(err))
 
         except Exception as error:
-            # If we got here with a live process, clean it up
-            if process is not None and process.poll() is None:
-                _cleanup(terminate=True)
+            _cleanup()
 
             import traceback
             traceback.print_exc()
@@ -5,7 +5,18 @@ Main entry point for the application
 """
 
 import argparse
+from config import (
+    ANALYSIS_CACHE_DIR, STARFIELD_MODES, STARFIELD_MODE, STARFIELD_SEED,
+    TRAIL_DECAY_CURVES, TRAIL_DECAY_CURVE, RENDER_WORKERS, RENDER_CHUNK_SIZE,
+    NORMALIZATION_MODES, NORMALIZATION_MODE, NORMALIZATION_PERCENTILE,
+    ANALYSIS_DECIMATION, ANALYSIS_DECIMATION_MODES,
+    VIDEO_ENCODER, ENCODER_PRESET, ENCODER_PRESETS, ENCODER_THREADS,
+    PIPE_PIX_FMT, PIPE_PIX_FMTS, RENDER_SEGMENTS
+)
+from encoders import ENCODER_NAMES
 from visualizer import MusicVisualizer
+from segment_renderer import SegmentRenderer
+from render_checkpoint import CheckpointedRenderer
 
 
 def main():
@@ -99,6 +110,22 @@ Starfield Direction:
                        choices=['outward', 'inward'],
                        help='Starfield direction: outward (expanding) or inward (contracting) (default: outward)')
     
+    parser.add_argument('--star-count', type=int, metavar='N',
+                       help='Number of starfield stars (default: 200, 100 in preview)')
+    
+    parser.add_argument('--starfield-mode', default=STARFIELD_MODE,
+                       choices=STARFIELD_MODES,
+                       help='Starfield engine: simulated (frame by frame) or seeded '
+                            '(reproducible, any frame computed directly) (default: simulated)')
+    
+    parser.add_argument('--seed', type=int, default=STARFIELD_SEED,
+                       help=f'Random seed for the seeded starfield (default: {STARFIELD_SEED})')
+    
+    parser.add_argument('--trail-curve', default=TRAIL_DECAY_CURVE,
+                       choices=TRAIL_DECAY_CURVES,
+                       help='Trail afterimage decay curve: linear (channel values) or gamma '
+                            '(light intensity, softer bright trails) (default: linear)')
+    
     parser.add_argument('--preview', type=int, metavar='SECONDS',
                        help='Preview mode: render only first N seconds')
     
@@ -147,8 +174,66 @@ Starfield Direction:
                        choices=['top', 'middle', 'bottom'],
                        help='Text vertical alignment (default: bottom)')
     
+    parser.add_argument('--normalization', default=NORMALIZATION_MODE, choices=NORMALIZATION_MODES,
+                       help=f'Magnitude normalization: peak, percentile (robust to loud transients) '
+                            f'or band_percentile (each band scaled independently) (default: {NORMALIZATION_MODE})')
+    
+    parser.add_argument('--normalization-percentile', type=float, default=NORMALIZATION_PERCENTILE,
+                       help=f'Percentile used by percentile normalization modes (default: {NORMALIZATION_PERCENTILE})')
+    
+    parser.add_argument('--analysis-decimation', default=ANALYSIS_DECIMATION,
+                       choices=ANALYSIS_DECIMATION_MODES,
+                       help=f'Decimate audio before the STFT when every band allows it (auto) or '
+                            f'always analyze at the full sample rate (off) (default: {ANALYSIS_DECIMATION})')
+    
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Disable the persistent analysis cache')
+    
+    parser.add_argument('--cache-dir', default=ANALYSIS_CACHE_DIR,
+                       help=f'Analysis cache directory (default: {ANALYSIS_CACHE_DIR})')
+    
+    parser.add_argument('--workers', type=int, default=RENDER_WORKERS,
+                       help=f'Render worker processes; 1 renders in-process, 0 uses every core '
+                            f'(default: {RENDER_WORKERS})')
+    
+    parser.add_argument('--chunk-size', type=int, default=RENDER_CHUNK_SIZE,
+                       help=f'Frames per parallel render chunk (default: {RENDER_CHUNK_SIZE})')
+    
+    parser.add_argument('--encoder', default=VIDEO_ENCODER, choices=ENCODER_NAMES,
+                       help='Video encoder; auto picks the best one this FFmpeg build supports, '
+                            'and a missing encoder falls back to auto (default: auto)')
+    
+    parser.add_argument('--encoder-preset', default=ENCODER_PRESET, choices=ENCODER_PRESETS,
+                       help=f'Encoder speed/quality trade-off (default: {ENCODER_PRESET})')
+    
+    parser.add_argument('--encoder-threads', type=int, default=ENCODER_THREADS,
+                       help='Encoder threads for CPU encoders (default: 0 = encoder default)')
+    
+    parser.add_argument('--pix-fmt', default=PIPE_PIX_FMT, choices=PIPE_PIX_FMTS,
+                       help='Raw frame format piped to FFmpeg; yuv420p and nv12 are converted by the '
+                            f'renderer (workers) at 1.5 bytes per pixel, rgb0 uses 4 (default: {PIPE_PIX_FMT})')
+    
+    parser.add_argument('--segments', type=int, default=RENDER_SEGMENTS,
+                       help='Split the timeline into this many segments, each rendered and encoded by its '
+                            'own process and joined without re-encoding; replaces --workers '
+                            f'(default: {RENDER_SEGMENTS} = single encode)')
+    
+    parser.add_argument('--checkpoint', action='store_true',
+                       help='Render in checkpointed segments that --resume can continue after a crash '
+                            '(in-process; kept in OUTPUT.checkpoint until the video is finished)')
+    
+    parser.add_argument('--checkpoint-dir',
+                       help='Checkpoint directory (implies --checkpoint; default: OUTPUT.checkpoint)')
+    
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted checkpointed render with the same settings and audio')
+    
     args = parser.parse_args()
     
+    checkpoint = args.checkpoint or args.resume or args.checkpoint_dir is not None
+    if checkpoint and args.segments > 1:
+        parser.error('--segments cannot be combined with checkpointed renders')
+    
     # Determine resolution
     if args.phone_vertical:
         width, height = 1080, 1920
@@ -183,18 +268,31 @@ Starfield Direction:
     print(f"  Ring Count: {args.ring_count}")
     print(f"  Starfield Rotation: {args.starfield_rotation}")
     print(f"  Starfield Direction: {args.starfield_direction}")
+    if args.star_count:
+        print(f"  Star Count: {args.star_count}")
+    if args.starfield_mode != 'simulated':
+        print(f"  Starfield Mode: {args.starfield_mode} (seed {args.seed})")
     if args.preview:
         print(f"  Preview: {args.preview} seconds")
     if args.cover:
         print(f"  Cover: {args.cover} ({args.cover_shape}, {args.cover_size}x)")
     if args.cover_timeline != 'none':
         print(f"  Cover Timeline: {args.cover_timeline}")
+    if args.normalization != NORMALIZATION_MODE:
+        print(f"  Normalization: {args.normalization} (p{args.normalization_percentile:g})")
     if args.disable_rings:
         print(f"  Rings: Disabled")
     if args.disable_starfield:
         print(f"  Starfield: Disabled")
     if args.text:
         print(f"  Text: {args.text}")
+    if args.segments > 1:
+        print(f"  Segments: {args.segments}")
+    elif checkpoint:
+        print(f"  Checkpoints: {args.checkpoint_dir or 'next to output'}{' (resuming)' if args.resume else ''}")
+    elif args.workers != 1:
+        print(f"  Workers: {args.workers or 'all cores'} ({args.chunk_size}-frame chunks)")
+    print(f"  Encoder: {args.encoder} ({args.encoder_preset})")
     print(f"  Output: {args.output}\n")
     
     # Create and render
@@ -216,6 +314,9 @@ Starfield Direction:
         ring_rotation_speed=args.ring_rotation_speed,
         starfield_rotation=args.starfield_rotation,
         starfield_direction=args.starfield_direction,
+        star_count=args.star_count,
+        starfield_mode=args.starfield_mode,
+        starfield_seed=args.seed,
         preview_seconds=args.preview,
         cover_shape=args.cover_shape,
         cover_size=args.cover_size,
@@ -227,10 +328,27 @@ Starfield Direction:
         waveform_orientation=args.waveform_orientation,
         static_cover=args.static_cover,
         cover_timeline=args.cover_timeline,
-        ring_stagger=args.ring_stagger
+        ring_stagger=args.ring_stagger,
+        normalization=args.normalization,
+        normalization_percentile=args.normalization_percentile,
+        analysis_decimation=args.analysis_decimation,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        trail_decay_curve=args.trail_curve,
+        workers=1 if args.segments > 1 or checkpoint else args.workers,
+        chunk_size=args.chunk_size,
+        encoder=args.encoder,
+        encoder_preset=args.encoder_preset,
+        encoder_threads=args.encoder_threads,
+        pix_fmt=args.pix_fmt
     )
     
-    visualizer.render()
+    if args.segments > 1:
+        SegmentRenderer(visualizer, args.segments).render()
+    elif checkpoint:
+        CheckpointedRenderer(visualizer, args.checkpoint_dir, resume=args.resume).render()
+    else:
+        visualizer.render()
 
 
 if __name__ == '__main__':
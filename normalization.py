@@ -0,0 +1,122 @@
+"""
+Normalization statistics module
+Computes magnitude statistics once per analysis so the render path never rescans the spectrogram
+"""
+
+import numpy as np
+
+from config import NORMALIZATION_MODES, NORMALIZATION_PERCENTILES
+
+
+class NormalizationStats:
+    """
+    Global and per-band magnitude statistics for a band layout
+    
+    Modes:
+        peak            - divide by the global spectrogram maximum (original behaviour)
+        percentile      - divide by a global percentile of the band bins, so a single
+                          loud transient does not flatten the whole track
+        band_percentile - divide each band by its own percentile
+    """
+    
+    def __init__(self, magnitude, band_slices, mode='peak', percentile=99,
+                 percentiles=NORMALIZATION_PERCENTILES, global_max=None):
+        if mode not in NORMALIZATION_MODES:
+            raise ValueError(f"Unknown normalization mode '{mode}', "
+                             f"expected one of {NORMALIZATION_MODES}")
+        
+        self.mode = mode
+        self.percentile = percentile
+        self.percentiles = tuple(sorted(set(percentiles) | {percentile}))
+        
+        # Callers holding a truncated spectrogram pass the full-spectrum peak in
+        if global_max is None:
+            global_max = float(np.max(magnitude)) if magnitude.size else 0.0
+        self.global_max = global_max
+        
+        # Per-band statistics over the raw bin magnitudes of each band
+        num_bands = len(band_slices)
+        self.band_max = np.zeros(num_bands, dtype=np.float32)
+        self.band_percentiles = {p: np.zeros(num_bands, dtype=np.float32) for p in self.percentiles}
+        
+        for band_idx, band_slice in enumerate(band_slices):
+            band_data = magnitude[band_slice]
+            if band_data.size == 0:
+                continue
+            self.band_max[band_idx] = band_data.max()
+            values = np.percentile(band_data, self.percentiles)
+            for p, value in zip(self.percentiles, values):
+                self.band_percentiles[p][band_idx] = value
+        
+        # Global percentiles over the bins covered by the band layout
+        covered = [s for s in band_slices if s.stop > s.start]
+        if covered:
+            start = min(s.start for s in covered)
+            stop = max(s.stop for s in covered)
+            values = np.percentile(magnitude[start:stop], self.percentiles)
+        else:
+            values = np.zeros(len(self.percentiles))
+        self.global_percentiles = {p: float(v) for p, v in zip(self.percentiles, values)}
+    
+    def to_dict(self):
+        """Serialize the statistics (mode-independent) to plain JSON-compatible values"""
+        return {
+            'global_max': self.global_max,
+            'band_max': self.band_max.tolist(),
+            'band_percentiles': {str(p): v.tolist() for p, v in self.band_percentiles.items()},
+            'global_percentiles': {str(p): v for p, v in self.global_percentiles.items()},
+        }
+    
+    @classmethod
+    def from_dict(cls, data, mode='peak', percentile=99):
+        """
+        Rebuild statistics from to_dict() output
+        Returns None if the requested percentile was not stored
+        """
+        if mode not in NORMALIZATION_MODES:
+            raise ValueError(f"Unknown normalization mode '{mode}', "
+                             f"expected one of {NORMALIZATION_MODES}")
+        
+        global_percentiles = {float(p): v for p, v in data['global_percentiles'].items()}
+        if float(percentile) not in global_percentiles:
+            return None
+        
+        stats = cls.__new__(cls)
+        stats.mode = mode
+        stats.percentile = percentile
+        stats.percentiles = tuple(sorted(global_percentiles))
+        stats.global_max = data['global_max']
+        stats.global_percentiles = global_percentiles
+        stats.band_max = np.array(data['band_max'], dtype=np.float32)
+        stats.band_percentiles = {float(p): np.array(v, dtype=np.float32)
+                                  for p, v in data['band_percentiles'].items()}
+        return stats
+    
+    def scale(self):
+        """Global reference magnitude for the current mode"""
+        if self.mode == 'peak':
+            value = self.global_max
+        else:
+            value = self.global_percentiles[self.percentile]
+        return value if value > 0 else 1
+    
+    def band_scale(self, band_idx):
+        """Reference magnitude for a single band in the current mode"""
+        if self.mode == 'band_percentile':
+            value = float(self.band_percentiles[self.percentile][band_idx])
+            return value if value > 0 else 1
+        return self.scale()
+    
+    def band_scales(self):
+        """Reference magnitude for every band as an array"""
+        return np.array([self.band_scale(i) for i in range(len(self.band_max))], dtype=np.float32)
+    
+    def normalize_volume(self, value):
+        """Normalize an average band magnitude (scalar or array) to a 0-1 volume intensity"""
+        volume = value / self.scale()
+        return volume if self.mode == 'peak' else np.minimum(volume, 1.0)
+    
+    def normalize_band(self, values, band_idx):
+        """Normalize raw band magnitudes to the 0-1 range"""
+        values = values / self.band_scale(band_idx)
+        return values if self.mode == 'peak' else np.minimum(values, 1.0)
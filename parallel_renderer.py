@@ -0,0 +1,173 @@
+"""
+Parallel renderer module
+Renders chunks of frames in worker processes and streams them back in order
+"""
+
+import os
+import sys
+import traceback
+import contextlib
+import multiprocessing
+
+from config import RENDER_WORKERS, RENDER_CHUNK_SIZE, RENDER_QUEUE_FRAMES
+from pixel_formats import frame_shape
+from shared_frame_ring import SharedFrameRing
+
+
+def split_chunks(total_frames, chunk_size):
+    """[(start, stop), ...] covering range(total_frames) in chunk_size steps"""
+    return [(start, min(start + chunk_size, total_frames))
+            for start in range(0, total_frames, chunk_size)]
+
+
+def _worker_main(init_kwargs, states, total_frames, chunks, warmup, ring, errors):
+    """
+    Worker process: build a visualizer and render its chunks in order
+    Each chunk starts warmup frames early (from a black trail); those frames are
+    rendered for their trail only. Sent frames are converted straight into ring slots.
+    """
+    try:
+        from visualizer import MusicVisualizer
+        
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            visualizer = MusicVisualizer(**init_kwargs)
+        
+        for start, stop in chunks:
+            first = max(0, start - warmup)
+            visualizer.seek(states, first)
+            for frame_idx in range(first, stop):
+                if frame_idx < start:
+                    visualizer.render_frame_buffer(frame_idx, total_frames, states)
+                else:
+                    frame = visualizer.render_frame_buffer(frame_idx, total_frames, states)
+                    visualizer.frame_converter.convert(frame, out=ring.acquire_slot())
+                    ring.publish()
+    except Exception:
+        errors.put(traceback.format_exc())
+
+
+class ParallelRenderer:
+    """
+    Process-pool frame renderer with ordered reassembly
+    
+    The animation state of every frame is precomputed in the parent (including the
+    simulated starfield at each chunk's first frame), so chunks are independent apart
+    from the trail afterimage, which each chunk rebuilds with warm-up frames
+    (FrameCompositor.warmup_frames). Workers load the parent's analysis from the
+    cache. Opaque content matches a sequential render; pixels alpha-blended over
+    the trail every frame (text overlay, ring glow) may stay a few levels off after
+    a chunk start (bound in config.py, RENDER_WORKERS).
+    
+    Chunks are dealt round-robin; each worker renders its chunks in order into
+    its own SharedFrameRing. Reading chunk k from worker k % workers therefore
+    yields frames in order, while the rings bound how far ahead workers run.
+    Frames stay in shared memory from the worker's conversion to FFmpeg's stdin.
+    """
+    
+    def __init__(self, visualizer, workers=RENDER_WORKERS, chunk_size=RENDER_CHUNK_SIZE,
+                 queue_frames=RENDER_QUEUE_FRAMES):
+        self.visualizer = visualizer
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.queue_frames = queue_frames
+        self.rings = []
+    
+    def frames(self, total_frames):
+        """
+        Yield (frame, release) pairs in order, in the visualizer's pipe format
+        Each frame is a view of a shared memory slot; release() hands the slot back
+        to its worker and must be called in frame order. Workers are stopped when
+        the generator finishes; close() frees the slots once no views are left.
+        """
+        visualizer = self.visualizer
+        warmup = visualizer.compositor.warmup_frames()
+        chunks = split_chunks(total_frames, self.chunk_size)
+        workers = max(1, min(self.workers, len(chunks)))
+        states = visualizer.precompute_frame_states(
+            total_frames, [max(0, start - warmup) for start, _ in chunks])
+        
+        # Workers render in-process themselves, with the parent's settings and analysis
+        init_kwargs = visualizer.worker_kwargs()
+        
+        context = multiprocessing.get_context()
+        shape = frame_shape(visualizer.width, visualizer.height, visualizer.pix_fmt)
+        errors = context.Queue()
+        self.rings = [SharedFrameRing(self.queue_frames, shape, context) for _ in range(workers)]
+        processes = [
+            context.Process(
+                target=_worker_main,
+                args=(init_kwargs, states, total_frames, chunks[w::workers], warmup, self.rings[w], errors),
+                daemon=True
+            )
+            for w in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        try:
+            for chunk_idx, (start, stop) in enumerate(chunks):
+                w = chunk_idx % workers
+                for _ in range(start, stop):
+                    yield self._receive(processes[w], self.rings[w], errors), self.rings[w].release
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+    
+    def write_frames(self, total_frames, sink, progress=None):
+        """
+        Render every frame into an EncoderSink without copying it out of shared memory
+        progress(frames_done) is called before each frame; returning False cancels
+        (the sink is then aborted). Returns False if cancelled.
+        """
+        frames = self.frames(total_frames)
+        frame = None
+        try:
+            for number, (frame, release) in enumerate(frames, 1):
+                if progress is not None and progress(number) is False:
+                    sink.abort()
+                    return False
+                sink.write(frame, release)
+            sink.flush()
+            return True
+        except BaseException:
+            sink.abort()
+            raise
+        finally:
+            frame = release = None
+            frames.close()
+            self.close()
+    
+    def iter_frames(self, total_frames):
+        """Yield independent copies of every frame in order"""
+        frames = self.frames(total_frames)
+        try:
+            for frame, release in frames:
+                copy = frame.copy()
+                frame = None
+                release()
+                yield copy
+        finally:
+            frames.close()
+            self.close()
+    
+    def close(self):
+        """Free the shared memory rings"""
+        for ring in self.rings:
+            ring.close()
+        self.rings = []
+    
+    @staticmethod
+    def _receive(process, ring, errors):
+        """Next frame from a worker's ring (raises if the worker failed or died)"""
+        while True:
+            frame = ring.next_frame(timeout=1.0)
+            if frame is not None:
+                return frame
+            
+            if not errors.empty():
+                print(errors.get(), file=sys.stderr)
+                raise RuntimeError("Render worker failed (traceback above)")
+            if not process.is_alive():
+                raise RuntimeError(f"Render worker exited unexpectedly (exit code {process.exitcode})")
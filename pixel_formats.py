@@ -0,0 +1,90 @@
+"""
+Pixel format module
+Converts finished RGBX frames to the raw format piped to FFmpeg (rgb0, yuv420p or nv12)
+"""
+
+import numpy as np
+import cv2
+
+from config import PIPE_PIX_FMT, PIPE_PIX_FMTS
+
+# BT.601 limited-range chroma, the same conversion FFmpeg applies to RGB input
+# Rows are U (Cb) and V (Cr); columns R, G, B, padding byte, offset
+CHROMA_MATRIX = np.array([
+    [-37.797, -74.203, 112.0, 0.0, 128 * 255],
+    [112.0, -93.786, -18.214, 0.0, 128 * 255],
+]) / 255
+
+
+def frame_shape(width, height, pix_fmt):
+    """Array shape of one piped frame"""
+    if pix_fmt == 'rgb0':
+        return (height, width, 4)
+    # 4:2:0 formats: full-size Y plane followed by the half-size chroma plane(s)
+    return (height * 3 // 2, width)
+
+
+def supports(width, height, pix_fmt):
+    """True if frames of this size can be piped in pix_fmt (4:2:0 needs even sizes)"""
+    return pix_fmt == 'rgb0' or (width % 2 == 0 and height % 2 == 0)
+
+
+class FrameConverter:
+    """
+    RGBX -> pipe format conversion into a preallocated output buffer
+    
+    Luma comes from OpenCV's I420 conversion; chroma is computed from 2x2 block
+    averages (OpenCV point-samples it) and written straight into the plane views.
+    The result matches FFmpeg's own conversion to within +-1 on smooth content.
+    """
+    
+    def __init__(self, width, height, pix_fmt=PIPE_PIX_FMT):
+        if pix_fmt not in PIPE_PIX_FMTS:
+            raise ValueError(f"Unknown pipe pixel format: {pix_fmt}")
+        if not supports(width, height, pix_fmt):
+            raise ValueError(f"{pix_fmt} needs an even frame size, got {width}x{height}")
+        
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        if pix_fmt == 'rgb0':
+            return
+        
+        self.output = np.empty(frame_shape(width, height, pix_fmt), dtype=np.uint8)
+        self.half = np.empty((height // 2, width // 2, 4), dtype=np.uint8)
+        self.chroma_planes = self._chroma_planes(self.output)
+    
+    def _chroma_planes(self, output):
+        """(plane view, matrix) pairs for the chroma part of an output buffer"""
+        half_w, half_h = self.width // 2, self.height // 2
+        chroma = output[self.height:].reshape(-1)
+        if self.pix_fmt == 'nv12':
+            return [(chroma.reshape(half_h, half_w, 2), CHROMA_MATRIX)]
+        plane_size = half_w * half_h
+        return [
+            (chroma[:plane_size].reshape(half_h, half_w), CHROMA_MATRIX[:1]),
+            (chroma[plane_size:].reshape(half_h, half_w), CHROMA_MATRIX[1:]),
+        ]
+    
+    def convert(self, frame, out=None):
+        """
+        Pipe-format frame, valid until the next convert()
+        With out (a frame_shape() uint8 array, e.g. a shared memory slot) the result
+        is written there instead; without it rgb0 returns the frame itself.
+        """
+        if self.pix_fmt == 'rgb0':
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
+        
+        if out is None:
+            out, chroma_planes = self.output, self.chroma_planes
+        else:
+            chroma_planes = self._chroma_planes(out)
+        
+        cv2.cvtColor(frame, cv2.COLOR_RGBA2YUV_I420, dst=out)
+        cv2.resize(frame, (self.width // 2, self.height // 2), dst=self.half, interpolation=cv2.INTER_AREA)
+        for plane, matrix in chroma_planes:
+            cv2.transform(self.half, matrix, dst=plane)
+        return out
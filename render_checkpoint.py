@@ -0,0 +1,235 @@
+"""
+Render checkpoint module
+Resumable renders: encoded segments plus an animation state snapshot kept in a work directory
+"""
+
+import os
+import json
+import time
+import traceback
+
+import numpy as np
+from tqdm import tqdm
+
+from config import CHECKPOINT_SEGMENT_SECONDS, CHECKPOINT_DIR_SUFFIX
+from analysis_cache import hash_file
+from encoders import select_encoder, build_segment_command
+from encoder_sink import EncoderSink, EncoderError
+from segment_renderer import concat_segments
+
+
+# Bump when the manifest or snapshot layout changes
+CHECKPOINT_VERSION = 1
+
+_MANIFEST_FILE = 'checkpoint.json'
+
+# Constructor arguments that change neither the frames nor the encoded segments
+# (the encoder is checked as the backend actually chosen)
+_UNCHECKED_SETTINGS = ('audio_path', 'output_path', 'use_cache', 'cache_dir',
+                       'workers', 'chunk_size', 'encoder', 'encoder_threads')
+
+
+def default_checkpoint_dir(output_path):
+    """Checkpoint directory used for an output file unless one is given"""
+    return output_path + CHECKPOINT_DIR_SUFFIX
+
+
+def read_manifest(checkpoint_dir):
+    """Manifest of the checkpoint in a directory, or None if there is none"""
+    try:
+        with open(os.path.join(checkpoint_dir, _MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Write JSON atomically so a crash never leaves a partial manifest"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+class CheckpointedRenderer:
+    """
+    In-process render in fixed-length segments that can be resumed after a crash
+    
+    Each segment is encoded to its own video-only file in the checkpoint directory.
+    Once a segment is complete, the visualizer's state snapshot (rotations, hue,
+    beat state, starfield arrays, trail buffer) is saved next to it and the
+    manifest, written last, records both. A resumed render checks the manifest
+    against the current settings and audio content, restores the snapshot and
+    continues with the next segment, so the frames match an uninterrupted render
+    (ring glow alpha may differ by up to 2 levels, as the ring sprite cache starts cold).
+    The finished segments are joined like SegmentRenderer's and the checkpoint
+    files are removed.
+    """
+    
+    def __init__(self, visualizer, checkpoint_dir=None, resume=False,
+                 segment_seconds=CHECKPOINT_SEGMENT_SECONDS):
+        self.visualizer = visualizer
+        self.checkpoint_dir = checkpoint_dir or default_checkpoint_dir(visualizer.output_path)
+        self.resume = resume
+        self.segment_frames = max(1, round(segment_seconds * visualizer.fps))
+    
+    def _identity(self, backend, total_frames):
+        """Manifest fields a checkpoint must match to be resumed"""
+        visualizer = self.visualizer
+        settings = {name: value for name, value in visualizer.init_kwargs.items()
+                    if name not in _UNCHECKED_SETTINGS}
+        # Value the visualizer may have adjusted after construction
+        settings.update(pix_fmt=visualizer.pix_fmt)
+        
+        if visualizer.analysis_cache is not None:
+            audio_hash = visualizer.analysis_cache.content_hash(visualizer.audio_path)
+        else:
+            audio_hash = hash_file(visualizer.audio_path)
+        
+        # JSON round trip so tuples compare equal to the lists read back from disk
+        return json.loads(json.dumps({
+            'version': CHECKPOINT_VERSION,
+            'audio_hash': audio_hash,
+            'settings': settings,
+            'encoder': backend.name,
+            'total_frames': total_frames,
+            'segment_frames': self.segment_frames,
+        }, sort_keys=True, default=str))
+    
+    def _segment_path(self, index, extension, partial=False):
+        suffix = '.partial' if partial else ''
+        return os.path.join(self.checkpoint_dir, f'segment_{index:04d}{suffix}{extension}')
+    
+    def _load(self, identity):
+        """Restore the checkpoint's snapshot; returns the number of completed segments"""
+        manifest = read_manifest(self.checkpoint_dir)
+        if manifest is None:
+            print(f"No checkpoint in {self.checkpoint_dir}, starting from the beginning")
+            self._clear()
+            return 0
+        
+        differences = [key for key in identity if key != 'settings' and manifest.get(key) != identity[key]]
+        saved_settings = manifest.get('settings', {})
+        differences += sorted(name for name in set(saved_settings) | set(identity['settings'])
+                              if saved_settings.get(name) != identity['settings'].get(name))
+        if differences:
+            raise ValueError(f"Checkpoint in {self.checkpoint_dir} does not match this render "
+                             f"({', '.join(differences)}); render without resuming to start over")
+        
+        completed = manifest['completed']
+        if completed:
+            with np.load(os.path.join(self.checkpoint_dir, manifest['state'])) as snapshot:
+                self.visualizer.restore_state(dict(snapshot))
+        print(f"Resuming from checkpoint: {completed} segment(s) done, "
+              f"frame {manifest['frames_done']}/{identity['total_frames']}")
+        return completed
+    
+    def _save(self, identity, completed, frames_done):
+        """Record a completed segment: snapshot first, then the manifest pointing at it"""
+        state_name = f'state_{completed:04d}.npz'
+        state_path = os.path.join(self.checkpoint_dir, state_name)
+        temp_path = os.path.join(self.checkpoint_dir, f'state_{completed:04d}.tmp.npz')
+        np.savez(temp_path, **self.visualizer.snapshot_state())
+        os.replace(temp_path, state_path)
+        
+        _write_json(os.path.join(self.checkpoint_dir, _MANIFEST_FILE),
+                    dict(identity, completed=completed, frames_done=frames_done,
+                         state=state_name, updated=time.time()))
+        
+        # The previous snapshot is superseded once the manifest points at the new one
+        previous_path = os.path.join(self.checkpoint_dir, f'state_{completed - 1:04d}.npz')
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+    
+    def _clear(self):
+        """Remove this renderer's files from the checkpoint directory"""
+        if not os.path.isdir(self.checkpoint_dir):
+            return
+        for name in os.listdir(self.checkpoint_dir):
+            if (name.startswith(('segment_', 'state_', _MANIFEST_FILE))
+                    or name == 'segments.txt'):
+                os.remove(os.path.join(self.checkpoint_dir, name))
+    
+    def encode(self, progress=None):
+        """
+        Render the visualizer's video to its output_path
+        progress(frames_done) is called before each frame; returning False cancels and
+        keeps the completed segments for a later resume. Returns False if cancelled;
+        raises ValueError if a checkpoint to resume does not match the render.
+        """
+        visualizer = self.visualizer
+        render_duration, total_frames = visualizer.render_span()
+        backend = select_encoder(visualizer.encoder, visualizer.encoder_preset)
+        identity = self._identity(backend, total_frames)
+        spans = [(start, min(start + self.segment_frames, total_frames))
+                 for start in range(0, total_frames, self.segment_frames)]
+        
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        if self.resume:
+            completed = self._load(identity)
+        else:
+            if read_manifest(self.checkpoint_dir) is not None:
+                print(f"Discarding the previous checkpoint in {self.checkpoint_dir}")
+            self._clear()
+            completed = 0
+        
+        extension = os.path.splitext(visualizer.output_path)[1] or '.mp4'
+        for index in range(completed, len(spans)):
+            start, stop = spans[index]
+            partial_path = self._segment_path(index, extension, partial=True)
+            sink = EncoderSink(build_segment_command(
+                visualizer.width, visualizer.height, visualizer.fps, partial_path, backend,
+                visualizer.encoder_preset, visualizer.encoder_threads, visualizer.pix_fmt
+            ))
+            sink.start()
+            try:
+                for frame_idx in range(start, stop):
+                    if progress is not None and progress(frame_idx + 1) is False:
+                        sink.abort()
+                        return False
+                    sink.write(visualizer.render_output_frame(frame_idx, total_frames))
+                sink.close()
+            except BaseException:
+                sink.abort()
+                raise
+            
+            os.replace(partial_path, self._segment_path(index, extension))
+            self._save(identity, index + 1, stop)
+        
+        concat_segments([self._segment_path(index, extension) for index in range(len(spans))],
+                        os.path.join(self.checkpoint_dir, 'segments.txt'), visualizer.audio_path,
+                        render_duration, visualizer.output_path, backend, visualizer.encoder_preset)
+        self._clear()
+        try:
+            os.rmdir(self.checkpoint_dir)
+        except OSError:
+            pass
+        return True
+    
+    def render(self):
+        """Command-line render: progress bar and messages like MusicVisualizer.render()"""
+        visualizer = self.visualizer
+        render_duration, total_frames = visualizer.render_span()
+        if visualizer.preview_seconds:
+            print(f"PREVIEW MODE: Rendering first {render_duration:.1f}s")
+        print(f"Rendering {total_frames} frames at {visualizer.fps} fps, "
+              f"checkpointing every {self.segment_frames} frames to {self.checkpoint_dir}")
+        
+        try:
+            with tqdm(total=total_frames) as progress_bar:
+                completed = self.encode(lambda frames_done: progress_bar.update(frames_done - progress_bar.n))
+            if completed:
+                print(f"\nVideo saved to: {visualizer.output_path}")
+        except FileNotFoundError:
+            print("ERROR: FFmpeg not found. Please install it:")
+            print("  brew install ffmpeg")
+        except ValueError as e:
+            print(f"\nERROR: {e}")
+        except EncoderError as e:
+            print(f"\n{e}:")
+            print(e.stderr[-1000:])
+        except KeyboardInterrupt:
+            print("\nRender interrupted by user (continue it with --resume)")
+        except Exception as e:
+            print(f"\nError during render: {e}")
+            traceback.print_exc()
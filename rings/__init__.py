@@ -1,6 +1,9 @@
 """
 Ring Shapes Package
 Auto-discovers and loads all ring shape classes
+
+A shape either draws itself (draw_glow / draw_outline) or returns unit vertex
+arrays from get_geometry(); discovery records which API each shape implements.
 """
 
 import os
@@ -12,11 +15,22 @@ from rings.base_ring import BaseRing
 # Global registry of ring shapes
 _ring_registry = {}
 _display_name_to_internal = {}
+_ring_apis = {}
+
+
+def _detect_api(ring_class):
+    """'geometry' (get_geometry), 'draw' (draw_glow / draw_outline) or None"""
+    if ring_class.get_geometry is not BaseRing.get_geometry:
+        return 'geometry'
+    if (ring_class.draw_glow is not BaseRing.draw_glow and
+            ring_class.draw_outline is not BaseRing.draw_outline):
+        return 'draw'
+    return None
 
 
 def _discover_ring_shapes():
     """Auto-discover all ring shape classes in the rings directory"""
-    global _ring_registry, _display_name_to_internal
+    global _ring_registry, _display_name_to_internal, _ring_apis
     
     # Get the directory where this __init__.py file is located
     rings_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,6 +47,12 @@ def _discover_ring_shapes():
                 # Find all classes in the module that inherit from BaseRing
                 for name, obj in inspect.getmembers(module, inspect.isclass):
                     if issubclass(obj, BaseRing) and obj != BaseRing:
+                        api = _detect_api(obj)
+                        if api is None:
+                            print(f"Warning: Ring shape {name} in {filename} implements neither "
+                                  f"get_geometry nor draw_glow/draw_outline")
+                            continue
+                        
                         # Instantiate the ring shape
                         ring_instance = obj()
                         internal_name = ring_instance.get_internal_name()
@@ -41,7 +61,8 @@ def _discover_ring_shapes():
                         # Register it
                         _ring_registry[internal_name] = ring_instance
                         _display_name_to_internal[display_name] = internal_name
-                        
+                        _ring_apis[internal_name] = api
+            
             except Exception as e:
                 print(f"Warning: Could not load ring shape from {filename}: {e}")
 
@@ -79,6 +100,20 @@ def get_ring_shape(internal_name):
     return shapes.get(internal_name)
 
 
+def get_ring_api(internal_name):
+    """
+    Get which API a ring shape implements
+    
+    Returns:
+    --------
+    str or None
+        'geometry' for vertex-array shapes, 'draw' for shapes that draw
+        themselves, None if the shape is not registered
+    """
+    get_all_ring_shapes()
+    return _ring_apis.get(internal_name)
+
+
 def get_ring_display_names():
     """
     Get all ring shape display names, alphabetically sorted
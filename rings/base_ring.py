@@ -5,9 +5,56 @@ All ring shapes must inherit from this class
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+
+class RingPath:
+    """
+    One stroke of a ring shape in unit coordinates
+    
+    vertices is an (N x 2) array relative to the ring center, where (1, 1) is
+    (w, h) away from it. A closed path is stroked as a polygon outline; an open
+    path as a polyline (joint is passed through to ImageDraw.line).
+    """
+    
+    def __init__(self, vertices, closed=True, joint=None):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.closed = closed
+        self.joint = joint
+
+
+def transform_vertices(vertices, cx, cy, scale_x, scale_y, angle=0.0):
+    """
+    Scale, rotate (radians, counter-clockwise on screen) and translate unit vertices
+    scale_x / scale_y may be arrays (one entry per pass); the result then has a
+    leading axis with one (N x 2) vertex array per pass.
+    """
+    scale_x = np.asarray(scale_x, dtype=np.float64)[..., None]
+    scale_y = np.asarray(scale_y, dtype=np.float64)[..., None]
+    x = vertices[:, 0] * scale_x
+    y = vertices[:, 1] * scale_y
+    if angle:
+        cos_a, sin_a = np.cos(angle), np.sin(angle)
+        x, y = x * cos_a + y * sin_a, y * cos_a - x * sin_a
+    return np.stack([cx + x, cy + y], axis=-1)
+
 
 class BaseRing(ABC):
-    """Abstract base class for all ring shapes"""
+    """
+    Abstract base class for all ring shapes
+    
+    A shape implements one of two APIs:
+    - draw_glow() / draw_outline(): draw directly with ImageDraw
+    - get_geometry(): return its outline as RingPath unit vertex arrays; the
+      renderer scales and places them (draw_glow / draw_outline still work,
+      drawing from the geometry)
+    """
+    
+    # Glow alpha: (GLOW_ALPHA_BASE + beat * GLOW_ALPHA_BEAT) * (1 - glow_level / 8)
+    GLOW_ALPHA_BASE = 200
+    GLOW_ALPHA_BEAT = 55
+    # Pixels each glow level adds to w and h (geometry shapes)
+    GLOW_SPREAD = 2
     
     @abstractmethod
     def get_name(self):
@@ -19,7 +66,46 @@ class BaseRing(ABC):
         """Return the internal identifier (lowercase, no spaces)"""
         pass
     
-    @abstractmethod
+    def get_geometry(self):
+        """
+        Unit outline of this ring shape (optional)
+        
+        Returns:
+        --------
+        list of RingPath, or None if the shape draws itself
+            Called once per shape (see geometry()); must not depend on size
+        """
+        return None
+    
+    def uses_geometry(self):
+        """True if this shape implements get_geometry()"""
+        return type(self).get_geometry is not BaseRing.get_geometry
+    
+    def glow_alpha(self, glow_level, beat):
+        """Alpha of a glow layer"""
+        return int((self.GLOW_ALPHA_BASE + beat * self.GLOW_ALPHA_BEAT) * (1 - glow_level / 8))
+    
+    def geometry(self):
+        """Cached get_geometry() result"""
+        geometry = getattr(self, '_cached_geometry', None)
+        if geometry is None:
+            geometry = self._cached_geometry = self.get_geometry()
+        return geometry
+    
+    @staticmethod
+    def stroke_path(draw, path, points, fill, width):
+        """Stroke one RingPath given its transformed (N x 2) vertices"""
+        points = points.ravel().tolist()
+        if path.closed:
+            draw.polygon(points, outline=fill, width=width)
+        else:
+            draw.line(points, fill=fill, width=width, joint=path.joint)
+    
+    def stroke_paths(self, draw, cx, cy, w, h, fill, width):
+        """Stroke the geometry at a given size"""
+        for path in self.geometry():
+            self.stroke_path(draw, path, transform_vertices(path.vertices, cx, cy, w, h), fill, width)
+    
     def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
         """
         Draw a single glow layer for this ring shape
@@ -41,9 +127,12 @@ class BaseRing(ABC):
         beat : float
             Beat intensity (0.0 to 1.0) for pulsing effects
         """
-        pass
+        if not self.uses_geometry():
+            raise NotImplementedError(f"{type(self).__name__} implements neither draw_glow nor get_geometry")
+        spread = glow_level * self.GLOW_SPREAD
+        self.stroke_paths(draw, cx, cy, w + spread, h + spread,
+                          (*color, self.glow_alpha(glow_level, beat)), width + glow_level)
     
-    @abstractmethod
     def draw_outline(self, draw, cx, cy, w, h, color, width):
         """
         Draw the main ring outline
@@ -61,4 +150,6 @@ class BaseRing(ABC):
         width : int
             Line thickness
         """
-        pass
\ No newline at end of file
+        if not self.uses_geometry():
+            raise NotImplementedError(f"{type(self).__name__} implements neither draw_outline nor get_geometry")
+        self.stroke_paths(draw, cx, cy, w, h, (*color, 255), width)
@@ -3,59 +3,32 @@ Outlined Kite Shape
 Symmetric kite (quadrilateral with unequal diagonals)
 """
 
-from rings.base_ring import BaseRing
+from rings.base_ring import BaseRing, RingPath
 
 
 class KiteOutline(BaseRing):
+    # Glow stays on the outline (no spread) with a softer alpha
+    GLOW_ALPHA_BASE = 180
+    GLOW_ALPHA_BEAT = 50
+    GLOW_SPREAD = 0
+
     def get_name(self):
         return "Kite"
 
     def get_internal_name(self):
         return "kite_outline"
 
-    def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
-        alpha = int((180 + beat * 50) * (1 - glow_level / 8))
-        glow_color = (*color, alpha)
-
-        self._draw_kite(
-            draw,
-            cx,
-            cy,
-            w,
-            h,
-            glow_color,
-            width + glow_level
-        )
-
-    def draw_outline(self, draw, cx, cy, w, h, color, width):
-        self._draw_kite(
-            draw,
-            cx,
-            cy,
-            w,
-            h,
-            (*color, 255),
-            width
-        )
-
-    def _draw_kite(self, draw, cx, cy, w, h, color, width):
-        size = min(w, h)
-
-        top = size * 1.0
-        bottom = size * 0.7
-        side = size * 0.55
+    def get_geometry(self):
+        top = 1.0
+        bottom = 0.7
+        side = 0.55
 
         points = [
-            (cx,           cy - top),     # top
-            (cx + side,    cy),           # right
-            (cx,           cy + bottom),  # bottom
-            (cx - side,    cy),           # left
-            (cx,           cy - top)      # close
+            (0,      -top),     # top
+            (side,   0),        # right
+            (0,      bottom),   # bottom
+            (-side,  0),        # left
+            (0,      -top)      # close
         ]
 
-        draw.line(
-            points,
-            fill=color,
-            width=width,
-            joint="curve"
-        )
+        return [RingPath(points, closed=False, joint="curve")]
@@ -4,7 +4,7 @@ Eight-sided octagonal ring
 """
 
 import math
-from rings.base_ring import BaseRing
+from rings.base_ring import BaseRing, RingPath
 
 
 class Octagon(BaseRing):
@@ -14,25 +14,10 @@ class Octagon(BaseRing):
     def get_internal_name(self):
         return "octagon"
     
-    def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
-        alpha = int((200 + beat * 55) * (1 - glow_level / 8))
-        glow_color = (*color, alpha)
-        
-        points = []
-        for i in range(8):
-            angle = math.radians(i * 45)
-            px = cx + (w + glow_level*2) * math.cos(angle)
-            py = cy + (h + glow_level*2) * math.sin(angle)
-            points.append((px, py))
-        
-        draw.polygon(points, outline=glow_color, width=width + glow_level)
-    
-    def draw_outline(self, draw, cx, cy, w, h, color, width):
+    def get_geometry(self):
         points = []
         for i in range(8):
             angle = math.radians(i * 45)
-            px = cx + w * math.cos(angle)
-            py = cy + h * math.sin(angle)
-            points.append((px, py))
+            points.append((math.cos(angle), math.sin(angle)))
         
-        draw.polygon(points, outline=(*color, 255), width=width)
\ No newline at end of file
+        return [RingPath(points)]
@@ -4,44 +4,23 @@ Outlined Septagon
 """
 
 import math
-from rings.base_ring import BaseRing
+from rings.base_ring import BaseRing, RingPath
 
 
 class SeptagonOutline(BaseRing):
+    # Glow stays on the outline (no spread) with a softer alpha
+    GLOW_ALPHA_BASE = 180
+    GLOW_ALPHA_BEAT = 50
+    GLOW_SPREAD = 0
+
     def get_name(self):
         return "Septagon"
 
     def get_internal_name(self):
         return "septagon_outline"
 
-    def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
-        alpha = int((180 + beat * 50) * (1 - glow_level / 8))
-        glow_color = (*color, alpha)
-
-        self._draw_septagon(
-            draw,
-            cx,
-            cy,
-            w,
-            h,
-            glow_color,
-            width + glow_level
-        )
-
-    def draw_outline(self, draw, cx, cy, w, h, color, width):
-        self._draw_septagon(
-            draw,
-            cx,
-            cy,
-            w,
-            h,
-            (*color, 255),
-            width
-        )
-
-    def _draw_septagon(self, draw, cx, cy, w, h, color, width):
+    def get_geometry(self):
         sides = 7
-        radius = min(w, h)
 
         points = []
 
@@ -50,16 +29,9 @@ class SeptagonOutline(BaseRing):
 
         for i in range(sides):
             angle = rotation + (2 * math.pi * i / sides)
-            x = cx + math.cos(angle) * radius
-            y = cy + math.sin(angle) * radius
-            points.append((x, y))
+            points.append((math.cos(angle), math.sin(angle)))
 
         # Close shape
         points.append(points[0])
 
-        draw.line(
-            points,
-            fill=color,
-            width=width,
-            joint="curve"
-        )
+        return [RingPath(points, closed=False, joint="curve")]
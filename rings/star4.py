@@ -4,7 +4,7 @@ Four-pointed star ring
 """
 
 import math
-from rings.base_ring import BaseRing
+from rings.base_ring import BaseRing, RingPath
 
 
 class Star4(BaseRing):
@@ -14,33 +14,12 @@ class Star4(BaseRing):
     def get_internal_name(self):
         return "star4"
     
-    def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
-        alpha = int((200 + beat * 55) * (1 - glow_level / 8))
-        glow_color = (*color, alpha)
-        
-        points = []
-        for i in range(8):
-            angle = math.radians(i * 45 - 90)
-            if i % 2 == 0:
-                px = cx + (w + glow_level*2) * math.cos(angle)
-                py = cy + (h + glow_level*2) * math.sin(angle)
-            else:
-                px = cx + (w + glow_level*2) * 0.4 * math.cos(angle)
-                py = cy + (h + glow_level*2) * 0.4 * math.sin(angle)
-            points.append((px, py))
-        
-        draw.polygon(points, outline=glow_color, width=width + glow_level)
-    
-    def draw_outline(self, draw, cx, cy, w, h, color, width):
+    def get_geometry(self):
         points = []
         for i in range(8):
             angle = math.radians(i * 45 - 90)
-            if i % 2 == 0:
-                px = cx + w * math.cos(angle)
-                py = cy + h * math.sin(angle)
-            else:
-                px = cx + w * 0.4 * math.cos(angle)
-                py = cy + h * 0.4 * math.sin(angle)
-            points.append((px, py))
+            # Alternate outer tips and inner corners
+            radius = 1.0 if i % 2 == 0 else 0.4
+            points.append((radius * math.cos(angle), radius * math.sin(angle)))
         
-        draw.polygon(points, outline=(*color, 255), width=width)
\ No newline at end of file
+        return [RingPath(points)]
@@ -3,7 +3,7 @@ Triangle Ring Shape
 Three-pointed triangular ring
 """
 
-from rings.base_ring import BaseRing
+from rings.base_ring import BaseRing, RingPath
 
 
 class Triangle(BaseRing):
@@ -13,21 +13,5 @@ class Triangle(BaseRing):
     def get_internal_name(self):
         return "triangle"
     
-    def draw_glow(self, draw, cx, cy, w, h, color, width, glow_level, beat):
-        alpha = int((200 + beat * 55) * (1 - glow_level / 8))
-        glow_color = (*color, alpha)
-        
-        points = [
-            (cx, cy - h - glow_level*2),
-            (cx - w - glow_level*2, cy + h + glow_level*2),
-            (cx + w + glow_level*2, cy + h + glow_level*2)
-        ]
-        draw.polygon(points, outline=glow_color, width=width + glow_level)
-    
-    def draw_outline(self, draw, cx, cy, w, h, color, width):
-        points = [
-            (cx, cy - h),
-            (cx - w, cy + h),
-            (cx + w, cy + h)
-        ]
-        draw.polygon(points, outline=(*color, 255), width=width)
\ No newline at end of file
+    def get_geometry(self):
+        return [RingPath([(0, -1), (-1, 1), (1, 1)])]
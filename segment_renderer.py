@@ -0,0 +1,209 @@
+"""
+Segment renderer module
+Renders and encodes timeline segments in separate processes, then joins them with FFmpeg's concat demuxer
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import traceback
+import contextlib
+import subprocess
+import multiprocessing
+
+from tqdm import tqdm
+
+from config import RENDER_SEGMENTS, SEGMENT_STOP_TIMEOUT
+from encoders import select_encoder, build_segment_command, build_concat_command
+from encoder_sink import EncoderSink, EncoderError
+
+
+def split_segments(total_frames, segments):
+    """[(start, stop), ...] splitting range(total_frames) into near-equal parts"""
+    bounds = [round(i * total_frames / segments) for i in range(segments + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(segments) if bounds[i] < bounds[i + 1]]
+
+
+def concat_segments(segment_paths, list_path, audio_path, duration, output_path, backend, preset):
+    """Join video-only segments without re-encoding and mux in the audio (raises EncoderError)"""
+    with open(list_path, 'w') as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    
+    result = subprocess.run(
+        build_concat_command(list_path, audio_path, duration, output_path, backend, preset),
+        stdin=subprocess.DEVNULL,
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise EncoderError(f"FFmpeg concat error (return code {result.returncode})",
+                           result.stderr.decode('utf-8', errors='replace'))
+
+
+def _segment_main(init_kwargs, states, total_frames, start, stop, warmup, cmd, frames_done, errors, cancel):
+    """
+    Segment process: render frames [start, stop) and encode them into one video-only file
+    Rendering starts warmup frames early (from a black trail) so the trail matches
+    the end of the previous segment; those frames are not encoded. Setting cancel
+    stops rendering and kills the segment's FFmpeg.
+    """
+    sink = None
+    try:
+        from visualizer import MusicVisualizer
+        
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            visualizer = MusicVisualizer(**init_kwargs)
+        
+        first = max(0, start - warmup)
+        visualizer.seek(states, first)
+        sink = EncoderSink(cmd).start()
+        for frame_idx in range(first, stop):
+            if cancel.is_set():
+                sink.abort()
+                return
+            if frame_idx < start:
+                visualizer.render_frame_buffer(frame_idx, total_frames, states)
+            else:
+                sink.write(visualizer.render_output_frame(frame_idx, total_frames, states))
+                with frames_done.get_lock():
+                    frames_done.value += 1
+        sink.close()
+    except EncoderError as e:
+        if sink is not None:
+            sink.abort()
+        errors.put(f"Segment {start}-{stop}: {e}:\n{e.stderr[-1000:]}")
+    except Exception:
+        if sink is not None:
+            sink.abort()
+        errors.put(f"Segment {start}-{stop}:\n{traceback.format_exc()}")
+
+
+class SegmentRenderer:
+    """
+    Segment-parallel render of a MusicVisualizer
+    
+    The timeline is split into segments, each rendered and encoded by its own
+    process into a video-only file (so encoding scales with the segment count,
+    not just rendering). The files are joined losslessly with the concat demuxer
+    and the audio is muxed in once. Frame states (and the simulated starfield at
+    each segment's first frame) are precomputed, segments load the parent's analysis
+    and render trail warm-up frames first, like ParallelRenderer chunks.
+    """
+    
+    def __init__(self, visualizer, segments=RENDER_SEGMENTS, work_dir=None):
+        self.visualizer = visualizer
+        self.segments = max(1, segments)
+        self.work_dir = work_dir
+    
+    def encode(self, progress=None):
+        """
+        Render the visualizer's video to its output_path
+        progress(frames_done) is called as frames complete; returning False cancels.
+        Returns False if cancelled; raises RuntimeError / EncoderError on failure.
+        """
+        visualizer = self.visualizer
+        render_duration, total_frames = visualizer.render_span()
+        spans = split_segments(total_frames, self.segments)
+        backend = select_encoder(visualizer.encoder, visualizer.encoder_preset)
+        # Segment encoders share the cores unless a thread count was set
+        threads = visualizer.encoder_threads or max(1, (os.cpu_count() or 1) // len(spans))
+        
+        warmup = visualizer.compositor.warmup_frames()
+        states = visualizer.precompute_frame_states(
+            total_frames, [max(0, start - warmup) for start, _ in spans])
+        init_kwargs = visualizer.worker_kwargs()
+        
+        output_path = visualizer.output_path
+        extension = os.path.splitext(output_path)[1] or '.mp4'
+        work_dir = self.work_dir or tempfile.mkdtemp(
+            prefix='segments_', dir=os.path.dirname(os.path.abspath(output_path)))
+        os.makedirs(work_dir, exist_ok=True)
+        segment_paths = [os.path.join(work_dir, f'segment_{i:04d}{extension}') for i in range(len(spans))]
+        
+        context = multiprocessing.get_context()
+        frames_done = context.Value('q', 0)
+        errors = context.Queue()
+        cancel = context.Event()
+        processes = [
+            context.Process(
+                target=_segment_main,
+                args=(init_kwargs, states, total_frames, start, stop, warmup,
+                      build_segment_command(visualizer.width, visualizer.height, visualizer.fps, path,
+                                            backend, visualizer.encoder_preset, threads, visualizer.pix_fmt),
+                      frames_done, errors, cancel),
+                daemon=True
+            )
+            for (start, stop), path in zip(spans, segment_paths)
+        ]
+        
+        try:
+            for process in processes:
+                process.start()
+            
+            reported = 0
+            while any(process.is_alive() for process in processes):
+                time.sleep(0.2)
+                if not errors.empty():
+                    print(errors.get(), file=sys.stderr)
+                    raise RuntimeError("Segment render failed (error above)")
+                done = frames_done.value
+                if progress is not None and done != reported:
+                    reported = done
+                    if progress(done) is False:
+                        return False
+            
+            if not errors.empty():
+                print(errors.get(), file=sys.stderr)
+                raise RuntimeError("Segment render failed (error above)")
+            for process in processes:
+                if process.exitcode != 0:
+                    raise RuntimeError(f"Segment process exited unexpectedly (exit code {process.exitcode})")
+            
+            concat_segments(segment_paths, os.path.join(work_dir, 'segments.txt'), visualizer.audio_path,
+                            render_duration, visualizer.output_path, backend, visualizer.encoder_preset)
+            return True
+        finally:
+            # Segments stop their own FFmpeg; only ones that do not respond are killed
+            cancel.set()
+            deadline = time.monotonic() + SEGMENT_STOP_TIMEOUT
+            for process in processes:
+                if process.pid is not None:
+                    process.join(max(0, deadline - time.monotonic()))
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            if self.work_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def render(self):
+        """Command-line render: progress bar and messages like MusicVisualizer.render()"""
+        visualizer = self.visualizer
+        render_duration, total_frames = visualizer.render_span()
+        segments = len(split_segments(total_frames, self.segments))
+        if visualizer.preview_seconds:
+            print(f"PREVIEW MODE: Rendering first {render_duration:.1f}s")
+        print(f"Rendering {total_frames} frames at {visualizer.fps} fps in {segments} segments...")
+        
+        start_time = time.perf_counter()
+        try:
+            with tqdm(total=total_frames) as progress_bar:
+                self.encode(lambda frames_done: progress_bar.update(frames_done - progress_bar.n))
+            
+            elapsed = time.perf_counter() - start_time
+            print(f"\nVideo saved to: {visualizer.output_path}")
+            print(f"Segment render: {total_frames} frames in {elapsed:.1f}s ({total_frames / elapsed:.1f} fps)")
+        except FileNotFoundError:
+            print("ERROR: FFmpeg not found. Please install it:")
+            print("  brew install ffmpeg")
+        except EncoderError as e:
+            print(f"\n{e}:")
+            print(e.stderr[-1000:])
+        except KeyboardInterrupt:
+            print("\nRender interrupted by user")
+        except Exception as e:
+            print(f"\nError during render: {e}")
+            traceback.print_exc()
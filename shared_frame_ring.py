@@ -0,0 +1,84 @@
+"""
+Shared frame ring module
+Fixed ring of frame slots in shared memory, handed between one producer and one consumer process
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Single-producer / single-consumer frame ring in multiprocessing.shared_memory
+    
+    The producer (a render worker) writes frames into slots 0, 1, 2, ... in ring
+    order and the consumer reads and releases them in the same order, so no slot
+    indices are exchanged: two counting semaphores (free and filled slots) are
+    the whole handoff. Frames never pass through a pipe or get pickled.
+    
+    Create the ring in the parent and pass it to the worker Process. With the
+    'spawn' start method the worker attaches to the segment by name.
+    """
+    
+    def __init__(self, slots, shape, context):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.slot_bytes = int(np.prod(self.shape))
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        self.free = context.Semaphore(slots)
+        self.filled = context.Semaphore(0)
+        self._attach()
+    
+    def _attach(self):
+        self.array = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=self.memory.buf)
+        self.write_index = 0
+        self.read_index = 0
+    
+    def __getstate__(self):
+        return {
+            'slots': self.slots,
+            'shape': self.shape,
+            'slot_bytes': self.slot_bytes,
+            'name': self.memory.name,
+            'free': self.free,
+            'filled': self.filled,
+        }
+    
+    def __setstate__(self, state):
+        name = state.pop('name')
+        self.__dict__.update(state)
+        self.memory = shared_memory.SharedMemory(name=name)
+        self._attach()
+    
+    # Producer side
+    
+    def acquire_slot(self):
+        """Next slot to fill (blocks until the consumer has released it)"""
+        self.free.acquire()
+        return self.array[self.write_index % self.slots]
+    
+    def publish(self):
+        """Hand the slot from acquire_slot() to the consumer"""
+        self.write_index += 1
+        self.filled.release()
+    
+    # Consumer side
+    
+    def next_frame(self, timeout=None):
+        """Next filled slot in order, or None if none arrived within timeout"""
+        if not self.filled.acquire(timeout=timeout):
+            return None
+        frame = self.array[self.read_index % self.slots]
+        self.read_index += 1
+        return frame
+    
+    def release(self):
+        """Return the oldest unreleased slot to the producer"""
+        self.free.release()
+    
+    def close(self):
+        """Unmap and free the segment (parent only, once no slot views are left)"""
+        self.array = None
+        self.memory.close()
+        self.memory.unlink()
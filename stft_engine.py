@@ -0,0 +1,78 @@
+"""
+Chunked STFT engine
+Computes float32 STFT magnitudes in windowed chunks, keeping only the bins analysis needs
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft, signal
+
+from config import STFT_CHUNK_FRAMES
+
+
+class MagnitudeSTFT:
+    """
+    Magnitude-only STFT with the same framing as scipy.signal.stft
+    (hann window, zero boundary padding, end padding, 'spectrum' scaling)
+    
+    Only bins up to max_frequency are stored, as float32. Per-frame energy and
+    peak over the full spectrum are kept so beat thresholds and peak normalization
+    see the same totals as a full spectrogram would give.
+    """
+    
+    def __init__(self, sr, nperseg, hop_length, max_frequency=None, window='hann',
+                 chunk_frames=STFT_CHUNK_FRAMES):
+        self.sr = sr
+        self.nperseg = nperseg
+        self.hop_length = hop_length
+        self.chunk_frames = chunk_frames
+        
+        self.window = signal.get_window(window, nperseg).astype(np.float32)
+        self.scale = np.float32(1.0 / self.window.sum())
+        
+        all_frequencies = np.fft.rfftfreq(nperseg, 1.0 / sr)
+        if max_frequency is None:
+            self.num_bins = len(all_frequencies)
+        else:
+            self.num_bins = int(np.searchsorted(all_frequencies, max_frequency, side='right'))
+        self.frequencies = all_frequencies[:self.num_bins]
+    
+    def num_frames(self, num_samples):
+        """Number of frames scipy.signal.stft produces for a signal of this length"""
+        extended = num_samples + 2 * (self.nperseg // 2)
+        extended += (-(extended - self.nperseg) % self.hop_length) % self.nperseg
+        return (extended - self.nperseg) // self.hop_length + 1
+    
+    def process(self, y):
+        """
+        Analyze a mono signal
+        Returns (frequencies, times, magnitude, frame_energy, frame_peak)
+        """
+        num_frames = self.num_frames(len(y))
+        half = self.nperseg // 2
+        
+        magnitude = np.empty((self.num_bins, num_frames), dtype=np.float32)
+        frame_energy = np.empty(num_frames, dtype=np.float32)
+        frame_peak = np.empty(num_frames, dtype=np.float32)
+        
+        for first in range(0, num_frames, self.chunk_frames):
+            last = min(first + self.chunk_frames, num_frames)
+            
+            # Samples covered by this chunk, zero-filled outside the signal
+            start = first * self.hop_length - half
+            stop = (last - 1) * self.hop_length - half + self.nperseg
+            chunk = np.zeros(stop - start, dtype=np.float32)
+            src_start, src_stop = max(start, 0), min(stop, len(y))
+            if src_stop > src_start:
+                chunk[src_start - start:src_stop - start] = y[src_start:src_stop]
+            
+            segments = sliding_window_view(chunk, self.nperseg)[::self.hop_length]
+            spectrum = np.abs(fft.rfft(segments * self.window, axis=-1))
+            spectrum *= self.scale
+            
+            frame_energy[first:last] = spectrum.sum(axis=1)
+            frame_peak[first:last] = spectrum.max(axis=1)
+            magnitude[:, first:last] = spectrum[:, :self.num_bins].T
+        
+        times = np.arange(num_frames) * self.hop_length / self.sr
+        return self.frequencies, times, magnitude, frame_energy, frame_peak
@@ -7,9 +7,10 @@ Orchestrates all components to render audio-reactive video with GPU encoding
 import numpy as np
 import cv2
 from PIL import Image
-import subprocess
 import os
+import shutil
 import tempfile
+import weakref
 from tqdm import tqdm
 import math
 import copy
@@ -17,11 +18,36 @@ import sys
 
 from config import (
     FREQUENCY_BANDS, COLOR_PALETTES, 
-    HUE_SHIFT_BASE, TRAIL_FADE_FACTOR, FADE_DURATION_SECONDS
+    HUE_SHIFT_BASE, TRAIL_FADE_FACTOR, TRAIL_DECAY_CURVE, FADE_DURATION_SECONDS,
+    NORMALIZATION_MODE, NORMALIZATION_PERCENTILE, ANALYSIS_DECIMATION,
+    ANALYSIS_CACHE_ENABLED, ANALYSIS_CACHE_DIR, STARFIELD_MODE, STARFIELD_SEED,
+    RENDER_WORKERS, RENDER_CHUNK_SIZE, VIDEO_ENCODER, ENCODER_PRESET, ENCODER_THREADS,
+    PIPE_PIX_FMT
 )
+from analysis_cache import AnalysisCache
+from compositor import FrameCompositor
 from audio_processor import AudioProcessor
 from effects import EffectsRenderer
 from beat_detector import BeatDetector
+from parallel_renderer import ParallelRenderer
+from encoder_sink import EncoderSink, EncoderError
+from encoders import select_encoder, build_ffmpeg_command
+from pixel_formats import FrameConverter, supports as pix_fmt_supported
+
+
+# Per-frame animation state precomputed for parallel rendering
+FRAME_STATE_FIELDS = ('volume', 'beat', 'rotation', 'cover_rotation', 'hue_offset')
+
+# Constructor arguments MusicVisualizer.update_settings() can change without
+# re-analyzing the audio (audio, resolution, fps and analysis settings cannot)
+LIVE_SETTINGS = (
+    'cover_image_path', 'text_overlay', 'text_overlay2', 'text_size', 'text_h_align',
+    'text_v_align', 'color_palette', 'waveform_rotation', 'waveform_rotation_speed',
+    'ring_rotation', 'ring_rotation_speed', 'starfield_rotation', 'starfield_direction',
+    'star_count', 'cover_shape', 'cover_size', 'disable_rings', 'disable_starfield',
+    'ring_shape', 'ring_count', 'ring_scale', 'waveform_orientation', 'static_cover',
+    'cover_timeline', 'ring_stagger',
+)
 
 
 class MusicVisualizer:
@@ -29,12 +55,23 @@ class MusicVisualizer:
                  fps=30, resolution=(1280, 720), text_overlay=None, text_overlay2=None,
                  color_palette='rainbow', waveform_rotation='none', ring_rotation='none', 
                  starfield_rotation='none', starfield_direction='outward', preview_seconds=None,
+                 star_count=None, starfield_mode=STARFIELD_MODE, starfield_seed=STARFIELD_SEED,
                  cover_shape='square', cover_size=1.0, disable_rings=False, 
                  disable_starfield=False, ring_shape='circle', ring_count=3, ring_scale=1.0, 
                  waveform_orientation='horizontal', static_cover=False,
                  cover_timeline='none', ring_stagger='none', waveform_rotation_speed=1.0,
                  ring_rotation_speed=1.0, text_size=1.0, text_h_align='center', 
-                 text_v_align='bottom'):
+                 text_v_align='bottom', normalization=NORMALIZATION_MODE,
+                 normalization_percentile=NORMALIZATION_PERCENTILE,
+                 analysis_decimation=ANALYSIS_DECIMATION,
+                 use_cache=ANALYSIS_CACHE_ENABLED, cache_dir=ANALYSIS_CACHE_DIR,
+                 trail_decay_curve=TRAIL_DECAY_CURVE, workers=RENDER_WORKERS,
+                 chunk_size=RENDER_CHUNK_SIZE, encoder=VIDEO_ENCODER,
+                 encoder_preset=ENCODER_PRESET, encoder_threads=ENCODER_THREADS,
+                 pix_fmt=PIPE_PIX_FMT):
+        
+        # Constructor arguments, so render workers can build an identical visualizer
+        self.init_kwargs = {name: value for name, value in locals().items() if name != 'self'}
         
         self.audio_path = audio_path
         self.output_path = output_path
@@ -51,6 +88,9 @@ class MusicVisualizer:
         self.ring_rotation_speed = ring_rotation_speed
         self.starfield_rotation = starfield_rotation
         self.starfield_direction = starfield_direction
+        self.star_count = star_count
+        self.starfield_mode = starfield_mode
+        self.starfield_seed = starfield_seed
         self.preview_seconds = preview_seconds
         self.is_preview = preview_seconds is not None
         self.cover_shape = cover_shape
@@ -67,11 +107,38 @@ class MusicVisualizer:
         self.text_size = text_size
         self.text_h_align = text_h_align
         self.text_v_align = text_v_align
+        self.normalization = normalization
+        self.normalization_percentile = normalization_percentile
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.encoder = encoder
+        self.encoder_preset = encoder_preset
+        self.encoder_threads = encoder_threads
+        
+        # Persistent analysis cache (skips decode and STFT for tracks seen before)
+        self.analysis_cache = None
+        if use_cache:
+            try:
+                self.analysis_cache = AnalysisCache(cache_dir)
+            except OSError as e:
+                print(f"Analysis cache disabled: {e}")
         
         # Initialize components
-        self.audio_processor = AudioProcessor(audio_path, fps=fps, is_preview=self.is_preview)
-        self.effects_renderer = EffectsRenderer(self.width, self.height, is_preview=self.is_preview)
+        self.audio_processor = AudioProcessor(
+            audio_path, fps=fps, is_preview=self.is_preview,
+            normalization=normalization, normalization_percentile=normalization_percentile,
+            decimation=analysis_decimation, cache=self.analysis_cache
+        )
         self.beat_detector = BeatDetector()
+        # Beat decay is per video frame, so the curve is built from energies resampled to fps
+        self.beat_detector.beat_curve = self.audio_processor.cached_array(
+            self._beat_curve_cache_name(),
+            lambda: self.beat_detector.analyze(
+                self.audio_processor.resample_frames(BeatDetector.band_energy(
+                    self.audio_processor.frequencies, self.audio_processor.magnitude)),
+                self.audio_processor.resample_frames(self.audio_processor.frame_energy)
+            )
+        )
         
         # Get duration from audio processor
         self.duration = self.audio_processor.duration
@@ -79,6 +146,12 @@ class MusicVisualizer:
         # Setup frequency bands with color palette
         self.bands = self._setup_bands()
         
+        # Starfield, waveform and ring renderers
+        self._create_effects_renderer()
+        
+        # Precompute waveform tensor at the renderer's resolution
+        self.audio_processor.get_waveform_tensor(self.bands, self.effects_renderer.waveforms.points)
+        
         # Calculate rotation speeds that complete whole rotations
         self._calculate_rotation_speeds()
         
@@ -90,18 +163,91 @@ class MusicVisualizer:
         # Text fade tracking
         self.text_fade_history = []
         
-        # Trail buffer for afterimage effect
-        self.trail_buffer = None
+        # Preallocated frame, trail and layer buffers (trail feeds the afterimage effect)
+        self.compositor = FrameCompositor(self.width, self.height, TRAIL_FADE_FACTOR, trail_decay_curve)
+        
+        # Conversion of finished frames to the format piped to FFmpeg
+        if not pix_fmt_supported(self.width, self.height, pix_fmt):
+            print(f"Odd frame size {self.width}x{self.height}: piping rgb0 instead of {pix_fmt}")
+            pix_fmt = 'rgb0'
+        self.pix_fmt = pix_fmt
+        self.frame_converter = FrameConverter(self.width, self.height, pix_fmt)
         
         # Load cover image if provided
+        self._load_cover_image()
+    
+    def _beat_curve_cache_name(self):
+        return f'beat_curve_{self.fps:g}fps'
+    
+    def worker_kwargs(self):
+        """
+        Constructor arguments for a visualizer in a render worker process
+        Workers load the analysis from the cache instead of decoding and analyzing
+        the audio again; without a persistent cache it is written to a temporary one
+        (removed with this visualizer) first.
+        """
+        if self.analysis_cache is None:
+            cache_dir = tempfile.mkdtemp(prefix='analysis_')
+            weakref.finalize(self, shutil.rmtree, cache_dir, True)
+            self.analysis_cache = AnalysisCache(cache_dir)
+            self.audio_processor.attach_cache(self.analysis_cache)
+            self.audio_processor.cache_entry.save(self._beat_curve_cache_name(),
+                                                  self.beat_detector.beat_curve)
+        
+        return dict(self.init_kwargs, workers=1, pix_fmt=self.pix_fmt,
+                    use_cache=True, cache_dir=self.analysis_cache.cache_dir)
+    
+    def _create_effects_renderer(self):
+        """Build the effect renderers (after the bands, which the seeded starfield speed follows)"""
+        self.effects_renderer = EffectsRenderer(self.width, self.height, is_preview=self.is_preview,
+                                                star_count=self.star_count, starfield_mode=self.starfield_mode,
+                                                starfield_seed=self.starfield_seed)
+        
+        # Seeded starfield derives every frame from the cumulative speed curve
+        if self.starfield_mode == 'seeded':
+            self.effects_renderer.starfield.set_speed_curve(
+                self.audio_processor.get_volume_curve(self.bands)
+            )
+    
+    def _load_cover_image(self):
+        """Load the cover image from cover_image_path (None if unset or unreadable)"""
         self.cover_image = None
-        if cover_image_path:
+        if self.cover_image_path:
             try:
-                self.cover_image = Image.open(cover_image_path).convert('RGB')
-                print(f"Loaded cover image: {cover_image_path}")
+                self.cover_image = Image.open(self.cover_image_path).convert('RGB')
+                print(f"Loaded cover image: {self.cover_image_path}")
             except Exception as e:
                 print(f"Could not load cover image: {e}")
     
+    def update_settings(self, **settings):
+        """
+        Change LIVE_SETTINGS on a constructed visualizer, keeping the audio analysis
+        Most settings are only read while rendering; the bands, effect renderers and
+        cover image are rebuilt when a setting they depend on changes.
+        """
+        unsupported = set(settings) - set(LIVE_SETTINGS)
+        if unsupported:
+            raise ValueError(f"Settings that need a new visualizer: {', '.join(sorted(unsupported))}")
+        
+        for name, value in settings.items():
+            setattr(self, name, value)
+        self.init_kwargs.update(settings)
+        
+        if 'color_palette' in settings:
+            self.bands = self._setup_bands()
+        if 'star_count' in settings:
+            self._create_effects_renderer()
+        if 'cover_image_path' in settings:
+            self._load_cover_image()
+    
+    def reset_state(self):
+        """Return to the animation state before the first frame (rotations, hue, text fade, trail)"""
+        self.rotation = 0
+        self.cover_rotation = 0
+        self.hue_offset = 0
+        self.text_fade_history = []
+        self.compositor.reset()
+    
     def _setup_bands(self):
         """Setup frequency bands with color palette applied"""
         bands = copy.deepcopy(FREQUENCY_BANDS)
@@ -215,19 +361,19 @@ class MusicVisualizer:
         return tuple(offsets)
     
     def render_frame(self, frame_idx, total_frames):
-        """Render a single frame with all psychedelic effects"""
+        """Render a single frame with all psychedelic effects (returns an independent RGB image)"""
+        return self.compositor.to_image(self.render_frame_buffer(frame_idx, total_frames))
+    
+    def _advance_state(self, frame_idx):
+        """Advance the animation state by one frame; returns (volume_intensity, beat_intensity)"""
         # Calculate volume intensity
         band_values = self.audio_processor.get_band_values(frame_idx, self.bands)
         avg_volume = np.mean(band_values) if band_values else 0
-        max_possible = np.max(self.audio_processor.magnitude) if np.max(self.audio_processor.magnitude) > 0 else 1
-        volume_intensity = avg_volume / max_possible
-        
-        # Detect beats
-        beat_intensity = self.beat_detector.detect_beat(
-            frame_idx, 
-            self.audio_processor.frequencies, 
-            self.audio_processor.magnitude
-        )
+        stats = self.audio_processor.get_normalization_stats(self.bands)
+        volume_intensity = stats.normalize_volume(avg_volume)
+        
+        # Look up precomputed beat intensity
+        beat_intensity = self.beat_detector.beat_at(frame_idx)
         
         # Update animation state
         rotation_speed = self.base_rotation_speed + (volume_intensity * self.volume_rotation_multiplier)
@@ -235,52 +381,140 @@ class MusicVisualizer:
         self.cover_rotation += rotation_speed * self.ring_rotation_speed
         self.hue_offset = (self.hue_offset + HUE_SHIFT_BASE + volume_intensity) % 360
         
-        # Initialize or fade trail buffer
-        if self.trail_buffer is None:
-            self.trail_buffer = Image.new('RGB', (self.width, self.height), (0, 0, 0))
+        return volume_intensity, beat_intensity
+    
+    def precompute_frame_states(self, total_frames, start_frames=()):
+        """
+        Animation state of every frame from the start of the song (nothing is drawn)
+        Returns {field: array indexed by frame} for FRAME_STATE_FIELDS. For the simulated
+        starfield, states['starfield'][frame] also holds its snapshot just before each
+        frame in start_frames, where independent renders begin (see seek()).
+        """
+        saved = (self.rotation, self.cover_rotation, self.hue_offset)
+        self.rotation = self.cover_rotation = self.hue_offset = 0
+        
+        starfield = self.effects_renderer.starfield
+        simulate_stars = (bool(start_frames) and self.starfield_mode == 'simulated'
+                          and not self.disable_starfield)
+        if simulate_stars:
+            # The simulation (and the random state it draws from) is put back afterwards
+            saved_stars = {name: np.copy(value) for name, value in starfield.snapshot().items()}
+            start_frames = set(start_frames)
+        
+        states = {field: np.empty(total_frames) for field in FRAME_STATE_FIELDS}
+        star_states = {}
+        for frame_idx in range(total_frames):
+            volume_intensity, beat_intensity = self._advance_state(frame_idx)
+            states['volume'][frame_idx] = volume_intensity
+            states['beat'][frame_idx] = beat_intensity
+            states['rotation'][frame_idx] = self.rotation
+            states['cover_rotation'][frame_idx] = self.cover_rotation
+            states['hue_offset'][frame_idx] = self.hue_offset
+            
+            if simulate_stars:
+                if frame_idx in start_frames:
+                    star_states[frame_idx] = {name: np.copy(value)
+                                              for name, value in starfield.snapshot().items()}
+                starfield.update(volume_intensity, self.starfield_rotation,
+                                 self.starfield_direction, frame_idx)
+        
+        if simulate_stars:
+            states['starfield'] = star_states
+            starfield.restore(saved_stars)
+        
+        self.rotation, self.cover_rotation, self.hue_offset = saved
+        return states
+    
+    def seek(self, states, frame_idx):
+        """
+        Prepare to render from frame_idx with precomputed states, independently of the
+        frames before it (render workers and segments): the trail starts black and the
+        simulated starfield continues from its snapshot for that frame
+        """
+        self.compositor.reset()
+        star_state = states.get('starfield', {}).get(frame_idx)
+        if star_state is not None:
+            self.effects_renderer.starfield.restore(star_state)
+    
+    def apply_frame_state(self, states, frame_idx):
+        """Jump the animation state to a frame; returns (volume_intensity, beat_intensity)"""
+        self.rotation = float(states['rotation'][frame_idx])
+        self.cover_rotation = float(states['cover_rotation'][frame_idx])
+        self.hue_offset = float(states['hue_offset'][frame_idx])
+        # Text fade averages the volumes of the preceding frames
+        self.text_fade_history = states['volume'][max(0, frame_idx - 60):frame_idx].tolist()
+        return float(states['volume'][frame_idx]), float(states['beat'][frame_idx])
+    
+    def snapshot_state(self):
+        """
+        Everything a sequential render carries from one frame to the next, as a flat
+        dict of arrays (saved with render checkpoints, see restore_state())
+        """
+        snapshot = {
+            'rotation': np.array(self.rotation),
+            'cover_rotation': np.array(self.cover_rotation),
+            'hue_offset': np.array(self.hue_offset),
+            'text_fade_history': np.array(self.text_fade_history, dtype=np.float64),
+            'beat_prev_energy': np.array(self.beat_detector.prev_energy),
+            'beat_intensity': np.array(self.beat_detector.beat_intensity),
+        }
+        for prefix, component in (('starfield', self.effects_renderer.starfield), ('trail', self.compositor)):
+            snapshot.update({f'{prefix}_{name}': value for name, value in component.snapshot().items()})
+        return snapshot
+    
+    def restore_state(self, snapshot):
+        """Continue a sequential render from snapshot_state() (the next frame follows it seamlessly)"""
+        self.rotation = float(snapshot['rotation'])
+        self.cover_rotation = float(snapshot['cover_rotation'])
+        self.hue_offset = float(snapshot['hue_offset'])
+        self.text_fade_history = snapshot['text_fade_history'].tolist()
+        self.beat_detector.prev_energy = float(snapshot['beat_prev_energy'])
+        self.beat_detector.beat_intensity = float(snapshot['beat_intensity'])
+        for prefix, component in (('starfield', self.effects_renderer.starfield), ('trail', self.compositor)):
+            component.restore({name[len(prefix) + 1:]: value for name, value in snapshot.items()
+                               if name.startswith(prefix + '_')})
+    
+    def render_frame_buffer(self, frame_idx, total_frames, states=None):
+        """
+        Render a single frame into the compositor's buffers
+        With precomputed states the frame does not depend on the frames rendered before it
+        (apart from the trail). Returns a (height x width x 4) uint8 RGBX array that is only
+        valid until the next frame
+        """
+        if states is None:
+            volume_intensity, beat_intensity = self._advance_state(frame_idx)
         else:
-            trail_array = np.array(self.trail_buffer)
-            trail_array = (trail_array * TRAIL_FADE_FACTOR).astype(np.uint8)
-            self.trail_buffer = Image.fromarray(trail_array)
+            volume_intensity, beat_intensity = self.apply_frame_state(states, frame_idx)
         
-        # Start with faded trail
-        img = self.trail_buffer.copy()
+        # Start with faded trail (previous frame decayed in place)
+        img = self.compositor.begin_frame()
         
         # Draw starfield (behind everything)
         if not self.disable_starfield:
-            self.effects_renderer.update_starfield(volume_intensity, self.starfield_rotation, self.starfield_direction)
+            self.effects_renderer.update_starfield(volume_intensity, self.starfield_rotation,
+                                                   self.starfield_direction, frame_idx)
             self.effects_renderer.draw_starfield(img, volume_intensity)
         
-        # Create separate canvas for waveforms
-        waveform_canvas = Image.new('RGB', (self.width, self.height), (0, 0, 0))
+        # Separate canvas for waveforms (cleared scratch layer)
+        waveform_canvas = self.compositor.clear_layer()
+        
+        # Waveform rotation is applied to the vertices (counter-clockwise positive, so negate for cw)
+        if self.waveform_rotation == 'cw':
+            waveform_angle = -self.rotation
+        elif self.waveform_rotation == 'ccw':
+            waveform_angle = self.rotation
+        else:
+            waveform_angle = 0.0
         
         # Draw waveforms
         self.effects_renderer.draw_waveforms_with_glow(
             waveform_canvas, frame_idx, self.bands, 
-            self.hue_offset, self.audio_processor, self.waveform_orientation
+            self.hue_offset, self.audio_processor, self.waveform_orientation,
+            waveform_angle
         )
         
-        # Rotate waveforms based on rotation setting
-        # PIL Image.rotate() is counter-clockwise positive, so negate for cw
-        if self.waveform_rotation == 'cw':
-            waveform_rotated = waveform_canvas.rotate(
-                -math.degrees(self.rotation), expand=False, 
-                fillcolor=(0, 0, 0), resample=Image.BILINEAR
-            )
-        elif self.waveform_rotation == 'ccw':
-            waveform_rotated = waveform_canvas.rotate(
-                math.degrees(self.rotation), expand=False, 
-                fillcolor=(0, 0, 0), resample=Image.BILINEAR
-            )
-        else:
-            waveform_rotated = waveform_canvas
-        
-        # Composite rotated waveforms
-        img_array = np.array(img)
-        waveform_array = np.array(waveform_rotated)
-        mask = (waveform_array.sum(axis=2) > 0)
-        img_array[mask] = waveform_array[mask]
-        img = Image.fromarray(img_array)
+        # Composite waveforms
+        self.compositor.composite(waveform_canvas)
         
         # Calculate timeline-based cover transform
         progress = frame_idx / total_frames if total_frames > 0 else 0
@@ -351,87 +585,109 @@ class MusicVisualizer:
                 self.text_size, self.text_h_align, self.text_v_align
             )
         
-        # Update trail buffer
-        self.trail_buffer = img.copy()
-        
         # Apply fade to black at the end
         fade_frames = int(FADE_DURATION_SECONDS * self.fps)
         frames_from_end = total_frames - frame_idx
         
+        fade_factor = 1.0
         if frames_from_end <= fade_frames:
             fade_amount = 1.0 - (frames_from_end / fade_frames)
-            img_array = np.array(img)
-            img_array = (img_array * (1 - fade_amount)).astype(np.uint8)
-            img = Image.fromarray(img_array)
+            fade_factor = 1 - fade_amount
         
-        return img
+        # Finished frame becomes the trail; the end fade goes to a separate output buffer
+        return self.compositor.end_frame(fade_factor)
     
-    def render(self):
-        """Render the complete video with audio using hardware-accelerated encoding"""
+    def render_output_frame(self, frame_idx, total_frames, states=None, out=None):
+        """
+        Render a frame and convert it to the pipe format (self.pix_fmt)
+        Written into out if given, otherwise valid until the next frame
+        """
+        return self.frame_converter.convert(self.render_frame_buffer(frame_idx, total_frames, states), out)
+    
+    def iter_frames(self, total_frames):
+        """
+        Yield every frame in order, in the pipe format (each valid until the next one is requested)
+        Uses the parallel renderer when more than one worker is configured
+        """
+        if self.workers > 1:
+            renderer = ParallelRenderer(self, self.workers, self.chunk_size)
+            yield from renderer.iter_frames(total_frames)
+        else:
+            for frame_idx in range(total_frames):
+                yield self.render_output_frame(frame_idx, total_frames)
+    
+    def write_frames(self, total_frames, sink, progress=None):
+        """
+        Render every frame into an EncoderSink
+        progress(frames_done) is called before each frame; returning False cancels and
+        aborts the sink. Returns False if cancelled. With more than one worker, frames
+        go from the workers' shared memory slots to FFmpeg without being copied.
+        """
+        if self.workers > 1:
+            renderer = ParallelRenderer(self, self.workers, self.chunk_size)
+            return renderer.write_frames(total_frames, sink, progress)
+        
+        for frame_idx in range(total_frames):
+            if progress is not None and progress(frame_idx + 1) is False:
+                sink.abort()
+                return False
+            sink.write(self.render_output_frame(frame_idx, total_frames))
+        return True
+    
+    def render_span(self):
+        """(duration in seconds, frame count) of the render (the preview length in preview mode)"""
         if self.preview_seconds:
             render_duration = min(self.preview_seconds, self.duration)
-            total_frames = int(render_duration * self.fps)
-            print(f"PREVIEW MODE: Rendering first {render_duration:.1f}s")
         else:
             render_duration = self.duration
-            total_frames = int(render_duration * self.fps)
+        return render_duration, int(render_duration * self.fps)
+    
+    def render(self):
+        """Render the complete video with audio (encoder chosen by select_encoder)"""
+        render_duration, total_frames = self.render_span()
+        if self.preview_seconds:
+            print(f"PREVIEW MODE: Rendering first {render_duration:.1f}s")
         
-        print(f"Hardware Acceleration: VideoToolbox (Apple Silicon)")
+        backend = select_encoder(self.encoder, self.encoder_preset)
+        print(f"Encoder: {backend.label} [{backend.name}], {self.encoder_preset} preset")
         print(f"Rendering {total_frames} frames at {self.fps} fps...")
+        if self.workers > 1:
+            print(f"Parallel render: {self.workers} workers, {self.chunk_size}-frame chunks")
         
-        ffmpeg_cmd = [
-            'ffmpeg',
-            '-y',
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-s', f'{self.width}x{self.height}',
-            '-pix_fmt', 'rgb24',
-            '-r', str(self.fps),
-            '-i', '-',
-            '-i', self.audio_path,
-            '-c:v', 'h264_videotoolbox',
-            '-b:v', '8M',
-            '-c:a', 'aac',
-            '-b:a', '192k',
-            '-shortest',
-            '-t', str(render_duration),
-            self.output_path
-        ]
+        ffmpeg_cmd = build_ffmpeg_command(
+            self.width, self.height, self.fps, self.audio_path, render_duration, self.output_path,
+            backend, self.encoder_preset, self.encoder_threads, self.pix_fmt
+        )
         
+        sink = EncoderSink(ffmpeg_cmd)
         try:
-            process = subprocess.Popen(
-                ffmpeg_cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            sink.start()
         except FileNotFoundError:
             print("ERROR: FFmpeg not found. Please install it:")
             print("  brew install ffmpeg")
             return
         
         try:
-            for frame_idx in tqdm(range(total_frames)):
-                img = self.render_frame(frame_idx, total_frames)
-                process.stdin.write(img.tobytes())
+            with tqdm(total=total_frames) as progress_bar:
+                self.write_frames(total_frames, sink, lambda frames_done: progress_bar.update())
             
-            process.stdin.close()
-            process.wait()
+            sink.close()
+            print(f"\nVideo saved to: {self.output_path}")
+            print(sink.format_stats())
             
-            if process.returncode == 0:
-                print(f"\nVideo saved to: {self.output_path}")
-            else:
-                stderr_output = process.stderr.read().decode('utf-8')
-                print(f"\nFFmpeg error (return code {process.returncode}):")
-                print(stderr_output[-1000:])
+            sprite_cache = self.effects_renderer.rings.sprite_cache
+            if sprite_cache is not None and sprite_cache.hits + sprite_cache.misses:
+                print(f"Ring sprite cache: {sprite_cache.hits} hits, {sprite_cache.misses} misses "
+                      f"({sprite_cache.hit_rate():.0%} hit rate)")
                 
+        except EncoderError as e:
+            print(f"\n{e}:")
+            print(e.stderr[-1000:])
         except KeyboardInterrupt:
             print("\nRender interrupted by user")
-            process.terminate()
-            process.wait()
+            sink.abort()
         except Exception as e:
             print(f"\nError during render: {e}")
-            process.terminate()
-            process.wait()
+            sink.abort()
             import traceback
             traceback.print_exc()
\ No newline at end of file
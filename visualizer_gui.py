@@ -19,11 +19,13 @@ if current_dir not in sys.path:
 try:
     from gui_config import (
         WINDOW_TITLE, WINDOW_SIZE, AUDIO_FILETYPES, 
-        IMAGE_FILETYPES, VIDEO_FILETYPES, MSG_NO_COVER_SELECTED
+        IMAGE_FILETYPES, VIDEO_FILETYPES, MSG_NO_COVER_SELECTED,
+        PREVIEW_REFRESH_DELAY_MS
     )
     from gui_controls_panel import ControlsPanel
     from gui_preview import PreviewPanel
     from gui_renderer import RenderManager
+    from render_checkpoint import read_manifest, default_checkpoint_dir
 except ImportError as e:
     print("=" * 60)
     print("ERROR: Could not import required modules")
@@ -55,6 +57,9 @@ class VisualizerGUI:
         self.root.title(WINDOW_TITLE)
         self.root.geometry(WINDOW_SIZE)
         
+        # Pending debounced preview refresh (see preview_dirty)
+        self._preview_refresh_id = None
+        
         # Create main UI
         self._create_ui()
         
@@ -126,20 +131,30 @@ class VisualizerGUI:
                 display_name = display_name[:32] + "..."
             self.controls.cover_label.config(text=display_name, 
                                             foreground=self._get_text_color())
-            # Don't auto-update preview
+            self.preview_dirty()
     
     def clear_cover(self):
         """Clear the cover image"""
         self.controls.cover_path = None
         self.controls.cover_label.config(text=MSG_NO_COVER_SELECTED, 
                                         foreground="gray")
-        # Don't auto-update preview
+        self.preview_dirty()
     
     def preview_dirty(self):
-        """Mark preview as needing update (but don't regenerate)"""
-        # This method is kept for compatibility but does nothing now
-        # Preview only updates when user clicks "Update Preview" button
-        pass
+        """
+        Settings changed: refresh the preview once they settle
+        Only after the first "Update Preview" (the preview session then applies just the
+        changed settings, which takes milliseconds); never during a render.
+        """
+        if self.render_manager.preview_session.visualizer is None or self.render_manager.is_rendering:
+            return
+        if self._preview_refresh_id is not None:
+            self.root.after_cancel(self._preview_refresh_id)
+        self._preview_refresh_id = self.root.after(PREVIEW_REFRESH_DELAY_MS, self._refresh_preview)
+    
+    def _refresh_preview(self):
+        self._preview_refresh_id = None
+        self.update_preview()
     
     def update_preview(self):
         """Generate and display preview frame"""
@@ -172,6 +187,21 @@ class VisualizerGUI:
         if not output_path.lower().endswith('.mp4'):
             output_path += '.mp4'
         
+        # Offer to continue an interrupted render of the same file
+        manifest = read_manifest(default_checkpoint_dir(output_path))
+        if manifest is not None:
+            answer = messagebox.askyesnocancel(
+                "Resume Render",
+                f"An interrupted render of this video was found "
+                f"({manifest['frames_done']}/{manifest['total_frames']} frames done).\n\n"
+                f"Resume it? Choose No to start over."
+            )
+            if answer is None:
+                return
+            if answer:
+                self.render_manager.start_render(output_path, resume=True)
+                return
+        
         # Confirm before rendering
         duration_estimate = "several minutes"
         if messagebox.askyesno("Confirm Render",